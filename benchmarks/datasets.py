@@ -0,0 +1,98 @@
+"""
+Synthetic Benchmark Datasets
+
+Reproducible (seeded) tables in the stored schemas, built with numpy so a
+10M-row table takes seconds:
+
+- bitcoin: one price per minute (random walk), keyed by 'time' (epoch ms)
+- earthquakes: the typed USGS schema (scrapers/usgs.py), keyed by 'id',
+  about one event per minute
+
+Weather is keyed by calendar day, so it cannot reach these sizes and is not
+generated.
+"""
+
+import numpy as np
+import pandas as pd
+
+from scrapers import usgs
+
+
+# ---------- CONFIGURATION ----------
+
+# First timestamp of every synthetic series (epoch ms, 2000-01-01 UTC)
+START_MS = 946_684_800_000
+
+# Benchmark sizes accepted on the command line
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+PLACES = ["Central California", "Southern Alaska", "Puerto Rico region", "Island of Hawaii, Hawaii",
+          "Fiji region", "Western Texas", "Solomon Islands", "Washington"]
+NETWORKS = ["ak", "ci", "hv", "nc", "pr", "tx", "us", "uw"]
+MAG_TYPES = ["md", "ml", "mb", "mww"]
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def parse_size(text: str) -> int:
+    """
+    '100k' -> 100000 (plain integers are accepted too).
+    """
+    return SIZES.get(text.lower()) or int(text)
+
+
+def size_label(n: int) -> str:
+    for label, size in SIZES.items():
+        if size == n:
+            return label
+    return str(n)
+
+
+def _dates(times_ms: np.ndarray) -> np.ndarray:
+    return times_ms.astype("datetime64[ms]").astype("datetime64[D]").astype("datetime64[ns]")
+
+
+# ---------- PUBLIC API ----------
+
+def bitcoin_frame(n: int, seed: int = 0, offset: int = 0) -> pd.DataFrame:
+    """
+    n minutely prices starting offset minutes after START_MS.
+    """
+    rng = np.random.default_rng(seed)
+    times = START_MS + (np.arange(n, dtype="int64") + offset) * 60_000
+    prices = 30_000 + np.cumsum(rng.normal(0, 15, n))
+    return pd.DataFrame({
+        "date": _dates(times),
+        "value": np.abs(prices),
+        "source": "CoinGecko - Bitcoin",
+        "time": times,
+    })
+
+
+def earthquakes_frame(n: int, seed: int = 0, offset: int = 0) -> pd.DataFrame:
+    """
+    n events with unique ids (bench<offset + i>), about one per minute after START_MS.
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(n, dtype="int64") + offset
+    times = START_MS + index * 60_000 + rng.integers(0, 60_000, n)
+    df = pd.DataFrame({
+        "id": [f"bench{i:09d}" for i in index],
+        "date": _dates(times),
+        "time": times,
+        "value": (usgs.MIN_MAGNITUDE + rng.exponential(0.6, n)).astype("float32"),
+        "mag_type": pd.Categorical.from_codes(rng.integers(0, len(MAG_TYPES), n), MAG_TYPES),
+        "place": pd.Categorical.from_codes(rng.integers(0, len(PLACES), n), PLACES),
+        "latitude": rng.uniform(-60, 70, n).astype("float32"),
+        "longitude": rng.uniform(-180, 180, n).astype("float32"),
+        "depth": rng.uniform(0, 600, n).astype("float32"),
+        "net": pd.Categorical.from_codes(rng.integers(0, len(NETWORKS), n), NETWORKS),
+        "source": usgs.SOURCE_NAME,
+    })
+    return df[usgs.COLUMNS]
+
+
+FRAMES = {
+    "bitcoin": bitcoin_frame,
+    "earthquakes": earthquakes_frame,
+}
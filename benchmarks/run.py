@@ -0,0 +1,175 @@
+"""
+Benchmark Suite
+
+Runs the benchmark stages (benchmarks/stages.py) for each dataset size in a
+scratch copy of the project, so data/ is never touched, and stores the
+results in benchmarks/results/<timestamp>.json together with the commit and
+machine they were measured on. Each run is compared with a previous result
+(by default the latest one): stages that got slower by more than the
+threshold are reported and make the run exit with status 1.
+
+Usage:
+    python benchmarks/run.py                          # 1k, 10k, 100k, 1m rows
+    python benchmarks/run.py --sizes 1k 10m --repeat 5
+    python benchmarks/run.py --compare benchmarks/results/2025-11-02T10-00-00.json
+    python benchmarks/run.py --latency 200            # slower stub API, for concurrency changes
+"""
+
+import os
+import sys
+import json
+import glob
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+# Project root (the benchmarks run on a copy of it)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.datasets import parse_size, size_label
+
+
+# ---------- CONFIGURATION ----------
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+DEFAULT_SIZES = ["1k", "10k", "100k", "1m"]
+
+# What the scratch copy contains: code and source list only, no data
+COPY_ENTRIES = ["storage", "scrapers", "plotting", "benchmarks", "metrics.py", "websites.csv"]
+COPY_IGNORE = shutil.ignore_patterns("__pycache__", "*.png", ".render_state.json", "results")
+
+# Differences below this many seconds are noise, whatever the ratio
+NOISE_FLOOR = 0.005
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _git_commit() -> str:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _scratch_copy() -> str:
+    scratch = tempfile.mkdtemp(prefix="scraping_bench_")
+    for entry in COPY_ENTRIES:
+        src = os.path.join(ROOT_DIR, entry)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(scratch, entry), ignore=COPY_IGNORE)
+        elif os.path.exists(src):
+            shutil.copy2(src, scratch)
+    return scratch
+
+
+def run_size(n: int, args) -> dict:
+    """
+    Run all stages for one size in a fresh scratch copy and return their results.
+    """
+    scratch = _scratch_copy()
+    output = os.path.join(scratch, "results.json")
+    command = [sys.executable, os.path.join("benchmarks", "stages.py"), "--size", str(n),
+               "--repeat", str(args.repeat), "--latency", str(args.latency), "--output", output]
+    if args.usgs_events:
+        command += ["--usgs-events", str(args.usgs_events)]
+    env = dict(os.environ, MPLBACKEND="Agg")
+    env.pop("SCRAPING_BASE_URL", None)
+    try:
+        subprocess.run(command, cwd=scratch, env=env, check=True)
+        with open(output, "r") as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def previous_result(exclude: str = None) -> str:
+    paths = sorted(p for p in glob.glob(os.path.join(RESULTS_DIR, "*.json")) if p != exclude)
+    return paths[-1] if paths else None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Print every stage next to its baseline.
+
+    Returns:
+        list: (size, stage, ratio) of the stages slower than baseline * (1 + threshold).
+    """
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, result in stages.items():
+            before = baseline.get("results", {}).get(size, {}).get(stage, {})
+            if "seconds" not in result or "seconds" not in before:
+                continue
+            # The fastest run is the least noisy estimate of the cost
+            now, then = result.get("min", result["seconds"]), before.get("min", before["seconds"])
+            ratio = now / then if then else float("inf")
+            slower = ratio > 1 + threshold and now - then > NOISE_FLOOR
+            if slower:
+                regressions.append((size, stage, ratio))
+            print(f"{'❌' if slower else '  '} {size:>5} {stage:<24} {now:9.4f}s  (was {then:.4f}s, {ratio - 1:+.0%})")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare with a previous result.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help=f"Dataset sizes (1k, 10k, 100k, 1m, 10m or a number; default: {' '.join(DEFAULT_SIZES)}).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the median and minimum are kept.")
+    parser.add_argument("--latency", type=float, default=50, help="Stub API latency in milliseconds (default: 50).")
+    parser.add_argument("--usgs-events", type=int, help="Events in the stub's USGS feed (default: the recorded feed).")
+    parser.add_argument("--compare", metavar="RESULT", help="Result file to compare with (default: the latest).")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (default: 0.2).")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the result.")
+    return parser.parse_args()
+
+
+# ---------- MAIN EXECUTION ----------
+
+def main() -> int:
+    args = parse_args()
+    sizes = [parse_size(s) for s in args.sizes]
+    result = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"repeat": args.repeat, "latency_ms": args.latency, "usgs_events": args.usgs_events},
+        "results": {},
+    }
+    for n in sizes:
+        print(f"\n📏 {size_label(n)} rows")
+        result["results"][size_label(n)] = run_size(n, args)
+
+    path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y-%m-%dT%H-%M-%S") + ".json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=1)
+        print(f"\n💾 Results saved to {path}")
+
+    baseline_path = args.compare or previous_result(exclude=path)
+    if not baseline_path:
+        print("ℹ️ No previous result to compare with.")
+        return 0
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    print(f"\n📊 Compared with {os.path.basename(baseline_path)} (commit {baseline.get('commit')}):")
+    regressions = compare(result, baseline, args.threshold)
+    if regressions:
+        print(f"⚠️ {len(regressions)} stage(s) slower than {args.threshold:.0%} over the baseline.")
+        return 1
+    print("✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
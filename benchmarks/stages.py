@@ -0,0 +1,233 @@
+"""
+Benchmark Stages (worker)
+
+Measures every stage for one dataset size and writes the timings as JSON.
+It is started by benchmarks/run.py inside a scratch copy of the project, so
+the dataset, indexes, exports and plots it writes are thrown away afterwards;
+running it directly in the project would write to data/.
+
+Stages, in order (each on the dataset left by the previous ones):
+- parse.usgs          json.loads + features_to_frame of a feed of N events (at most PARSE_MAX_ROWS)
+- save_records.bulk   N bitcoin + N earthquake rows through the storage writer;
+                      save_to_hdf.bulk is the HDF5 part of it (from metrics.py)
+- dedup.index_load    loading the persisted key index of N ids in a fresh process state
+- dedup.filter        checking DEDUP_BATCH ids (half stored, half new) against it
+- save_records.append APPEND_ROWS new + APPEND_ROWS already stored rows into the N-row table;
+                      save_to_hdf.append is its HDF5 part
+- load_data.full / load_data.week   the whole table / its last 7 days
+- render              bitcoin and usgs charts, headless (skipped without matplotlib)
+- end_to_end.concurrent / .sequential   one scraper run (fetch, parse, buffer, flush)
+                      against the local stub server; after a warmup run of each
+                      mode, the modes alternate which runs first and the median
+                      of at least END_TO_END_MIN_RUNS runs is reported
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+import metrics
+import storage
+from storage import key_index
+from scrapers import usgs, http_client, rate_limit
+from scrapers.data_utils import load_data
+from benchmarks import datasets
+from benchmarks.stub_server import start_stub_server, scaled_usgs_feed
+
+
+# ---------- CONFIGURATION ----------
+
+PARSE_MAX_ROWS = 1_000_000   # a 10M-event GeoJSON document would need several GB
+DEDUP_BATCH = 100_000
+APPEND_ROWS = 1_000
+
+# end_to_end runs each mode at least this often (after one warmup run each)
+END_TO_END_MIN_RUNS = 3
+BREAKDOWN_METRICS = ("http_request_seconds", "parse_seconds", "scrape_seconds", "hdf5_write_seconds",
+                     "export_seconds", "storage_write_seconds")
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _timed(fn, repeat: int = 1) -> dict:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {"seconds": statistics.median(runs), "min": min(runs), "runs": len(runs)}
+
+
+def _metric_sum(name: str) -> float:
+    return sum(hist["sum"] for hist in metrics.snapshot()["histograms"].get(name, {}).values())
+
+
+def _timed_write(fn) -> tuple:
+    """
+    Time a storage write and the HDF5 part of it (hdf5_write_seconds).
+    """
+    metrics.reset()
+    total = _timed(fn)
+    return total, {"seconds": _metric_sum("hdf5_write_seconds"), "runs": 1}
+
+
+def _with_rows(result: dict, rows: int) -> dict:
+    result["rows"] = rows
+    result["rows_per_s"] = round(rows / result["seconds"]) if result["seconds"] else None
+    return result
+
+
+# ---------- STAGES ----------
+
+def bench_parse(n: int, repeat: int) -> dict:
+    n = min(n, PARSE_MAX_ROWS)
+    body = scaled_usgs_feed(n)
+    return _with_rows(_timed(lambda: usgs.features_to_frame(json.loads(body)["features"]), repeat), n)
+
+
+def bench_storage(n: int, repeat: int) -> dict:
+    results = {}
+    frames = {key: make(n) for key, make in datasets.FRAMES.items()}
+
+    bulk, hdf5 = _timed_write(lambda: [storage.save_records(df, key) for key, df in frames.items()])
+    results["save_records.bulk"] = _with_rows(bulk, 2 * n)
+    results["save_to_hdf.bulk"] = _with_rows(hdf5, 2 * n)
+
+    # A fresh process has to read the persisted index before its first save
+    nrows = storage.stored_nrows("earthquakes")
+    index = key_index.KeyIndex("hdf5_earthquakes", ["id"])
+    results["dedup.index_load"] = _with_rows(_timed(lambda: index.load(nrows, lambda: None)), n)
+
+    half = min(n, DEDUP_BATCH) // 2
+    batch = pd.concat([frames["earthquakes"].tail(half), datasets.earthquakes_frame(half, seed=1, offset=n)])
+    results["dedup.filter"] = _with_rows(_timed(lambda: index.filter_new(batch), repeat), len(batch))
+
+    appends, hdf5_appends = [], []
+    for run in range(repeat):
+        new_rows = datasets.earthquakes_frame(APPEND_ROWS, seed=2 + run, offset=2 * n + run * APPEND_ROWS)
+        batch = pd.concat([frames["earthquakes"].tail(APPEND_ROWS), new_rows])
+        total, hdf5 = _timed_write(lambda: storage.save_records(batch, "earthquakes"))
+        appends.append(total["seconds"])
+        hdf5_appends.append(hdf5["seconds"])
+    results["save_records.append"] = _with_rows(
+        {"seconds": statistics.median(appends), "min": min(appends), "runs": repeat}, 2 * APPEND_ROWS)
+    results["save_to_hdf.append"] = _with_rows(
+        {"seconds": statistics.median(hdf5_appends), "min": min(hdf5_appends), "runs": repeat}, 2 * APPEND_ROWS)
+
+    last_day = frames["earthquakes"]["date"].max()
+    results["load_data.full"] = _with_rows(_timed(lambda: load_data("usgs.csv", "earthquakes"), repeat), n)
+    week = load_data("usgs.csv", "earthquakes", start=last_day - pd.Timedelta(days=6), end=last_day)
+    results["load_data.week"] = _with_rows(
+        _timed(lambda: load_data("usgs.csv", "earthquakes", start=last_day - pd.Timedelta(days=6), end=last_day),
+               repeat), len(week))
+    return results
+
+
+def bench_render(n: int, repeat: int) -> dict:
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return {"render": {"skipped": "matplotlib is not installed"}}
+    from plotting.render import render
+    from storage.rollups import ensure_rollups
+
+    # Rollups are maintained by the writer; only the drawing is measured
+    ensure_rollups("earthquakes")
+    return {"render": _with_rows(_timed(lambda: render(["bitcoin", "usgs"], force=True), repeat), n)}
+
+
+def bench_end_to_end(repeat: int, latency_ms: float, usgs_events: int = None) -> dict:
+    from scrapers.scraper import load_websites_csv
+    from scrapers.registry import resolve_sources
+    from scrapers.runner import run_jobs
+
+    server, base_url = start_stub_server(latency_ms=latency_ms, usgs_events=usgs_events)
+    http_client.set_base_url(base_url)
+    # Every run fetches: no HTTP cache, no rate limit on the stub
+    for policy in [http_client.DEFAULT_POLICY, *http_client.SOURCE_POLICIES.values()]:
+        policy["cache_ttl"] = None
+    host = base_url.split("://", 1)[1]
+    rate_limit.HOST_LIMITS[host] = {"rate": 1e6, "burst": 1000, "min_rate": 1e6, "max_rate": 1e6, "max_concurrent": 100}
+
+    specs = resolve_sources(load_websites_csv())
+    jobs = [(spec.name, spec.scrape, spec.save) for spec in specs]
+    modes = [("concurrent", True), ("sequential", False)]
+    runs = {mode: [] for mode, _ in modes}
+    breakdowns = {mode: [] for mode, _ in modes}
+
+    def run(concurrent):
+        run_jobs(jobs, concurrent=concurrent)
+        storage.flush_all()
+
+    try:
+        # Warmup (not measured): imports, connection pools, first writes of each key
+        for _, concurrent in modes:
+            run(concurrent)
+
+        # Alternate which mode goes first, so neither always pays for the other's leftovers
+        for i in range(max(repeat, END_TO_END_MIN_RUNS)):
+            for mode, concurrent in (modes if i % 2 == 0 else modes[::-1]):
+                metrics.reset()
+                started = time.perf_counter()
+                run(concurrent)
+                runs[mode].append(time.perf_counter() - started)
+                breakdowns[mode].append({name: _metric_sum(name) for name in BREAKDOWN_METRICS})
+    finally:
+        server.shutdown()
+        http_client.set_base_url(None)
+
+    results = {}
+    for mode, _ in modes:
+        results[f"end_to_end.{mode}"] = {
+            "seconds": statistics.median(runs[mode]),
+            "min": min(runs[mode]),
+            "runs": len(runs[mode]),
+            # Where the time of a typical run went (median per metric)
+            "breakdown": {
+                name: round(statistics.median(b[name] for b in breakdowns[mode]), 6)
+                for name in BREAKDOWN_METRICS
+            },
+        }
+    return results
+
+
+# ---------- MAIN EXECUTION ----------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the benchmark stages for one size (use benchmarks/run.py).")
+    parser.add_argument("--size", type=datasets.parse_size, required=True, help="Rows, e.g. 1k, 100k, 10m.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=50, help="Stub server latency in milliseconds.")
+    parser.add_argument("--usgs-events", type=int, help="Events in the stub's USGS feed (default: recorded feed).")
+    parser.add_argument("--output", required=True, help="JSON file for the results.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {}
+    for stage in (
+        lambda: {"parse.usgs": bench_parse(args.size, args.repeat)},
+        lambda: bench_storage(args.size, args.repeat),
+        lambda: bench_render(args.size, args.repeat),
+        lambda: bench_end_to_end(args.repeat, args.latency, args.usgs_events),
+    ):
+        for name, result in stage().items():
+            results[name] = result
+            timing = f"{result['seconds']:.4f}s" if "seconds" in result else result.get("skipped")
+            print(f"⏱️ {datasets.size_label(args.size):>5} {name:<24} {timing}", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Local API Stub Server
+
+Serves the recorded payloads in benchmarks/fixtures/ on the paths of the
+real APIs (CoinGecko, Open-Meteo, USGS), so the scrapers can run unchanged
+against it: point the HTTP client at it with SCRAPING_BASE_URL (or
+scrapers.http_client.set_base_url()). An optional per-request latency
+simulates the network, which makes concurrency changes visible.
+
+The USGS feeds can be scaled: with usgs_events=N, every feed returns N
+synthetic events built from the recorded ones (new ids, spread over the last
+hour), so parse and dedup costs can be measured at any feed size.
+
+Usage:
+    python benchmarks/stub_server.py --record               # refresh the fixtures
+    python benchmarks/stub_server.py --port 8765 --latency 200
+    SCRAPING_BASE_URL=http://127.0.0.1:8765 python scrapers/scraper.py
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+# ---------- CONFIGURATION ----------
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Request path -> fixture file (the query string is ignored)
+ROUTES = {
+    "/api/v3/simple/price": "coingecko_simple_price.json",
+    "/v1/forecast": "open_meteo_current.json",
+    "/earthquakes/feed/v1.0/summary/all_hour.geojson": "usgs_all_hour.geojson",
+    "/earthquakes/feed/v1.0/summary/all_day.geojson": "usgs_all_hour.geojson",
+    "/earthquakes/feed/v1.0/summary/all_week.geojson": "usgs_all_hour.geojson",
+}
+
+USGS_FIXTURE = "usgs_all_hour.geojson"
+
+# Fixture file -> live URL it is recorded from (see record_fixtures())
+RECORD_URLS = {
+    "coingecko_simple_price.json": "https://api.coingecko.com/api/v3/simple/price"
+                                   "?ids=bitcoin&vs_currencies=usd&include_last_updated_at=true",
+    "open_meteo_current.json": "https://api.open-meteo.com/v1/forecast"
+                               "?latitude=52.52&longitude=13.405&current_weather=true",
+    "usgs_all_hour.geojson": "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson",
+}
+
+
+# ---------- PAYLOADS ----------
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def scaled_usgs_feed(n_events: int, seed: int = 0) -> bytes:
+    """
+    A USGS GeoJSON feed of n_events events, cycled from the recorded ones with
+    unique ids and times spread over the hour before the recorded feed.
+    """
+    recorded = json.loads(load_fixture(USGS_FIXTURE))
+    templates = recorded["features"]
+    generated = recorded["metadata"]["generated"]
+    features = []
+    for i in range(n_events):
+        feature = templates[i % len(templates)]
+        props = dict(feature["properties"], time=generated - (i * 3_600_000) // max(n_events, 1))
+        features.append(dict(feature, id=f"{feature['id']}{seed}x{i}", properties=props))
+    recorded["features"] = features
+    recorded["metadata"] = dict(recorded["metadata"], count=n_events)
+    return json.dumps(recorded).encode()
+
+
+def record_fixtures():
+    """
+    Re-record every fixture from the live APIs (network access required).
+    """
+    import requests
+
+    for name, url in RECORD_URLS.items():
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+            f.write(response.content)
+        print(f"📼 Recorded {name} ({len(response.content)} bytes)")
+
+
+# ---------- SERVER ----------
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Set per server by start_stub_server()
+    payloads = {}
+    latency = 0.0
+
+    def do_GET(self):
+        body = self.payloads.get(urlsplit(self.path).path)
+        if self.latency:
+            time.sleep(self.latency)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, latency_ms: float = 0, usgs_events: int = None):
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        port (int): Port to listen on (0 = any free port).
+        latency_ms (float): Delay added to every response.
+        usgs_events (int): Serve USGS feeds of this many synthetic events (default: the recorded feed).
+
+    Returns:
+        tuple: (server, base URL). Call server.shutdown() to stop it.
+    """
+    payloads = {path: load_fixture(name) for path, name in ROUTES.items()}
+    if usgs_events is not None:
+        usgs_feed = scaled_usgs_feed(usgs_events)
+        payloads.update({path: usgs_feed for path, name in ROUTES.items() if name == USGS_FIXTURE})
+
+    handler = type("Handler", (StubHandler,), {"payloads": payloads, "latency": latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve recorded API payloads locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every response.")
+    parser.add_argument("--usgs-events", type=int, help="Serve USGS feeds with this many synthetic events.")
+    parser.add_argument("--record", action="store_true", help="Re-record the fixtures from the live APIs and exit.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.record:
+        record_fixtures()
+        raise SystemExit(0)
+    server, base_url = start_stub_server(args.port, args.latency, args.usgs_events)
+    print(f"🧪 Stub server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,200 @@
+"""
+Run Metrics
+
+Counters and latency histograms for the hot path of a run: HTTP fetches
+(latency, bytes, retries, cache hits, rate-limit waits), parsing, rows
+parsed / deduplicated / written and the duration of every storage write.
+Values are kept in memory, per metric and label set, behind one lock; nothing
+is printed or logged per row or per request.
+
+write_metrics() exports them to logs/metrics/<role>.prom (Prometheus text
+format, e.g. for a node_exporter textfile collector) and <role>.json (the
+same numbers plus max and mean latencies, for reading by hand). Each process
+(scheduler, scraper, backfill) writes its own pair. Values are cumulative
+for the life of the process, like Prometheus counters: for one scraper run
+the files show that run; for the scheduler, compare two exports.
+
+Only the standard library is used, so every module can import this cheaply.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# ---------- CONFIGURATION ----------
+
+METRICS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "logs", "metrics"))
+
+PREFIX = "scraping_"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Metrics with a help text; names ending in _seconds are histograms, the others counters
+HELP = {
+    "http_request_seconds": "Duration of HTTP requests, per attempt (urllib3 retries included).",
+    "http_wait_seconds": "Time spent waiting for a host's rate limiter before a request.",
+    "http_bytes_total": "Response body bytes downloaded.",
+    "http_retries_total": "Retried HTTP requests (5xx retried by urllib3 and 429).",
+    "http_errors_total": "Requests that failed after all retries.",
+    "http_cache_hits_total": "Responses served from the HTTP cache (result=fresh) or revalidated with a 304.",
+    "parse_seconds": "Time spent turning a response into a DataFrame.",
+    "scrape_seconds": "Duration of a scraper's scrape step (fetch and parse).",
+    "save_seconds": "Duration of a scraper's save step (hand-over to the write-ahead buffer).",
+    "rows_parsed_total": "Rows returned by scrapers.",
+    "rows_deduped_total": "Rows skipped on write because they were already stored.",
+    "rows_written_total": "Rows written to HDF5.",
+    "hdf5_write_seconds": "Duration of HDF5 writes (dedup check and append, or a rewrite).",
+    "export_seconds": "Duration of updating one export (CSV, Parquet, rollups) after a write.",
+    "storage_write_seconds": "Duration of a whole storage write (HDF5 and all exports, under the lock).",
+}
+
+_lock = threading.Lock()
+_counters = {}      # (name, labels) -> value
+_histograms = {}    # (name, labels) -> {"buckets": [...], "sum": s, "count": n, "max": m}
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{k}="{v}"' for k, v in labels + extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ---------- PUBLIC API ----------
+
+def inc(name: str, value: float = 1, **labels):
+    """
+    Add to a counter (e.g. inc("rows_written_total", 12, key="earthquakes")).
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """
+    Record one duration in a latency histogram.
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0, "max": 0.0}
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+                break
+        hist["sum"] += seconds
+        hist["count"] += 1
+        hist["max"] = max(hist["max"], seconds)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """
+    Time a block into a histogram (recorded even if the block raises).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def snapshot() -> dict:
+    """
+    Current values as plain data: {"counters": {...}, "histograms": {...}},
+    keyed by metric name, then by "label=value,..." (empty string without labels).
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(hist, buckets=list(hist["buckets"])) for key, hist in _histograms.items()}
+
+    out = {"counters": {}, "histograms": {}}
+    for (name, labels), value in sorted(counters.items()):
+        out["counters"].setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+    for (name, labels), hist in sorted(histograms.items()):
+        out["histograms"].setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = {
+            "count": hist["count"],
+            "sum": round(hist["sum"], 6),
+            "mean": round(hist["sum"] / hist["count"], 6) if hist["count"] else 0.0,
+            "max": round(hist["max"], 6),
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS], hist["buckets"])),
+        }
+    return out
+
+
+def to_prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, dict(hist, buckets=list(hist["buckets"]))) for key, hist in _histograms.items())
+
+    lines = []
+    described = set()
+
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for (name, labels), value in counters:
+        describe(name, "counter")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), hist in histograms:
+        describe(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, hist["buckets"]):
+            cumulative += count
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist['count']}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(role: str) -> str:
+    """
+    Export the metrics of this process to logs/metrics/<role>.prom and <role>.json.
+
+    Args:
+        role (str): Name of the process, e.g. 'scheduler', 'scraper' or 'backfill'.
+
+    Returns:
+        str: Path of the Prometheus file.
+    """
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    prom_path = os.path.join(METRICS_DIR, f"{role}.prom")
+    _write_atomic(prom_path, to_prometheus())
+    data = {"role": role, "pid": os.getpid(), "written_at": datetime.now().isoformat(timespec="seconds"), **snapshot()}
+    _write_atomic(os.path.join(METRICS_DIR, f"{role}.json"), json.dumps(data, indent=1))
+    return prom_path
+
+
+def reset():
+    """
+    Drop all recorded values.
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -0,0 +1,35 @@
+"""
+Chart Registry
+
+The charts of the project: the storage key each one is drawn from and its
+output file in plotting/plots/. Kept free of matplotlib so the renderer can
+decide what is out of date without importing it; the drawing code lives in
+plotting/templates.py.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+# ---------- CONFIGURATION ----------
+
+PLOTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "plots"))
+
+
+@dataclass
+class ChartSpec:
+    name: str
+    # Storage key whose row count decides whether the chart is out of date
+    source: str
+    filename: str
+
+    @property
+    def path(self) -> str:
+        return os.path.join(PLOTS_DIR, self.filename)
+
+
+CHARTS = {
+    "bitcoin": ChartSpec("bitcoin", "bitcoin", "bitcoin_plot.png"),
+    "weather": ChartSpec("weather", "weather", "open_meteo_plot.png"),
+    "usgs": ChartSpec("usgs", "earthquakes", "usgs_plot.png"),
+}
@@ -0,0 +1,121 @@
+"""
+Time-Series Downsampling
+
+Reduces a series to about as many points as the plot has pixels, before it
+is handed to matplotlib, so render time and PNG size stay flat as history
+grows. Both methods are vectorized with numpy and keep the first and last
+point:
+
+- "minmax" (default): splits the series into equal-count buckets and keeps
+  the minimum and maximum of each, so every peak and dip stays visible.
+- "lttb": Largest-Triangle-Three-Buckets, one point per bucket chosen for
+  visual similarity (the bucket loop is Python, the work inside is numpy).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ---------- CONFIGURATION ----------
+
+# Points kept per horizontal pixel of the axes (min + max of each pixel column)
+POINTS_PER_PIXEL = 2
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _as_float(values) -> np.ndarray:
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").to_numpy(dtype="float64")
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of the min and max of each of n_out // 2 equal-count buckets.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    buckets = (n_out - 2) // 2
+    size = -(-(n - 2) // buckets)  # ceil
+    # Pad the inner points to a (buckets, size) block; padding never wins min or max
+    inner = y[1:n - 1]
+    padded_min = np.full(buckets * size, np.inf)
+    padded_max = np.full(buckets * size, -np.inf)
+    padded_min[:len(inner)] = np.where(np.isnan(inner), np.inf, inner)
+    padded_max[:len(inner)] = np.where(np.isnan(inner), -np.inf, inner)
+    offsets = np.arange(buckets) * size
+    lows = padded_min.reshape(buckets, size).argmin(axis=1) + offsets
+    highs = padded_max.reshape(buckets, size).argmax(axis=1) + offsets
+    keep = np.unique(np.concatenate([[0], lows + 1, highs + 1, [n - 1]]))
+    # Buckets made of padding only point past the end
+    return keep[keep < n]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions chosen by Largest-Triangle-Three-Buckets.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    y = np.nan_to_num(y)
+    # Average point of every bucket, computed once
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Triangle between the last kept point, each candidate and the next bucket's average
+        areas = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(areas.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+# ---------- PUBLIC API ----------
+
+def point_budget(ax) -> int:
+    """
+    Number of points worth drawing on an Axes: POINTS_PER_PIXEL per pixel of its width.
+    """
+    return max(int(ax.bbox.width) * POINTS_PER_PIXEL, 4)
+
+
+def downsample(df: pd.DataFrame, x: str, columns, n_out: int, method: str = "minmax") -> pd.DataFrame:
+    """
+    Keep about n_out rows of a time series (sorted by x), per plotted column.
+
+    With several columns, the rows kept for any of them are kept, so every
+    line keeps its peaks.
+
+    Args:
+        df (pd.DataFrame): Data sorted by x.
+        x (str): Column on the horizontal axis.
+        columns (list): Columns that will be plotted.
+        n_out (int): Point budget per column (see point_budget()).
+        method (str): "minmax" or "lttb".
+
+    Returns:
+        pd.DataFrame: The selected rows, in their original order.
+    """
+    if len(df) <= n_out:
+        return df
+    xs = _as_float(df[x])
+    keep = []
+    for col in columns:
+        ys = _as_float(df[col])
+        if method == "lttb":
+            keep.append(lttb_indices(xs, ys, n_out))
+        else:
+            keep.append(minmax_indices(ys, n_out))
+    return df.iloc[np.unique(np.concatenate(keep))]
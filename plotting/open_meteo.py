@@ -2,57 +2,27 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-
-import pandas as pd
+from datetime import date, timedelta
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from scrapers.data_utils import load_data
-
-df = load_data("open_meteo.csv", "weather")
-
-# Convert 'date' column to datetime
-df["date"] = pd.to_datetime(df["date"])
-df = df.sort_values("date")
-
-# Plotting both temperature and wind speed
-fig, ax = plt.subplots(figsize=(10, 5))
-
-# Temperature line
-ax.plot(df["date"], df["temperature"], label="Temperature (°C)", marker='o', color='orange')
+from plotting.charts import CHARTS
+from plotting.templates import TEMPLATES, FIGSIZE
 
-# Wind speed line
-ax.plot(df["date"], df["wind_speed"], label="Wind Speed (km/h)", marker='s', color='blue')
+# Interactive version of the weather chart; `python plotting/render.py` renders all charts headlessly.
+# Optional window in days (e.g. `python plotting/open_meteo.py 7`); only that range is read from storage
+DAYS = int(sys.argv[1]) if len(sys.argv) > 1 else None
+start = date.today() - timedelta(days=DAYS) if DAYS else None
 
-# Format x-axis
-ax.xaxis.set_major_locator(mdates.DayLocator())
-ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax.xaxis.set_major_locator(mdates.DayLocator(interval=3))
-plt.xticks(rotation=10)
-plt.xticks(fontsize=8)
+spec = CHARTS["weather"]
+load, draw = TEMPLATES["weather"]
+df = load(start)
 
-# Labels and title
-ax.set_title("Weather in Berlin: Temperature and Wind Speed", fontsize=14, pad=20)
-ax.set_xlabel("Date", fontsize=10, labelpad=10, fontweight='bold')
-ax.set_ylabel("Value (km/h,°C)", fontsize=10, labelpad=10, fontweight='bold')
-ax.set_ylim(0, 50)
-ax.text(1.0, -0.15, "Source: Open-Meteo API", transform=ax.transAxes,
-        ha='right', va='center', fontsize=9, color='gray')
-ax.yaxis.grid(True, linestyle='--', alpha=0.5)
-
-# Remove top and right borders (spines)
-ax.spines["top"].set_visible(False)
-ax.spines["right"].set_visible(False)
-
-# Legend
-ax.legend(loc='upper left', bbox_to_anchor=(0, -0.10), frameon=False)
-
-# Tight layout
+fig, ax = plt.subplots(figsize=FIGSIZE)
+draw(ax, df)
 plt.tight_layout()
 
-
 # ✅ Save to plots directory
-os.makedirs("plots", exist_ok=True)
-plt.savefig("plots/open_meteo_plot.png", dpi=300)
+os.makedirs(os.path.dirname(spec.path), exist_ok=True)
+plt.savefig(spec.path, dpi=300)
 
 # Show plot
-plt.show()
\ No newline at end of file
+plt.show()
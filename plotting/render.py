@@ -0,0 +1,144 @@
+"""
+Headless Chart Renderer
+
+Renders every chart in one process with the non-interactive Agg backend and
+writes them to plotting/plots/ (absolute path, independent of the working
+directory). A chart is only redrawn if its data changed since its last
+render: each render records the row count of the chart's storage key (and
+the window) in plotting/plots/.render_state.json. When nothing is new, a
+run only reads those row counts and never imports matplotlib.
+
+Usage:
+    python plotting/render.py                 # re-render charts with new data
+    python plotting/render.py --days 7 usgs   # last week of one chart
+    python plotting/render.py --force
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import date, timedelta
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from storage import stored_nrows
+from plotting.charts import CHARTS, PLOTS_DIR
+
+
+# ---------- CONFIGURATION ----------
+
+STATE_FILE = os.path.join(PLOTS_DIR, ".render_state.json")
+
+DPI = 150
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _load_state() -> dict:
+    try:
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state: dict):
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def _fingerprint(source: str, start) -> dict:
+    """
+    What a chart was rendered from: the row count of its key and its window
+    (a rolling window moves every day, so its start is part of it).
+    """
+    return {"nrows": stored_nrows(source), "start": start.isoformat() if start else None, "dpi": DPI}
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# ---------- PUBLIC API ----------
+
+def render(names=None, days: int = None, force: bool = False) -> list:
+    """
+    Render the given charts (default: all) whose data changed since their last render.
+
+    Args:
+        names (list): Chart names from plotting.charts.CHARTS.
+        days (int): Only plot the last `days` days (default: full history).
+        force (bool): Render even if nothing changed.
+
+    Returns:
+        list: Names of the charts that were rendered.
+    """
+    names = list(names or CHARTS)
+    start = date.today() - timedelta(days=days) if days else None
+    state = _load_state()
+
+    stale = []
+    for name in names:
+        spec = CHARTS[name]
+        fingerprint = _fingerprint(spec.source, start)
+        if force or state.get(name) != fingerprint or not os.path.exists(spec.path):
+            stale.append((spec, fingerprint))
+    if not stale:
+        print("✅ All charts are up to date.")
+        return []
+
+    # Imported only when there is something to draw
+    plt = _pyplot()
+    from plotting.templates import TEMPLATES, FIGSIZE
+
+    # One figure is reused for every chart; at the output dpi, so the point budget matches the PNG width
+    fig = plt.figure(figsize=FIGSIZE, dpi=DPI)
+    loaded = {}
+    rendered = []
+    for spec, fingerprint in stale:
+        started = time.perf_counter()
+        try:
+            load, draw = TEMPLATES[spec.name]
+            # Charts drawn from the same data load it once
+            if (load, start) not in loaded:
+                loaded[(load, start)] = load(start)
+            df = loaded[(load, start)]
+            fig.clf()
+            ax = fig.add_subplot()
+            draw(ax, df)
+            fig.tight_layout()
+            os.makedirs(PLOTS_DIR, exist_ok=True)
+            fig.savefig(spec.path, dpi=DPI)
+        except Exception as e:
+            logging.error(f"Rendering chart '{spec.name}' failed: {e}")
+            continue
+        state[spec.name] = fingerprint
+        rendered.append(spec.name)
+        print(f"🖼️ {spec.name}: {len(df)} points -> {spec.path} ({time.perf_counter() - started:.2f}s)")
+
+    plt.close(fig)
+    _save_state(state)
+    return rendered
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render all charts headlessly (only those with new data).")
+    parser.add_argument("charts", nargs="*", help=f"Charts to render: {', '.join(CHARTS)} (default: all).")
+    parser.add_argument("--days", type=int, help="Only plot the last N days.")
+    parser.add_argument("--force", action="store_true", help="Render even if the data did not change.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    render(args.charts, days=args.days, force=args.force)
@@ -0,0 +1,122 @@
+"""
+Chart Templates
+
+For each chart in plotting/charts.py: how to load its data (through the
+query API or the precomputed rollups) and how to draw it onto an Axes. Used
+by the headless renderer (plotting/render.py) and by the interactive plot
+scripts, so both produce the same charts.
+"""
+
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.ticker import FuncFormatter, MultipleLocator
+
+from storage import query
+from storage.rollups import read_rollup
+from plotting.downsample import downsample, point_budget
+
+
+FIGSIZE = (10, 5)
+
+# Above this many points lines are drawn without markers
+MARKER_LIMIT = 200
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _marker(marker: str, df: pd.DataFrame):
+    return marker if len(df) <= MARKER_LIMIT else None
+
+
+def _date_axis(ax, df: pd.DataFrame):
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    span = df["date"].max() - df["date"].min() if not df.empty else pd.Timedelta(0)
+    # A tick every 3 days; long histories would get thousands of ticks, so let matplotlib pick
+    if span > pd.Timedelta(days=90):
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    else:
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=3))
+    ax.tick_params(axis="x", labelsize=8, labelrotation=10)
+
+
+def _frame(ax, title: str, ylabel: str, credit: str):
+    ax.set_title(title, fontsize=14, pad=20)
+    ax.set_xlabel("Date", fontsize=10, labelpad=10, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=10, labelpad=10, fontweight='bold')
+    ax.text(1.0, -0.15, credit, transform=ax.transAxes,
+            ha='right', va='center', fontsize=9, color='gray')
+    ax.yaxis.grid(True, linestyle='--', alpha=0.5)
+
+    # Remove top and right borders (spines)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+
+
+# ---------- BITCOIN ----------
+
+def load_bitcoin(start=None) -> pd.DataFrame:
+    try:
+        df = query("bitcoin", start=start, columns=["date", "value", "time"])
+    except KeyError:
+        # Stored before minute timestamps: daily rows without a 'time' column
+        df = query("bitcoin", start=start, columns=["date", "value"])
+    # Minute prices are placed at their timestamp, older daily rows at their date
+    when = pd.to_datetime(df["time"], unit="ms", errors="coerce") if "time" in df.columns else None
+    df["date"] = when.fillna(pd.to_datetime(df["date"])) if when is not None else pd.to_datetime(df["date"])
+    return df.sort_values("date")
+
+
+def draw_bitcoin(ax, df: pd.DataFrame):
+    # About two points per pixel column; the min and max of each column are kept
+    df = downsample(df, "date", ["value"], point_budget(ax))
+    ax.plot(df["date"], df["value"], marker=_marker('o', df), color='blue', label="Bitcoin Price")
+    _date_axis(ax, df)
+    _frame(ax, "Bitcoin Price Over Time", "Price (USD)", "Source: CoinGecko API")
+    if not df.empty:
+        ax.set_ylim(df["value"].min() - 3000, df["value"].max() + 3000)
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f'{x/1000:.0f}k'))
+    ax.legend(loc='upper left', bbox_to_anchor=(0, -0.10), frameon=False)
+
+
+# ---------- WEATHER ----------
+
+def load_weather(start=None) -> pd.DataFrame:
+    df = query("weather", start=start, columns=["date", "temperature", "wind_speed"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values("date")
+
+
+def draw_weather(ax, df: pd.DataFrame):
+    df = downsample(df, "date", ["temperature", "wind_speed"], point_budget(ax))
+    ax.plot(df["date"], df["temperature"], label="Temperature (°C)", marker=_marker('o', df), color='orange')
+    ax.plot(df["date"], df["wind_speed"], label="Wind Speed (km/h)", marker=_marker('s', df), color='blue')
+    _date_axis(ax, df)
+    _frame(ax, "Weather in Berlin: Temperature and Wind Speed", "Value (km/h,°C)", "Source: Open-Meteo API")
+    ax.set_ylim(0, 50)
+    ax.legend(loc='upper left', bbox_to_anchor=(0, -0.10), frameon=False)
+
+
+# ---------- EARTHQUAKES ----------
+
+def load_usgs(start=None) -> pd.DataFrame:
+    # Daily maxima are precomputed on every write (storage/rollups.py)
+    df = read_rollup("earthquakes", "daily", start=start, columns=["value_max"])
+    return df.rename(columns={"value_max": "max_magnitude"})
+
+
+def draw_usgs(ax, df: pd.DataFrame):
+    df = downsample(df, "date", ["max_magnitude"], point_budget(ax))
+    ax.plot(df["date"], df["max_magnitude"], color="red", marker=_marker("o", df), linestyle="-", linewidth=2)
+    _date_axis(ax, df)
+    _frame(ax, "Daily Maximum Earthquake Magnitudes", "Max Magnitude", "Source: USGS Earthquake Feed")
+    ax.set_ylim(0, 10)
+    ax.yaxis.set_major_locator(MultipleLocator(1))
+    ax.xaxis.grid(False)
+
+
+# Chart name -> (load(start), draw(ax, df))
+TEMPLATES = {
+    "bitcoin": (load_bitcoin, draw_bitcoin),
+    "weather": (load_weather, draw_weather),
+    "usgs": (load_usgs, draw_usgs),
+}
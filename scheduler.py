@@ -1,15 +1,23 @@
 """
 Daily Scraper Scheduler
 
-This script runs all scraping functions (Bitcoin, Weather, Earthquakes)
-at 11:00 AM daily, but only during a predefined 9-day window.
-
-It uses a state file (scheduler_state.txt) to determine the window start.
+This script runs the scrapers listed in websites.csv (Bitcoin, Weather,
+Earthquakes) according to their cadence: daily sources at 11:00 AM, sub-daily
+ones (e.g. Bitcoin every minute, USGS every 5 minutes) whenever their interval
+has elapsed. Due jobs are kept in a heap, so each wake-up only runs the
+sources that are due and the scheduler sleeps until the next one.
+
+The next due time, last success and failed attempts of every source are kept
+in logs/scheduler_state.json, written atomically after each run. After a
+crash or restart, runs that were missed while the scheduler was down are
+caught up immediately, and failed sources are retried with backoff.
+Once an hour it also checks the per-source date coverage of the last 30 days
+and backfills any missing days automatically.
 """
 
-import schedule
 import time
 import os
+import heapq
 import logging
 from datetime import datetime, timedelta
 
@@ -18,80 +26,213 @@ from datetime import datetime, timedelta
 # Get absolute path to project root
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
-STATE_FILE = os.path.join(LOG_DIR, "scheduler_state.txt")
 LOG_FILE = os.path.join(LOG_DIR, "scheduler.log")
 
-# -------------------- LOGGING SETUP --------------------
+# -------------------- IMPORT SCRAPERS --------------------
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Importing has no side effects (no logging setup, no directories, no storage
+# load); main() does the setup and the HDF5 layer loads on first use
+import storage
+import metrics
+from scrapers.scraper import load_websites_csv
+from scrapers.registry import resolve_sources, due_time, next_run_after
+from scrapers.job_state import load_state, save_state, record_success, record_failure
+from scrapers.runner import run_jobs, is_not_modified, is_no_new_rows, save_error
+from scrapers.backfill import run_backfill
 
-# -------------------- IMPORT SCRAPERS --------------------
+# Durable per-source job state (next due time, last success, failed attempts), loaded by main()
+STATE = {}
+
+WEBSITES_FILE = os.path.join(BASE_DIR, "websites.csv")
+MIN_SLEEP = 1                       # seconds
+MAX_SLEEP = 3600                    # seconds
+
+# Sources from websites.csv and a heap of (next due time, websites.csv order, scraper name)
+SPECS = {}
+QUEUE = []
+WEBSITES_MTIME = None
+
+# -------------------- SELF-HEALING SETUP --------------------
 
-from scrapers.scraper import (
-    scrape_coingecko_bitcoin,
-    save_bitcoin_data,
-    scrape_open_meteo,
-    save_open_meteo_data,
-    scrape_usgs,
-    save_usgs_data
-)
+HEAL_LOOKBACK_DAYS = 30             # only this many past days are checked for gaps
+HEAL_EVERY = timedelta(hours=1)     # how often the coverage check runs
+HEAL_RETRY = timedelta(hours=6)     # wait before retrying a day that could not be filled
+
+LAST_HEAL = None
+HEAL_ATTEMPTS = {}                  # (scraper name, date) -> last backfill attempt
 
 # -------------------- JOB DEFINITION --------------------
+def load_sources(now):
+    """
+    (Re)load websites.csv when it changed and rebuild the queue of due jobs
+    from the saved job state.
+    """
+    global SPECS, QUEUE, WEBSITES_MTIME
+    mtime = os.path.getmtime(WEBSITES_FILE) if os.path.exists(WEBSITES_FILE) else None
+    if SPECS and mtime == WEBSITES_MTIME:
+        return
+    WEBSITES_MTIME = mtime
+
+    specs = resolve_sources(load_websites_csv())
+    SPECS = {spec.name: spec for spec in specs}
+    next_due = _next_due()
+    QUEUE = [(due_time(spec, next_due, now), order, spec.name) for order, spec in enumerate(specs)]
+    heapq.heapify(QUEUE)
+    logging.info("Schedule: " + ", ".join(f"{spec.name} every {spec.interval}" for spec in specs))
+
+
+def pop_due(now) -> list:
+    """
+    Remove and return the queue entries whose due time has passed.
+    Only these sources run; the others stay queued.
+    """
+    due = []
+    while QUEUE and QUEUE[0][0] <= now:
+        due.append(heapq.heappop(QUEUE))
+    return sorted(due, key=lambda entry: entry[1])
+
+
 def job():
     """
-    Executes all scraper functions daily.
+    Dispatches the websites.csv sources whose interval has elapsed.
+    Sources are fetched concurrently and saved in websites.csv order.
+    """
+    now = datetime.now()
+    load_sources(now)
+    due = pop_due(now)
+    if not due:
+        heal_gaps(list(SPECS.values()), now)
+        return
+
+    specs = [SPECS[name] for _, _, name in due]
+    print(f"⏰ Running scheduled scrapers: {', '.join(spec.name for spec in specs)}")
+    logging.info(f"Started job for {len(specs)} source(s)...")
+
+    jobs = [(spec.name, spec.scrape, spec.save) for spec in specs]
+    results = run_jobs(jobs, concurrent=True)
+
+    finished = datetime.now()
+    for (due_at, order, name), (_, df) in zip(due, results):
+        spec = SPECS[name]
+        if df.empty and not (is_not_modified(df) or is_no_new_rows(df)):
+            record_failure(STATE, name, finished, spec.interval, "no data retrieved")
+            print(f"⚠️ No data retrieved for {spec.website}.")
+        elif save_error(df):
+            # Retried with backoff like a failed fetch; the rows are fetched again
+            record_failure(STATE, name, finished, spec.interval, f"save failed: {save_error(df)}")
+            print(f"❌ Saving {spec.website} data failed: {save_error(df)}")
+        else:
+            # Keep the cadence anchored to the schedule; skip slots that were missed
+            next_due = next_run_after(spec, due_at)
+            if next_due <= finished:
+                next_due = next_run_after(spec, finished)
+            record_success(STATE, name, finished, next_due)
+            if is_no_new_rows(df):
+                print(f"⏭️ {spec.website}: no new rows.")
+            elif df.empty:
+                print(f"⏭️ {spec.website} unchanged since the last fetch.")
+            else:
+                print(f"✅ {spec.website} data saved.")
+        heapq.heappush(QUEUE, (STATE[name]["next_due"], order, name))
+    save_state(STATE)
+
+    print("✅ All due scrapers completed.\n")
+    logging.info("All due scrapers completed.\n")
+
+    heal_gaps(list(SPECS.values()), finished)
+
+
+def _next_due() -> dict:
+    return {name: entry.get("next_due") for name, entry in STATE.items()}
+
+
+def seconds_until_next_job(now) -> float:
+    """
+    Seconds until the next queued source (or coverage check) is due, clamped
+    to [MIN_SLEEP, MAX_SLEEP].
+    """
+    wakeups = [QUEUE[0][0]] if QUEUE else []
+    if LAST_HEAL is not None:
+        wakeups.append(LAST_HEAL + HEAL_EVERY)
+    if not wakeups:
+        return MAX_SLEEP
+    seconds = (min(wakeups) - now).total_seconds()
+    return min(max(seconds, MIN_SLEEP), MAX_SLEEP)
+
+
+def heal_gaps(specs, now):
+    """
+    Backfills days missing in the last HEAL_LOOKBACK_DAYS days (up to yesterday).
+    Gaps are read from the per-source coverage bitmaps, so the check does not
+    depend on how much history is stored.
     """
-    print("⏰ Running scheduled scrapers...")
-    logging.info("Started job...")
-
-    # --- Bitcoin ---
-    print("💰 Scraping Bitcoin...")
-    df_btc = scrape_coingecko_bitcoin()
-    if not df_btc.empty:
-        save_bitcoin_data(df_btc)
-        logging.info("✅ Bitcoin data saved.")
-    else:
-        print("⚠️ No Bitcoin data retrieved.")
-        logging.warning("❌ Bitcoin data unavailable.")
-
-    # --- Weather ---
-    print("🌤️ Scraping weather data...")
-    df_weather = scrape_open_meteo()
-    if not df_weather.empty:
-        save_open_meteo_data(df_weather)
-        logging.info("✅ Weather data saved.")
-    else:
-        print("⚠️ No weather data retrieved.")
-        logging.warning("❌ Weather data unavailable.")
-
-    # --- Earthquakes ---
-    print("🌍 Scraping earthquake data...")
-    df_quakes = scrape_usgs()
-    if not df_quakes.empty:
-        save_usgs_data(df_quakes)
-        logging.info("✅ Earthquake data saved.")
-    else:
-        print("⚠️ No earthquake data retrieved.")
-        logging.warning("❌ Earthquake data unavailable.")
-
-    print("✅ All scrapers completed.\n")
-    logging.info("All scrapers completed.\n")
+    global LAST_HEAL
+    if LAST_HEAL is not None and now - LAST_HEAL < HEAL_EVERY:
+        return
+    LAST_HEAL = now
+
+    # Coverage only knows about rows that reached HDF5
+    storage.flush_all()
+    end = now.date() - timedelta(days=1)
+    gaps = {}
+    for spec in specs:
+        if spec.backfill is None:
+            continue
+        storage.ensure_coverage(spec.storage_key)
+        first = storage.coverage.first_date(spec.storage_key)
+        if first is None:
+            continue
+        start = max(first, now.date() - timedelta(days=HEAL_LOOKBACK_DAYS))
+        missing = [
+            day for day in storage.coverage.missing_dates(spec.storage_key, start, end)
+            if now - HEAL_ATTEMPTS.get((spec.name, day), datetime.min) >= HEAL_RETRY
+        ]
+        if missing:
+            gaps[spec.storage_key] = missing
+            for day in missing:
+                HEAL_ATTEMPTS[(spec.name, day)] = now
+
+    if not gaps:
+        return
+
+    print(f"🩹 Filling gaps: {', '.join(f'{key} ({len(days)} days)' for key, days in gaps.items())}")
+    logging.info(f"Self-healing backfill for {gaps}")
+    all_days = [day for days in gaps.values() for day in days]
+    run_backfill(specs, min(all_days), max(all_days), gaps=gaps)
 
 
 # -------------------- SCHEDULER SETUP --------------------
 
-schedule.every().day.at("11:00").do(job)
+def setup_logging():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+def main():
+    global STATE
+    setup_logging()
+    STATE = load_state()
+
+    # Write rows buffered by a run that crashed before they were flushed
+    storage.replay()
+
+    print("📅 Scheduler started. Waiting for the next job...")
+    logging.info(f"Scheduler initialized ({len(STATE)} source(s) in saved state).")
+
+    # Keep running: run whatever is due (including missed runs), then sleep until the next due time
+    while True:
+        try:
+            job()
+        except Exception as e:
+            logging.error(f"Scheduler job failed: {e}")
+        # Cumulative since start; logs/metrics/scheduler.prom is picked up by the textfile collector
+        metrics.write_metrics("scheduler")
+        time.sleep(seconds_until_next_job(datetime.now()))
 
-print("📅 Scheduler started. Waiting for the next job...")
-logging.info("Scheduler initialized.")
 
-# Keep running
-while True:
-    schedule.run_pending()
-    time.sleep(60)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Historical Backfill
+
+Finds the dates of a range that have no data in storage and fetches them
+with the range endpoints of each source (CoinGecko market_chart/range,
+Open-Meteo archive start_date/end_date, USGS FDSN starttime/endtime).
+
+Missing dates are grouped into contiguous runs and split into chunks of
+`backfill_chunk_days` (set per source in the registry). Chunks run
+concurrently, limited per source by `max_concurrency` (shared with live runs,
+see registry.source_limit) and per host by the shared HTTP client. A fetcher
+may return one DataFrame or yield batches (streamed responses); every batch is
+handed to the write-ahead buffer as soon as it arrives and written to HDF5 in bulk, so memory stays bounded and
+progress survives an interrupted run (the buffer log is replayed).
+"""
+
+import time
+import logging
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+import storage
+import metrics
+from scrapers.registry import source_limit
+
+
+# ---------- CONFIGURATION ----------
+
+MAX_WORKERS = 8
+
+
+# ---------- PLANNING ----------
+
+def missing_dates(storage_key: str, start: date, end: date) -> list:
+    """
+    Return the dates in [start, end] without any stored row for a key.
+    Read from the coverage bitmap, like the scheduler's gap check, so both
+    agree on what is missing (buffered rows must be flushed first).
+    """
+    storage.ensure_coverage(storage_key)
+    return storage.coverage.missing_dates(storage_key, start, end)
+
+
+def date_runs(dates) -> list:
+    """
+    Group sorted dates into contiguous (first, last) runs.
+    """
+    runs = []
+    for day in sorted(dates):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def split_run(first: date, last: date, chunk_days: int) -> list:
+    """
+    Split an inclusive date run into chunks of at most chunk_days days.
+    """
+    chunks = []
+    while first <= last:
+        chunk_end = min(last, first + timedelta(days=chunk_days - 1))
+        chunks.append((first, chunk_end))
+        first = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def plan_backfill(specs, start: date, end: date, gaps: dict = None) -> list:
+    """
+    Build the list of (spec, chunk_start, chunk_end) fetches needed to fill the gaps.
+
+    Args:
+        specs (list[ScraperSpec]): Sources to consider (those without a backfill fetcher are skipped).
+        start, end (date): Inclusive date range to check.
+        gaps (dict): Optional precomputed {storage_key: [missing dates]}; otherwise storage is checked.
+    """
+    if gaps is None:
+        # Coverage only knows about rows that reached HDF5
+        storage.flush_all()
+    tasks = []
+    for spec in specs:
+        if spec.backfill is None:
+            continue
+        if gaps is not None:
+            dates = gaps.get(spec.storage_key, [])
+        else:
+            dates = missing_dates(spec.storage_key, start, end)
+        for first, last in date_runs(dates):
+            for chunk in split_run(first, last, spec.backfill_chunk_days):
+                tasks.append((spec, *chunk))
+    return tasks
+
+
+# ---------- EXECUTION ----------
+
+def _batches(result):
+    """
+    A backfill fetcher returns one DataFrame or yields several (streamed responses).
+    """
+    if result is None:
+        return []
+    return [result] if isinstance(result, pd.DataFrame) else result
+
+
+def _fetch_chunk(spec, first: date, last: date) -> int:
+    """
+    Fetch and save one chunk, batch by batch as the rows arrive.
+    Returns the number of rows saved.
+    """
+    rows, fetch_seconds = 0, 0.0
+    with source_limit(spec.name):
+        try:
+            started = time.perf_counter()
+            batches = iter(_batches(spec.backfill(first, last)))
+            while True:
+                df = next(batches, None)
+                fetch_seconds += time.perf_counter() - started
+                if df is None:
+                    break
+                if not df.empty:
+                    metrics.inc("rows_parsed_total", len(df), scraper=spec.name)
+                    with metrics.timer("save_seconds", scraper=spec.name):
+                        spec.save(df)
+                    rows += len(df)
+                started = time.perf_counter()
+        except Exception as e:
+            logging.error(f"Backfill of {spec.name} for {first}..{last} failed after {rows} rows: {e}")
+            return rows
+        finally:
+            # Time spent fetching and parsing, without the saves in between
+            metrics.observe("scrape_seconds", fetch_seconds, scraper=spec.name)
+    if rows:
+        logging.info(f"Backfill {spec.name} {first}..{last}: {rows} rows.")
+    else:
+        logging.info(f"Backfill {spec.name} {first}..{last}: no rows.")
+    return rows
+
+
+def run_backfill(specs, start: date, end: date, gaps: dict = None,
+                 max_workers: int = MAX_WORKERS, dry_run: bool = False) -> dict:
+    """
+    Fill the gaps of every source between start and end (inclusive).
+
+    Returns:
+        dict: {scraper name: rows fetched}. With dry_run=True nothing is fetched
+        and the values are the number of planned chunks instead.
+    """
+    tasks = plan_backfill(specs, start, end, gaps)
+    if dry_run:
+        planned = {}
+        for spec, first, last in tasks:
+            print(f"🗓️ {spec.name}: {first} .. {last}")
+            planned[spec.name] = planned.get(spec.name, 0) + 1
+        return planned
+    if not tasks:
+        print("✅ No gaps found. Nothing to backfill.")
+        return {}
+
+    sources = {spec.name for spec, _, _ in tasks}
+    print(f"⏳ Backfilling {len(tasks)} chunk(s) for {len(sources)} source(s)...")
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), thread_name_prefix="backfill") as pool:
+        futures = [pool.submit(_fetch_chunk, spec, first, last) for spec, first, last in tasks]
+        counts = [future.result() for future in futures]
+    storage.flush_all()
+
+    results = {}
+    for (spec, _, _), rows in zip(tasks, counts):
+        results[spec.name] = results.get(spec.name, 0) + rows
+
+    for name, rows in results.items():
+        if rows:
+            print(f"✅ {name}: {rows} rows backfilled.")
+        else:
+            print(f"⚠️ {name}: no data returned.")
+    return results
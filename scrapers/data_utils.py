@@ -1,44 +1,20 @@
-from pathlib import Path
 import pandas as pd
 
-def load_data(csv_filename: str, hdf5_key: str) -> pd.DataFrame:
+from storage.query import query
+
+
+def load_data(csv_filename: str, hdf5_key: str, start=None, end=None, columns=None) -> pd.DataFrame:
     """
-    Load data from a CSV file. If the file doesn't exist, load from HDF5 using a given key.
+    Load data for one source, reading only the rows and columns that are needed.
+    Kept for older callers; new code should use storage.query.query().
 
     Args:
-        csv_filename (str): Filename to look for in /data.
-        hdf5_key (str): Key to use when reading from dataset.h5 if CSV is missing.
+        csv_filename (str): Filename of the CSV export in /data (used if the key is unknown).
+        hdf5_key (str): Key to use when reading from dataset.h5 / the Parquet dataset.
+        start, end: Optional inclusive date range.
+        columns (list): Optional columns to load (all if None).
 
     Returns:
         pd.DataFrame: Loaded data (empty if nothing found).
     """
-    # Base paths
-    project_root = Path(__file__).resolve().parents[1]
-    data_dir = project_root / "data"
-    csv_path = data_dir / csv_filename
-    hdf5_path = data_dir / "dataset.h5"
-
-    # Try CSV first
-    if csv_path.exists():
-        print(f"✅ Data loaded from CSV: {csv_filename}")
-        try:
-            return pd.read_csv(csv_path)
-        except Exception as e:
-            print(f"⚠️ Error reading CSV: {e}")
-            return pd.DataFrame()
-
-    # Try HDF5
-    if not hdf5_path.exists():
-        print("⚠️ HDF5 file not found.")
-        return pd.DataFrame()
-
-    try:
-        with pd.HDFStore(hdf5_path, mode="r") as store:
-            if hdf5_key not in store:
-                print(f"⚠️ Key '{hdf5_key}' not found in HDF5.")
-                return pd.DataFrame()
-            print(f"✅ Data loaded from HDF5 key: {hdf5_key}")
-            return store[hdf5_key]
-    except Exception as e:
-        print(f"⚠️ Error reading from HDF5: {e}")
-        return pd.DataFrame()
+    return query(hdf5_key or csv_filename, start=start, end=end, columns=columns)
@@ -0,0 +1,183 @@
+"""
+On-disk HTTP Cache
+
+Stores the last response of every cached URL under data/.cache/http/ (body
+plus the headers needed for revalidation). The shared HTTP client uses it to
+answer requests within a per-source TTL without any network traffic, and to
+revalidate older entries with If-None-Match / If-Modified-Since, so an
+unchanged feed costs a 304 instead of a full download.
+
+The cache is bounded by MAX_CACHE_BYTES; the least recently used entries are
+evicted first.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+# ---------- CONFIGURATION ----------
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "data", ".cache", "http")
+
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+_lock = threading.Lock()
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _paths(url: str):
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    base = os.path.join(CACHE_DIR, digest)
+    return base + ".json", base + ".body"
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _evict():
+    """
+    Delete least recently used entries until the cache fits MAX_CACHE_BYTES.
+    The body file's mtime is the last use of an entry.
+    """
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".body"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        for stale in (path, path[:-len(".body")] + ".json"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        total -= size
+
+
+# ---------- PUBLIC API ----------
+
+def cache_url(url: str, params=None) -> str:
+    """
+    Return the full request URL (including query parameters) used as cache key.
+    """
+    request = requests.models.PreparedRequest()
+    request.prepare_url(url, params)
+    return request.url
+
+
+def lookup(url: str):
+    """
+    Return the cached entry of a URL as (meta, body), or None.
+    """
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    return meta, body
+
+
+def is_fresh(meta: dict, ttl) -> bool:
+    return bool(ttl) and time.time() - meta.get("stored_at", 0) < ttl
+
+
+def conditional_headers(meta: dict) -> dict:
+    """
+    Revalidation headers for a cached entry.
+    """
+    headers = {}
+    if meta["headers"].get("ETag"):
+        headers["If-None-Match"] = meta["headers"]["ETag"]
+    if meta["headers"].get("Last-Modified"):
+        headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+    return headers
+
+
+def store(url: str, response: requests.Response):
+    """
+    Cache the body and validators of a successful (200) response.
+    """
+    if "no-store" in response.headers.get("Cache-Control", "").lower():
+        return
+    meta = {
+        "url": url,
+        "stored_at": time.time(),
+        "headers": {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+    }
+    meta_path, body_path = _paths(url)
+    try:
+        with _lock:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_atomic(body_path, response.content)
+            _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            _evict()
+    except OSError as e:
+        logging.warning(f"Could not cache response of {url}: {e}")
+
+
+def touch(url: str, meta: dict, revalidated: bool = False):
+    """
+    Mark an entry as recently used; after a 304 its TTL starts again.
+    """
+    meta_path, body_path = _paths(url)
+    try:
+        if revalidated:
+            meta["stored_at"] = time.time()
+            _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        os.utime(body_path)
+    except OSError:
+        pass
+
+
+def build_response(url: str, meta: dict, body: bytes) -> requests.Response:
+    """
+    Rebuild a requests.Response from a cached entry.
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response._content = body
+    response.from_cache = True
+    return response
+
+
+def clear():
+    """
+    Delete every cached entry.
+    """
+    with _lock:
+        if not os.path.isdir(CACHE_DIR):
+            return
+        for name in os.listdir(CACHE_DIR):
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
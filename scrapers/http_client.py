@@ -0,0 +1,248 @@
+"""
+Shared HTTP Client
+
+Keeps one long-lived requests.Session per data source, so repeated fetches
+reuse pooled keep-alive connections instead of doing a fresh TCP+TLS
+handshake on every call. Timeouts and retry policies are configured per source,
+and an adaptive per-host token bucket (scrapers/rate_limit.py) keeps all
+callers within each API's rate limits. 429 responses are handled here rather
+than by urllib3, so the limiter sees them and slows the whole host down.
+
+Plain GET requests go through an on-disk cache (scrapers/http_cache.py):
+responses younger than the source's cache_ttl are served locally, older
+ones are revalidated with ETag / Last-Modified.
+
+If SCRAPING_BASE_URL is set (or set_base_url() is called), every request is
+sent to that server instead, with the same path and query: the benchmarks
+(benchmarks/) use it to replay recorded payloads from a local stub server.
+"""
+
+import os
+import time
+import logging
+import threading
+import requests
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+import metrics
+from scrapers import http_cache
+from scrapers.rate_limit import get_bucket
+
+
+# ---------- CONFIGURATION ----------
+
+DEFAULT_HEADERS = {
+    "User-Agent": "scraping_project/1.0 (+https://github.com/dlosch9225/scraping_project)",
+    "Accept": "application/json",
+}
+
+# Connection pool sizing (urllib3 keeps one pool per host inside each adapter)
+POOL_CONNECTIONS = 10   # number of hosts to keep pools for
+POOL_MAXSIZE = 10       # keep-alive connections per host
+
+DEFAULT_POLICY = {
+    "timeout": 10,
+    "retries": 3,
+    "backoff_factor": 0.5,
+    # 429 is not retried by urllib3 but by fetch(), after the host limiter has backed off
+    "status_forcelist": (500, 502, 503, 504),
+    # Seconds a cached response is used without asking the server (0 = always revalidate,
+    # None = do not cache)
+    "cache_ttl": 0,
+}
+
+# Per-source overrides of DEFAULT_POLICY
+SOURCE_POLICIES = {
+    "coingecko": {"retries": 5, "backoff_factor": 1.0, "cache_ttl": 30},
+    "open_meteo": {"cache_ttl": 600},
+    "open_meteo_archive": {"timeout": 30, "cache_ttl": 24 * 3600},
+    "usgs": {"timeout": 20, "cache_ttl": 30},
+}
+
+# Scheme and host that replace those of every requested URL (None = the real APIs)
+BASE_URL = os.environ.get("SCRAPING_BASE_URL") or None
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def get_policy(source: str) -> dict:
+    """
+    Return the effective request policy for a source (defaults merged with overrides).
+    """
+    policy = dict(DEFAULT_POLICY)
+    policy.update(SOURCE_POLICIES.get(source, {}))
+    return policy
+
+
+def set_base_url(base_url: str = None):
+    """
+    Send all requests to another server (e.g. "http://127.0.0.1:8765"), or back to the real APIs with None.
+    """
+    global BASE_URL
+    BASE_URL = base_url or None
+
+
+def _route(url: str) -> str:
+    if not BASE_URL:
+        return url
+    parts, base = urlsplit(url), urlsplit(BASE_URL)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def _build_session(policy: dict) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+
+    retry = Retry(
+        total=policy["retries"],
+        backoff_factor=policy["backoff_factor"],
+        status_forcelist=list(policy["status_forcelist"]),
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(source: str = "default") -> requests.Session:
+    """
+    Return the shared session for a source, creating it on first use.
+    """
+    with _sessions_lock:
+        session = _sessions.get(source)
+        if session is None:
+            session = _build_session(get_policy(source))
+            _sessions[source] = session
+        return session
+
+
+@contextmanager
+def host_slot(url: str):
+    """
+    Hold one request slot for the host of a URL: a concurrency slot and a
+    token from the host's bucket. Yields the bucket for response feedback.
+    """
+    host = urlsplit(url).netloc
+    bucket = get_bucket(host)
+    started = time.perf_counter()
+    with bucket.semaphore:
+        bucket.acquire()
+        metrics.observe("http_wait_seconds", time.perf_counter() - started, host=host)
+        yield bucket
+
+
+def _count_retries(response, source: str):
+    """
+    Count the attempts urllib3 retried (5xx, connection errors) before this response.
+    """
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None)
+    if history:
+        metrics.inc("http_retries_total", len(history), source=source)
+
+
+def count_bytes(chunks, source: str):
+    """
+    Pass the chunks of a streamed body through, counting their bytes.
+    """
+    for chunk in chunks:
+        metrics.inc("http_bytes_total", len(chunk), source=source)
+        yield chunk
+
+
+def close_sessions():
+    """
+    Close all pooled sessions (e.g. at process shutdown).
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+# ---------- PUBLIC API ----------
+
+def fetch(url, source="default", params=None, headers=None, timeout=None, stream=False, if_changed=False):
+    """
+    GET a URL through the shared session of the given source.
+
+    Args:
+        url (str): URL to fetch.
+        source (str): Source name used to pick the session and policy (see SOURCE_POLICIES).
+        params (dict): Optional query parameters.
+        headers (dict): Optional extra headers.
+        timeout (float): Overrides the source timeout if given.
+        stream (bool): Do not read the body up front (for incremental parsing). Not cached.
+        if_changed (bool): Flag responses whose content was already seen: if the
+            cached copy is fresh or the server answers 304, the returned response
+            has not_modified=True and the caller can skip parsing it.
+
+    Returns:
+        requests.Response | None: The response, or None if the request failed after retries.
+    """
+    url = _route(url)
+    session = get_session(source)
+    policy = get_policy(source)
+    if timeout is None:
+        timeout = policy["timeout"]
+
+    use_cache = not stream and policy["cache_ttl"] is not None
+    cached = None
+    if use_cache:
+        key = http_cache.cache_url(url, params)
+        cached = http_cache.lookup(key)
+        if cached is not None:
+            meta, body = cached
+            if http_cache.is_fresh(meta, policy["cache_ttl"]):
+                metrics.inc("http_cache_hits_total", source=source, result="fresh")
+                http_cache.touch(key, meta)
+                response = http_cache.build_response(key, meta, body)
+                response.not_modified = if_changed
+                return response
+            headers = {**http_cache.conditional_headers(meta), **(headers or {})}
+
+    try:
+        for attempt in range(policy["retries"] + 1):
+            with host_slot(url) as bucket, metrics.timer("http_request_seconds", source=source):
+                response = session.get(url, headers=headers, params=params, timeout=timeout, stream=stream)
+            bucket.update(response)
+            _count_retries(response, source)
+            if response.status_code != 429 or attempt == policy["retries"]:
+                break
+            response.close()
+            metrics.inc("http_retries_total", source=source)
+            logging.warning(f"429 from {url} ({source}), retry {attempt + 1}/{policy['retries']}.")
+        response.raise_for_status()
+    except Exception as e:
+        metrics.inc("http_errors_total", source=source)
+        logging.error(f"Request to {url} ({source}) failed after retries: {e}")
+        return None
+
+    if cached is not None and response.status_code == 304:
+        # Unchanged since the cached copy: no body was transferred
+        metrics.inc("http_cache_hits_total", source=source, result="revalidated")
+        http_cache.touch(key, meta, revalidated=True)
+        response = http_cache.build_response(key, meta, body)
+        response.not_modified = if_changed
+        return response
+
+    if not stream:
+        # Streamed bodies are counted by their reader (see count_bytes())
+        metrics.inc("http_bytes_total", len(response.content), source=source)
+    if use_cache and response.status_code == 200:
+        http_cache.store(key, response)
+    response.from_cache = False
+    response.not_modified = False
+    return response
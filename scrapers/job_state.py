@@ -0,0 +1,96 @@
+"""
+Scheduler Job State
+
+Durable per-source job state for the scheduler: last success, last attempt,
+next due time, consecutive failed attempts and the last error. The state is
+written to logs/scheduler_state.json after every run (write to a temp file,
+fsync, atomic rename), so a crash or restart never loses or corrupts it and
+missed runs can be caught up on restart.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+
+
+# ---------- CONFIGURATION ----------
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_FILE = os.path.join(BASE_DIR, "logs", "scheduler_state.json")
+
+# Retry a failed source after RETRY_BASE, doubling per failed attempt (capped at the source interval)
+RETRY_BASE = timedelta(minutes=5)
+
+_DATETIME_FIELDS = ("last_success", "last_attempt", "next_due")
+
+
+# ---------- LOAD / SAVE ----------
+
+def load_state(path: str = STATE_FILE) -> dict:
+    """
+    Load the job state ({scraper name: entry}); an unreadable file starts fresh.
+    """
+    try:
+        with open(path, "r") as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not read scheduler state {path}: {e}. Starting fresh.")
+        return {}
+
+    state = {}
+    for name, entry in raw.get("jobs", {}).items():
+        for field in _DATETIME_FIELDS:
+            if entry.get(field):
+                entry[field] = datetime.fromisoformat(entry[field])
+        state[name] = entry
+    return state
+
+
+def save_state(state: dict, path: str = STATE_FILE):
+    """
+    Persist the job state atomically.
+    """
+    jobs = {}
+    for name, entry in state.items():
+        jobs[name] = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in entry.items()
+        }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"jobs": jobs}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ---------- STATE UPDATES ----------
+
+def get_entry(state: dict, name: str) -> dict:
+    return state.setdefault(name, {
+        "last_success": None,
+        "last_attempt": None,
+        "next_due": None,
+        "attempts": 0,
+        "last_error": None,
+    })
+
+
+def record_success(state: dict, name: str, now: datetime, next_due: datetime):
+    entry = get_entry(state, name)
+    entry.update(last_success=now, last_attempt=now, next_due=next_due, attempts=0, last_error=None)
+
+
+def record_failure(state: dict, name: str, now: datetime, interval: timedelta, error: str):
+    """
+    Count a failed attempt and schedule the retry with exponential backoff.
+    """
+    entry = get_entry(state, name)
+    attempts = entry.get("attempts", 0) + 1
+    delay = min(RETRY_BASE * (2 ** (attempts - 1)), interval)
+    entry.update(last_attempt=now, next_due=now + delay, attempts=attempts, last_error=error)
@@ -0,0 +1,88 @@
+"""
+Streaming JSON Array Reader
+
+Yields the elements of one top-level array (e.g. "features" in a GeoJSON
+FeatureCollection) while the response body is still being downloaded, so
+only the current element and a small read buffer are held in memory,
+no matter how large the document is.
+"""
+
+import re
+import json
+import codecs
+
+
+# ---------- CONFIGURATION ----------
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+# ---------- PUBLIC API ----------
+
+def iter_array_items(chunks, key: str):
+    """
+    Yield the items of the array stored under `key` from a stream of JSON text.
+
+    Args:
+        chunks (iterable): Byte (UTF-8) or str chunks of one JSON document,
+            e.g. response.iter_content(CHUNK_SIZE).
+        key (str): Name of the array member, e.g. "features".
+
+    Yields:
+        Each parsed array item (dict, list, number, ...).
+
+    Raises:
+        ValueError: If the stream ends before the array is complete.
+    """
+    start_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    buffer = ""
+    pos = 0
+    in_array = False
+    finished = False
+
+    def text_chunks():
+        for chunk in chunks:
+            yield utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        yield utf8.decode(b"", final=True)
+
+    for text in text_chunks():
+        if finished:
+            break
+        buffer = buffer[pos:] + text
+        pos = 0
+
+        if not in_array:
+            match = start_pattern.search(buffer)
+            if match is None:
+                # Keep a tail in case the key is split across two chunks
+                pos = max(0, len(buffer) - len(key) - 16)
+                continue
+            in_array = True
+            pos = match.end()
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                finished = True
+                break
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Item not complete yet: read more data
+                break
+            if not isinstance(item, (dict, list)) and buffer[end:].lstrip(_WHITESPACE)[:1] not in (",", "]"):
+                # A scalar cut by the chunk boundary (e.g. "-6." of "-6.5e3") may still continue
+                break
+            pos = end
+            yield item
+
+    if not finished:
+        raise ValueError(f"JSON stream ended before the '{key}' array was complete.")
@@ -0,0 +1,153 @@
+"""
+Adaptive Per-Host Rate Limiter
+
+One token bucket per host, shared by every thread of the process (live
+scrapers, scheduler and backfill). A request takes one token; tokens refill
+at the host's current rate up to a small burst.
+
+The rate adapts to the server's feedback (AIMD):
+- every successful response raises the rate additively, up to max_rate;
+- a 429 halves it and pauses the whole host for Retry-After seconds;
+- rate-limit headers (X-RateLimit-Remaining / -Reset and the RateLimit-*
+  equivalents) cap the rate so the remaining quota lasts until the reset.
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# ---------- CONFIGURATION ----------
+
+# rate = starting requests per second, burst = bucket size,
+# min_rate / max_rate = bounds of the adaptation, max_concurrent = parallel in-flight requests
+DEFAULT_HOST_LIMIT = {"rate": 10.0, "burst": 10, "min_rate": 0.1, "max_rate": 20.0, "max_concurrent": 4}
+HOST_LIMITS = {
+    # Free tier: a few dozen calls per minute
+    "api.coingecko.com": {"rate": 0.5, "burst": 2, "min_rate": 0.05, "max_rate": 1.0, "max_concurrent": 1},
+}
+
+RATE_INCREASE = 0.05        # requests/second added per successful response
+RATE_DECREASE = 0.5         # factor applied on every 429
+DEFAULT_RETRY_AFTER = 30.0  # seconds to pause after a 429 without Retry-After
+MAX_RETRY_AFTER = 600.0
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def parse_retry_after(value) -> float:
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date) into seconds.
+    Returns None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _header_float(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+# ---------- TOKEN BUCKET ----------
+
+class TokenBucket:
+    """
+    Token bucket with AIMD rate adaptation for one host.
+    """
+
+    def __init__(self, host: str, rate: float, burst: int, min_rate: float, max_rate: float, max_concurrent: int):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Block until a token is available (and any pause is over), then take it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def update(self, response):
+        """
+        Adapt the rate to a response: back off on 429, follow rate-limit headers,
+        otherwise probe for more throughput.
+        """
+        headers = response.headers
+        with self.lock:
+            now = time.monotonic()
+            if response.status_code == 429:
+                retry_after = parse_retry_after(headers.get("Retry-After"))
+                pause = min(retry_after if retry_after is not None else DEFAULT_RETRY_AFTER, MAX_RETRY_AFTER)
+                self.paused_until = max(self.paused_until, now + pause)
+                self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+                self.tokens = 0.0
+                logging.warning(f"Rate limited by {self.host}: pausing {pause:.0f}s, rate now {self.rate:.2f}/s.")
+                return
+
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+            remaining = _header_float(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+            reset = _header_float(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+            if remaining is None or reset is None:
+                return
+            if reset > 1e9:
+                # Epoch timestamp instead of seconds until the reset
+                reset = reset - time.time()
+            if reset > 0:
+                self.rate = min(self.rate, max(self.min_rate, remaining / reset))
+            if remaining < 1:
+                self.paused_until = max(self.paused_until, now + max(reset, 0))
+
+
+def get_bucket(host: str) -> TokenBucket:
+    """
+    Return the process-wide token bucket of a host.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            limit = dict(DEFAULT_HOST_LIMIT)
+            limit.update(HOST_LIMITS.get(host, {}))
+            bucket = TokenBucket(host, **limit)
+            _buckets[host] = bucket
+        return bucket
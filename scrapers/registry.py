@@ -0,0 +1,194 @@
+"""
+Scraper Registry
+
+Maps the "Scraper Name" column of websites.csv to a scrape and save
+implementation plus per-source settings (frequency, cadence, concurrency
+limit, storage key and dedup keys). Adding a source means writing its scrape/save
+functions, registering them once and adding a row to websites.csv.
+"""
+
+import re
+import logging
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, time, timedelta
+from typing import Callable, Optional
+
+import storage
+
+
+# ---------- CONFIGURATION ----------
+
+# Daily sources run once per day, not before this time of day
+DAILY_RUN_TIME = time(11, 0)
+
+# "Updated Frequency" values from websites.csv
+FREQUENCY_INTERVALS = {
+    "hourly": timedelta(hours=1),
+    "multiple times per day": timedelta(hours=6),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+# Explicit cadences from the websites.csv "Cadence" column, e.g. "5 minutes" or "every 1 hour"
+CADENCE_PATTERN = re.compile(r"^(?:every\s+)?(\d+)\s*(s|sec|second|m|min|minute|h|hour|d|day|w|week)s?$")
+CADENCE_UNITS = {
+    "s": "seconds", "sec": "seconds", "second": "seconds",
+    "m": "minutes", "min": "minutes", "minute": "minutes",
+    "h": "hours", "hour": "hours",
+    "d": "days", "day": "days",
+    "w": "weeks", "week": "weeks",
+}
+
+
+@dataclass
+class ScraperSpec:
+    name: str
+    scrape: Callable
+    save: Callable
+    storage_key: str
+    dedup_keys: tuple = ("date",)
+    max_concurrency: int = 1
+    frequency: str = "Daily"
+    # Optional exact run interval (e.g. "5 minutes"); overrides the frequency
+    cadence: str = ""
+    website: str = ""
+    url: str = ""
+    # Optional historical fetcher: backfill(start_date, end_date) -> DataFrame or iterator of
+    # DataFrames (both dates inclusive)
+    backfill: Optional[Callable] = None
+    backfill_chunk_days: int = 30
+
+    @property
+    def interval(self) -> timedelta:
+        return parse_frequency(self.cadence or self.frequency)
+
+
+REGISTRY = {}
+
+# Scraper name -> semaphore of max_concurrency slots, shared by live runs and backfills
+_LIMITS = {}
+_LIMITS_LOCK = threading.Lock()
+
+
+# ---------- REGISTRATION ----------
+
+def register_scraper(name, scrape, save, storage_key, dedup_keys=("date",), max_concurrency=1,
+                     frequency="Daily", cadence="", backfill=None, backfill_chunk_days=30):
+    """
+    Register a scrape/save pair under its websites.csv "Scraper Name".
+
+    The frequency and cadence given here are only defaults; the values in
+    websites.csv win.
+    backfill is an optional range fetcher used by scrapers/backfill.py, which
+    requests backfill_chunk_days days per call.
+    """
+    spec = ScraperSpec(
+        name=name,
+        scrape=scrape,
+        save=save,
+        storage_key=storage_key,
+        dedup_keys=tuple(dedup_keys),
+        max_concurrency=max_concurrency,
+        frequency=frequency,
+        cadence=cadence,
+        backfill=backfill,
+        backfill_chunk_days=backfill_chunk_days,
+    )
+    REGISTRY[name] = spec
+    storage.register_dedup_keys(storage_key, spec.dedup_keys)
+    return spec
+
+
+def parse_frequency(text) -> timedelta:
+    """
+    Convert an "Updated Frequency" value (e.g. "Daily") or a cadence
+    (e.g. "5 minutes") into an interval. Unknown values fall back to daily.
+    """
+    text_key = str(text).strip().lower()
+    interval = FREQUENCY_INTERVALS.get(text_key)
+    match = CADENCE_PATTERN.match(text_key)
+    if interval is None and match and int(match.group(1)) > 0:
+        interval = timedelta(**{CADENCE_UNITS[match.group(2)]: int(match.group(1))})
+    if interval is None:
+        logging.warning(f"Unknown update frequency '{text}', assuming daily.")
+        return FREQUENCY_INTERVALS["daily"]
+    return interval
+
+
+# ---------- LOOKUP ----------
+
+def resolve_sources(websites) -> list:
+    """
+    Resolve each websites.csv row to its registered scraper.
+
+    Args:
+        websites (pd.DataFrame): Output of load_websites_csv().
+
+    Returns:
+        list[ScraperSpec]: One spec per known row, carrying the row's frequency, cadence and URL.
+    """
+    specs = []
+    if websites is None or websites.empty or "Scraper Name" not in websites.columns:
+        return specs
+
+    for row in websites.to_dict(orient="records"):
+        name = str(row.get("Scraper Name", "")).strip()
+        spec = REGISTRY.get(name)
+        if spec is None:
+            logging.warning(f"No scraper registered for '{name}' ({row.get('Website Name')}). Skipping.")
+            continue
+
+        # Blank cells are NaN: fall back to the registered defaults
+        frequency = row.get("Updated Frequency")
+        cadence = row.get("Cadence")
+        specs.append(replace(
+            spec,
+            frequency=frequency.strip() if isinstance(frequency, str) and frequency.strip() else spec.frequency,
+            cadence=cadence.strip() if isinstance(cadence, str) and cadence.strip() else spec.cadence,
+            website=row.get("Website Name", ""),
+            url=row.get("URL", ""),
+        ))
+    return specs
+
+
+def first_run(spec: ScraperSpec, now: datetime) -> datetime:
+    """
+    Due time of a source that has never run: today at DAILY_RUN_TIME for daily
+    (or longer) intervals, immediately for shorter ones.
+    """
+    if spec.interval >= timedelta(days=1):
+        return datetime.combine(now.date(), DAILY_RUN_TIME)
+    return now
+
+
+def next_run_after(spec: ScraperSpec, when: datetime) -> datetime:
+    """
+    Next due time after a successful run at `when`.
+    Daily (or longer) sources move to the next DAILY_RUN_TIME slot.
+    """
+    interval = spec.interval
+    if interval >= timedelta(days=1):
+        slot = datetime.combine(when.date(), DAILY_RUN_TIME)
+        return slot + interval if slot <= when else slot
+    return when + interval
+
+
+def due_time(spec: ScraperSpec, next_due: dict, now: datetime) -> datetime:
+    return next_due.get(spec.name) or first_run(spec, now)
+
+
+def source_limit(name: str) -> threading.BoundedSemaphore:
+    """
+    Return the process-wide limit of concurrent fetches of one source: its
+    max_concurrency (1 for unregistered names). Held around every fetch by
+    scrapers/runner.py and scrapers/backfill.py, so a live run and a
+    backfill of the same source together never exceed it.
+    """
+    with _LIMITS_LOCK:
+        limit = _LIMITS.get(name)
+        if limit is None:
+            spec = REGISTRY.get(name)
+            limit = threading.BoundedSemaphore(max(1, spec.max_concurrency if spec else 1))
+            _LIMITS[name] = limit
+        return limit
@@ -0,0 +1,135 @@
+"""
+Scraper Runner
+
+Runs a list of scrape/save jobs. In concurrent mode all sources are fetched in
+parallel on a thread pool (per-host rate limits are enforced by the shared HTTP
+client, per-source max_concurrency by registry.source_limit()), then the results are saved one after another in job order, so storage
+writes stay deterministic and single-threaded.
+
+A scraper whose source has not changed since the last fetch (HTTP 304 or a
+fresh cached copy) returns not_modified_frame(); such results count as
+successful runs with nothing to save, as do no_new_rows_frame() results of a
+source that was fetched and parsed but had no matching rows (e.g. an hour
+without significant earthquakes). A result whose save raised is marked
+(see save_error()), so callers record the run as failed.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+import metrics
+from scrapers.registry import source_limit
+
+
+# ---------- CONFIGURATION ----------
+
+MAX_WORKERS = 8
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def not_modified_frame() -> pd.DataFrame:
+    """
+    Empty scrape result for a source that has not changed since the last fetch.
+    """
+    df = pd.DataFrame()
+    df.attrs["not_modified"] = True
+    return df
+
+
+def is_not_modified(df: pd.DataFrame) -> bool:
+    return df.empty and df.attrs.get("not_modified", False)
+
+
+def no_new_rows_frame() -> pd.DataFrame:
+    """
+    Empty scrape result for a source that was fetched and parsed fine but had no rows to save.
+    """
+    df = pd.DataFrame()
+    df.attrs["no_new_rows"] = True
+    return df
+
+
+def is_no_new_rows(df: pd.DataFrame) -> bool:
+    return df.empty and df.attrs.get("no_new_rows", False)
+
+
+def save_error(df: pd.DataFrame):
+    """
+    Return the error message if saving this scrape result failed, else None.
+    """
+    return df.attrs.get("save_error")
+
+
+def _safe_scrape(name, scrape) -> pd.DataFrame:
+    try:
+        with source_limit(name), metrics.timer("scrape_seconds", scraper=name):
+            df = scrape()
+    except Exception as e:
+        logging.error(f"Scraper '{name}' failed: {e}")
+        return pd.DataFrame()
+    if df is None:
+        return pd.DataFrame()
+    metrics.inc("rows_parsed_total", len(df), scraper=name)
+    return df
+
+
+def fetch_all(jobs, concurrent=True, max_workers=MAX_WORKERS) -> list:
+    """
+    Run the scrape step of every job.
+
+    Args:
+        jobs (list): (name, scrape_fn, save_fn) tuples.
+        concurrent (bool): Fetch all sources in parallel instead of one after another.
+        max_workers (int): Upper bound for the thread pool size.
+
+    Returns:
+        list: (name, DataFrame) tuples in job order.
+    """
+    if not jobs:
+        return []
+
+    if concurrent and len(jobs) > 1:
+        workers = min(len(jobs), max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper") as pool:
+            futures = [pool.submit(_safe_scrape, name, scrape) for name, scrape, _ in jobs]
+            frames = [future.result() for future in futures]
+    else:
+        frames = [_safe_scrape(name, scrape) for name, scrape, _ in jobs]
+
+    return [(name, df) for (name, _, _), df in zip(jobs, frames)]
+
+
+# ---------- PUBLIC API ----------
+
+def run_jobs(jobs, concurrent=True, max_workers=MAX_WORKERS) -> list:
+    """
+    Fetch all jobs (optionally in parallel) and save the results in job order.
+
+    Returns:
+        list: (name, DataFrame) tuples in job order, including empty results.
+        Results whose save raised carry the error in df.attrs (see save_error()).
+    """
+    results = fetch_all(jobs, concurrent=concurrent, max_workers=max_workers)
+
+    for (name, _, save), (_, df) in zip(jobs, results):
+        if is_not_modified(df):
+            logging.info(f"⏭️ {name}: source unchanged, nothing to save.")
+            continue
+        if is_no_new_rows(df):
+            logging.info(f"⏭️ {name}: no new rows, nothing to save.")
+            continue
+        if df.empty:
+            logging.warning(f"❌ {name}: no data retrieved.")
+            continue
+        try:
+            with metrics.timer("save_seconds", scraper=name):
+                save(df)
+            logging.info(f"✅ {name}: data saved.")
+        except Exception as e:
+            logging.error(f"Saving data for '{name}' failed: {e}")
+            metrics.inc("save_failures_total", scraper=name)
+            df.attrs["save_error"] = str(e) or type(e).__name__
+
+    return results
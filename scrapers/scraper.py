@@ -3,76 +3,41 @@ Scraper Script for Multiple Data Sources
 
 This script loads website metadata, scrapes current data
 (Bitcoin price from CoinGecko, weather from Open-Meteo, and earthquakes from USGS),
-and saves it into CSV files, ensuring there are no duplicate entries for the same date.
+and saves it through the storage writer (HDF5 plus CSV exports in data/, no duplicate records).
 Includes logging and retry logic for robustness.
 """
 
 import sys
 import os
-import time
 import logging
-import requests
 import pandas as pd
 from datetime import datetime, timezone
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 
 # ✅ Add the project root directory to Python path (so imports work no matter where we run it)
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-# ✅ Correct import (your storage.py is at project root)
-from storage import save_to_hdf
-
-# 🧪 Debug: confirm which storage module is loaded
+# ✅ Storage package lives at the project root (loaded lazily, on the first save)
 import storage
-print(f"📂 STORAGE MODULE PATH: {storage.__file__}")
+import metrics
+from scrapers.http_client import fetch
+from scrapers.runner import run_jobs, not_modified_frame, no_new_rows_frame, save_error
+from scrapers.registry import register_scraper, resolve_sources
+from scrapers import usgs
 
 
 # ---------- CONFIGURATION ----------
-DATA_DIR = "../data"
-BITCOIN_CSV = os.path.join(DATA_DIR, "bitcoin.csv")
-METEOSTAT_CSV = os.path.join(DATA_DIR, "meteostat.csv")
-USGS_CSV = os.path.join(DATA_DIR, "usgs.csv")
 
-# Ensure the data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
+# Bitcoin prices are stored at this resolution (the scheduler may poll every minute)
+BITCOIN_RESOLUTION = "1min"
+
+# Time of the last successful USGS fetch (picks the smallest feed that covers the gap)
+_last_usgs_fetch = None
 
-# Ensure logs directory exists and configure logging
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
 LOG_FILE = os.path.join(LOG_DIR, "scraper.log")
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-
-# ---------- HELPER FUNCTIONS ----------
-
-def get_with_retry(url, headers=None, params=None, retries=3, backoff_factor=0.5, timeout=10):
-    session = requests.Session()
-    retry = Retry(
-        total=retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"]
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
-    session.mount("https://", adapter)
-
-    try:
-        response = session.get(url, headers=headers, params=params, timeout=timeout)
-        response.raise_for_status()
-        return response
-    except Exception as e:
-        logging.error(f"Request failed after retries: {e}")
-        return None
 
 
 # ---------- SCRAPER FUNCTIONS ----------
@@ -104,52 +69,48 @@ def load_websites_csv() -> pd.DataFrame:
 
 
 def scrape_coingecko_bitcoin() -> pd.DataFrame:
-    url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-    response = get_with_retry(url)
+    """
+    Fetch the current Bitcoin price. Rows are keyed by 'time' (epoch ms, UTC,
+    floored to BITCOIN_RESOLUTION), so several prices per day can be stored.
+    """
+    url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_last_updated_at=true"
+    response = fetch(url, source="coingecko", if_changed=True)
     if response is None:
         return pd.DataFrame()
-
-    try:
-        data = response.json()
-        price = data["bitcoin"]["usd"]
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        df = pd.DataFrame([{
-            "date": today,
-            "value": price,
-            "source": "CoinGecko - Bitcoin"
-        }])
-        logging.info(f"Bitcoin price (API) retrieved successfully: ${price}")
-        return df
-    except Exception as e:
-        logging.error(f"Error parsing API response: {e}")
-        return pd.DataFrame()
+    if response.not_modified:
+        return not_modified_frame()
+
+    with metrics.timer("parse_seconds", source="coingecko"):
+        try:
+            data = response.json()
+            price = data["bitcoin"]["usd"]
+            updated_at = data["bitcoin"].get("last_updated_at")
+            if updated_at:
+                timestamp = pd.Timestamp(updated_at, unit="s", tz="UTC")
+            else:
+                timestamp = pd.Timestamp(datetime.now(timezone.utc))
+            timestamp = timestamp.floor(BITCOIN_RESOLUTION)
+
+            df = pd.DataFrame([{
+                "date": timestamp.strftime("%Y-%m-%d"),
+                "value": price,
+                "source": "CoinGecko - Bitcoin",
+                "time": timestamp.value // 10**6,
+            }])
+            logging.info(f"Bitcoin price (API) retrieved successfully: ${price}")
+            return df
+        except Exception as e:
+            logging.error(f"Error parsing API response: {e}")
+            return pd.DataFrame()
 
 def save_bitcoin_data(df: pd.DataFrame):
     if df.empty:
         logging.warning("No Bitcoin data to save.")
         return
 
-    # Default: do not save to CSV if today's data exists
-    save_csv = True
-
-    if os.path.exists(BITCOIN_CSV):
-        existing = pd.read_csv(BITCOIN_CSV)
-        if not df.empty and "date" in df.columns and df.iloc[0]["date"] in existing["date"].values:
-            logging.info("Bitcoin data for today's date already exists. Skipping CSV save.")
-            save_csv = False
-
-    if save_csv:
-        df.to_csv(BITCOIN_CSV, mode="a", header=not os.path.exists(BITCOIN_CSV), index=False)
-        logging.info(f"Bitcoin data saved to {BITCOIN_CSV}")
-
-    # ✅ Always attempt to save to HDF5, even if it exists in CSV
-    try:
-        save_to_hdf(df, "bitcoin")
-        logging.info("Bitcoin data also saved to dataset.h5 (HDF5).")
-    except Exception as e:
-        logging.error(f"Error saving Bitcoin data to HDF5: {e}")
-
+    # Buffered and written to HDF5 in bulk (deduplicated by timestamp); new rows go to bitcoin.csv
+    pending = storage.buffer_records(df, "bitcoin")
+    logging.info(f"{len(df)} Bitcoin row(s) buffered ({pending} pending).")
 
 
 def scrape_open_meteo(latitude: float = 52.52, longitude: float = 13.405) -> pd.DataFrame:
@@ -170,135 +131,209 @@ def scrape_open_meteo(latitude: float = 52.52, longitude: float = 13.405) -> pd.
         "current_weather": True
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        if "current_weather" not in data:
-            logging.warning("No current weather data found in Open-Meteo response.")
-            return pd.DataFrame()
-
-        weather = data["current_weather"]
-        df = pd.DataFrame([{
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "temperature": weather.get("temperature"),
-            "wind_speed": weather.get("windspeed"),
-            "weather_code": weather.get("weathercode"),
-            "source": "Open-Meteo API"
-        }])
-
-        logging.info(f"Open-Meteo weather data retrieved: {df.to_dict(orient='records')[0]}")
-        return df
-
-    except Exception as e:
-        logging.error(f"Error fetching Open-Meteo weather data: {e}")
+    response = fetch(url, source="open_meteo", params=params, if_changed=True)
+    if response is None:
+        logging.error("Failed to fetch data from Open-Meteo.")
         return pd.DataFrame()
+    if response.not_modified:
+        logging.info("Open-Meteo weather unchanged since the last fetch.")
+        return not_modified_frame()
+
+    with metrics.timer("parse_seconds", source="open_meteo"):
+        try:
+            data = response.json()
+
+            if "current_weather" not in data:
+                logging.warning("No current weather data found in Open-Meteo response.")
+                return pd.DataFrame()
+
+            weather = data["current_weather"]
+            df = pd.DataFrame([{
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "temperature": weather.get("temperature"),
+                "wind_speed": weather.get("windspeed"),
+                "weather_code": weather.get("weathercode"),
+                "source": "Open-Meteo API"
+            }])
+
+            logging.info(f"Open-Meteo weather data retrieved: {df.to_dict(orient='records')[0]}")
+            return df
+
+        except Exception as e:
+            logging.error(f"Error parsing Open-Meteo weather data: {e}")
+            return pd.DataFrame()
 
 
 def save_open_meteo_data(df: pd.DataFrame):
-    filename = "../data/open_meteo.csv"
-
     if df.empty:
         logging.warning("No Open-Meteo data to save.")
         return
 
-    save_csv = True
-    if os.path.exists(filename):
-        existing = pd.read_csv(filename)
-        if df.iloc[0]["date"] in existing["date"].values:
-            logging.info("Open-Meteo data for today's date already exists. Skipping CSV save.")
-            save_csv = False
-
-    if save_csv:
-        df.to_csv(filename, mode="a", header=not os.path.exists(filename), index=False)
-        logging.info(f"Open-Meteo data saved to {filename}")
-
-    # ✅ Always save to HDF5
-    try:
-        save_to_hdf(df, "weather")
-        logging.info("Open-Meteo data also saved to dataset.h5 (HDF5).")
-    except Exception as e:
-        logging.error(f"Error saving weather data to HDF5: {e}")
-
-
+    pending = storage.buffer_records(df, "weather")
+    logging.info(f"{len(df)} Open-Meteo row(s) buffered ({pending} pending).")
 
 
 def scrape_usgs() -> pd.DataFrame:
     """
     Scrape recent earthquake data from the USGS API.
-    Filters for magnitude >= 2.5 and returns relevant info.
+    Filters for magnitude >= 2.5 and returns the typed event table (see scrapers/usgs.py).
+
+    Polled every few minutes, this reads the small all_hour feed; after a
+    longer pause (or a restart) the day or week feed is used instead.
     """
-    url = "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_day.geojson"
-    response = get_with_retry(url)
+    global _last_usgs_fetch
+    now = datetime.now(timezone.utc)
+    url = usgs.feed_url(now - _last_usgs_fetch if _last_usgs_fetch else None)
+    response = fetch(url, source="usgs", if_changed=True)
     if response is None:
         logging.error("Failed to fetch data from USGS.")
         return pd.DataFrame()
-
-    try:
-        data = response.json()
-        records = []
-
-        for feature in data["features"]:
-            props = feature["properties"]
-            mag = props.get("mag")
-            place = props.get("place")
-            timestamp = props.get("time")
-
-            # Only include earthquakes with magnitude >= 2.5
-            if mag is None or mag < 2.5:
-                continue
-
-            # ✅ Updated timestamp handling (timezone-aware)
-            date_str = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
-
-            records.append({
-                "date": date_str,
-                "value": mag,
-                "place": place,
-                "source": "USGS Earthquake Feed"
-            })
-
-        if not records:
-            logging.info("No significant earthquakes found today.")
+    if response.not_modified:
+        # 304 (or a fresh cached copy): nothing new, skip parsing altogether
+        _last_usgs_fetch = now
+        logging.info("USGS feed unchanged since the last fetch.")
+        return not_modified_frame()
+
+    with metrics.timer("parse_seconds", source="usgs"):
+        try:
+            data = response.json()
+
+            # Typed, columnar table built from the whole features list (magnitude >= 2.5 only)
+            df = usgs.features_to_frame(data["features"])
+            _last_usgs_fetch = now
+
+            if df.empty:
+                # A quiet hour is a successful fetch, not a failure
+                logging.info("No significant earthquakes found in the feed.")
+                return no_new_rows_frame()
+
+            logging.info(f"{len(df)} earthquake(s) parsed from USGS.")
+            return df
+
+        except Exception as e:
+            logging.error(f"Error parsing USGS data: {e}")
             return pd.DataFrame()
 
-        df = pd.DataFrame(records)
-        logging.info(f"{len(df)} earthquake(s) parsed from USGS.")
-        return df
-
-    except Exception as e:
-        logging.error(f"Error parsing USGS data: {e}")
-        return pd.DataFrame()
-
 
 def save_usgs_data(df: pd.DataFrame):
     if df.empty:
         logging.warning("No USGS data to save.")
         return
 
-    if os.path.exists(USGS_CSV):
-        existing = pd.read_csv(USGS_CSV)
-        df = df[~df.apply(lambda row: ((existing["date"] == row["date"]) & (existing["place"] == row["place"])).any(), axis=1)]
+    # Duplicates are checked per event id against the HDF5 key index when the buffer is flushed
+    pending = storage.buffer_records(df, "earthquakes")
+    logging.info(f"{len(df)} USGS record(s) buffered ({pending} pending).")
 
-        if df.empty:
-            logging.info("All USGS records already exist. Skipping save.")
-            return
 
-    df.to_csv(USGS_CSV, mode="a", header=not os.path.exists(USGS_CSV), index=False)
-    logging.info(f"USGS data saved to {USGS_CSV}")
+# ---------- HISTORICAL (RANGE) FETCHERS ----------
 
-    # Keep also in HDF5
-    try:
-        save_to_hdf(df, "earthquakes")
-        logging.info("USGS data also saved to dataset.h5 (HDF5).")
-    except Exception as e:
-        logging.error(f"Error saving earthquake data to HDF5: {e}")
+def fetch_bitcoin_range(start_date, end_date) -> pd.DataFrame:
+    """
+    Fetch daily Bitcoin prices for a date range (inclusive) in one CoinGecko call.
+    The first price of each UTC day is used, like the /history endpoint.
+    """
+    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range"
+    start = pd.Timestamp(start_date, tz="UTC")
+    end = pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=1)
+    params = {"vs_currency": "usd", "from": int(start.timestamp()), "to": int(end.timestamp())}
+
+    response = fetch(url, source="coingecko", params=params)
+    if response is None:
+        return pd.DataFrame()
+
+    prices = pd.DataFrame(response.json().get("prices", []), columns=["time", "value"])
+    if prices.empty:
+        return pd.DataFrame()
+
+    timestamps = pd.to_datetime(prices["time"], unit="ms", utc=True).dt.floor(BITCOIN_RESOLUTION)
+    prices["time"] = timestamps.astype("int64") // 10**6
+    prices["date"] = timestamps.dt.strftime("%Y-%m-%d")
+    df = prices.groupby("date", as_index=False)[["value", "time"]].first()
+    df["source"] = "CoinGecko - Bitcoin"
+    return df[["date", "value", "source", "time"]]
+
+
+def fetch_open_meteo_range(start_date, end_date, latitude: float = 52.52, longitude: float = 13.405) -> pd.DataFrame:
+    """
+    Fetch historical weather for a date range (inclusive) from the Open-Meteo archive.
+    Uses the 12:00 (Berlin time) hourly values of each day.
+    """
+    url = "https://archive-api.open-meteo.com/v1/archive"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": pd.Timestamp(start_date).strftime("%Y-%m-%d"),
+        "end_date": pd.Timestamp(end_date).strftime("%Y-%m-%d"),
+        "hourly": "temperature_2m,windspeed_10m,weathercode",
+        "timezone": "Europe/Berlin"
+    }
+
+    response = fetch(url, source="open_meteo_archive", params=params)
+    if response is None:
+        return pd.DataFrame()
+
+    hourly = pd.DataFrame(response.json().get("hourly", {}))
+    if hourly.empty:
+        return pd.DataFrame()
+
+    noon = hourly[hourly["time"].str.endswith("T12:00")].dropna(subset=["temperature_2m"])
+    return pd.DataFrame({
+        "date": noon["time"].str[:10],
+        "temperature": noon["temperature_2m"],
+        "wind_speed": noon["windspeed_10m"],
+        "weather_code": noon["weathercode"],
+        "source": "Open-Meteo API"
+    }).reset_index(drop=True)
+
+
+def fetch_usgs_range(start_date, end_date):
+    """
+    Fetch all events with magnitude >= 2.5 for a date range (inclusive) from the
+    USGS FDSN event service. The response is parsed as a stream and returned as
+    an iterator of batches of usgs.BATCH_SIZE events (see usgs.stream_feed), so
+    a long range is never held in memory at once.
+    """
+    url = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+    params = {
+        "format": "geojson",
+        "starttime": pd.Timestamp(start_date).strftime("%Y-%m-%d"),
+        "endtime": (pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+        "minmagnitude": usgs.MIN_MAGNITUDE,
+        "orderby": "time-asc",
+    }
+
+    return usgs.stream_feed(url, params)
+
+
+# ---------- REGISTRY ----------
+
+register_scraper("scrape_coingecko_bitcoin", scrape_coingecko_bitcoin, save_bitcoin_data,
+                 storage_key="bitcoin", dedup_keys=("time",), cadence="1 minute",
+                 backfill=fetch_bitcoin_range, backfill_chunk_days=90)
+register_scraper("scrape_open_meteo", scrape_open_meteo, save_open_meteo_data,
+                 storage_key="weather", dedup_keys=("date",), max_concurrency=2,
+                 backfill=fetch_open_meteo_range, backfill_chunk_days=90)
+register_scraper("scrape_usgs", scrape_usgs, save_usgs_data,
+                 storage_key="earthquakes", dedup_keys=("id",), max_concurrency=4, cadence="5 minutes",
+                 backfill=fetch_usgs_range, backfill_chunk_days=14)
 
 
 # ---------- MAIN EXECUTION ----------
 
-def main():
+def setup_logging():
+    """
+    Log to logs/scraper.log. Only done when run as a script: when imported
+    (e.g. by the scheduler), the importer's logging setup is kept.
+    """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+def main(concurrent: bool = True):
     try:
         websites = load_websites_csv()
         print("Websites loaded successfully:\n")
@@ -307,32 +342,22 @@ def main():
         print("Could not load websites.csv.")
         return
 
-    # CoinGecko
-    df_btc = scrape_coingecko_bitcoin()
-    if not df_btc.empty:
-        print(f"\nBitcoin price scraped ({df_btc.iloc[0]['date']}): ${df_btc.iloc[0]['value']:,.2f}")
-    else:
-        print("\nBitcoin price not available.")
-    save_bitcoin_data(df_btc)
-    time.sleep(1)
-
-    # Open-Meteo
-    print("\nWeather data from Open-Meteo:")
-    df_weather = scrape_open_meteo()
-    if not df_weather.empty:
-        print(df_weather.to_string(index=False))
-    else:
-        print("No weather data available.")
-    save_open_meteo_data(df_weather)
-
-    # USGS
-    print("\nEarthquake data from USGS:")
-    df_usgs = scrape_usgs()
-    if not df_usgs.empty:
-        print(df_usgs.head().to_string(index=False))
-    else:
-        print("No significant earthquake data found.")
-    save_usgs_data(df_usgs)
+    # Fetch all sources (in parallel unless concurrent=False), then save in websites.csv order
+    specs = resolve_sources(websites)
+    jobs = [(spec.name, spec.scrape, spec.save) for spec in specs]
+    results = run_jobs(jobs, concurrent=concurrent)
+    storage.flush_all()
+    metrics.write_metrics("scraper")
+
+    for spec, (_, df) in zip(specs, results):
+        print(f"\n{spec.website} ({spec.name}):")
+        if save_error(df):
+            print(f"❌ Saving failed: {save_error(df)}")
+        if not df.empty:
+            print(df.head().to_string(index=False))
+        else:
+            print("No data available.")
 
 if __name__ == "__main__":
-    main()
+    setup_logging()
+    main(concurrent="--sequential" not in sys.argv)
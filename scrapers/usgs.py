@@ -0,0 +1,223 @@
+"""
+USGS Earthquake Schema
+
+Builds the typed, columnar earthquake table from GeoJSON features:
+the event id is the record key, times are int64 epoch milliseconds,
+coordinates/depth/magnitude are float32, and repetitive strings
+(place, network, magnitude type) are categorical.
+
+Columns are extracted in one pass per field and filtered with vectorized
+operations instead of building a Python dict per feature. Large feeds can be
+ingested in streaming mode: features are parsed while the body downloads and
+handed to storage in fixed-size batches.
+"""
+
+import logging
+import hashlib
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+from scrapers.http_client import fetch, count_bytes
+from scrapers.json_stream import iter_array_items, CHUNK_SIZE
+
+
+# ---------- SCHEMA ----------
+
+SOURCE_NAME = "USGS Earthquake Feed"
+MIN_MAGNITUDE = 2.5
+
+# Live summary feeds, smallest first, with the time span each one covers
+FEED_URL = "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/{}.geojson"
+FEEDS = [
+    ("all_hour", timedelta(hours=1)),
+    ("all_day", timedelta(days=1)),
+    ("all_week", timedelta(weeks=1)),
+]
+# Safety overlap when picking a feed (events are deduplicated by id)
+FEED_MARGIN = timedelta(minutes=5)
+
+# Rows per batch handed to storage in streaming mode
+BATCH_SIZE = 5000
+
+# Column order of the stored table ('value' is the magnitude, kept for the plots)
+COLUMNS = [
+    "id", "date", "time", "value", "mag_type", "place",
+    "latitude", "longitude", "depth", "net", "source",
+]
+
+DTYPES = {
+    "id": object,
+    "date": object,
+    "time": "int64",
+    "value": "float32",
+    "mag_type": "category",
+    "place": "category",
+    "latitude": "float32",
+    "longitude": "float32",
+    "depth": "float32",
+    "net": "category",
+    "source": object,
+}
+
+# GeoJSON property -> column
+PROPERTY_FIELDS = {
+    "mag": "value",
+    "time": "time",
+    "place": "place",
+    "magType": "mag_type",
+    "net": "net",
+}
+
+
+# ---------- BUILDERS ----------
+
+def empty_frame() -> pd.DataFrame:
+    """
+    Return an empty earthquake table with the typed schema.
+    """
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in DTYPES.items()})[COLUMNS]
+
+
+def feed_url(since_last_fetch=None) -> str:
+    """
+    Return the smallest summary feed that covers the time since the last fetch.
+
+    Args:
+        since_last_fetch (timedelta): Time since the last successful fetch
+            (None if unknown, e.g. right after a restart: the daily feed is used).
+    """
+    if since_last_fetch is None:
+        return FEED_URL.format("all_day")
+    for name, span in FEEDS:
+        if since_last_fetch + FEED_MARGIN <= span:
+            return FEED_URL.format(name)
+    return FEED_URL.format(FEEDS[-1][0])
+
+
+def features_to_frame(features, min_magnitude: float = MIN_MAGNITUDE) -> pd.DataFrame:
+    """
+    Convert a list of GeoJSON features into the typed earthquake table.
+
+    Args:
+        features (list): GeoJSON feature objects (as parsed from the feed).
+        min_magnitude (float): Events below this magnitude (or without one) are dropped.
+
+    Returns:
+        pd.DataFrame: One row per event, columns as in COLUMNS.
+    """
+    if not features:
+        return empty_frame()
+
+    props = pd.DataFrame.from_records(
+        [feature.get("properties") or {} for feature in features],
+        columns=list(PROPERTY_FIELDS),
+    ).rename(columns=PROPERTY_FIELDS)
+
+    coords = pd.DataFrame(
+        [(feature.get("geometry") or {}).get("coordinates") or [] for feature in features]
+    ).reindex(columns=range(3))
+
+    ids = pd.Series([feature.get("id") for feature in features], dtype=object)
+
+    magnitude = pd.to_numeric(props["value"], errors="coerce")
+    event_time = pd.to_numeric(props["time"], errors="coerce")
+    keep = ((magnitude >= min_magnitude) & event_time.notna() & ids.notna()).to_numpy()
+    if not keep.any():
+        return empty_frame()
+
+    event_time = event_time[keep].astype("int64").to_numpy()
+
+    df = pd.DataFrame({
+        "id": ids[keep].to_numpy(),
+        "date": pd.to_datetime(event_time, unit="ms", utc=True).strftime("%Y-%m-%d"),
+        "time": event_time,
+        "value": magnitude[keep].to_numpy(dtype=np.float32),
+        "mag_type": props["mag_type"][keep].to_numpy(),
+        "place": props["place"][keep].to_numpy(),
+        "latitude": coords[1][keep].to_numpy(dtype=np.float32),
+        "longitude": coords[0][keep].to_numpy(dtype=np.float32),
+        "depth": coords[2][keep].to_numpy(dtype=np.float32),
+        "net": props["net"][keep].to_numpy(),
+        "source": SOURCE_NAME,
+    })
+    return df.astype(DTYPES)[COLUMNS]
+
+
+def upgrade_legacy_records(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bring rows stored before the typed schema (date, value, place, source)
+    into the current schema.
+
+    Legacy rows have no event id or exact time: they get a stable synthetic id
+    ('legacy-' + hash of date and place) and the start of their day as time.
+    Missing coordinates stay NaN.
+    """
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    df = df[dates.notna()].reindex(columns=COLUMNS)
+    dates = dates[dates.notna()]
+    df["id"] = df["id"].astype(object)
+
+    missing_id = df["id"].isna()
+    if missing_id.any():
+        keys = dates[missing_id].dt.strftime("%Y-%m-%d").fillna("") + "|" + df.loc[missing_id, "place"].astype(str)
+        df.loc[missing_id, "id"] = keys.map(lambda k: "legacy-" + hashlib.sha1(k.encode("utf-8")).hexdigest()[:12])
+
+    missing_time = df["time"].isna()
+    df.loc[missing_time, "time"] = dates[missing_time].to_numpy(dtype="datetime64[ms]").astype("int64")
+
+    df["date"] = dates.dt.strftime("%Y-%m-%d")
+    df["source"] = df["source"].fillna(SOURCE_NAME)
+    return df.astype(DTYPES)[COLUMNS]
+
+
+# ---------- STREAMING INGEST ----------
+
+def iter_feature_batches(response, batch_size: int = BATCH_SIZE, min_magnitude: float = MIN_MAGNITUDE):
+    """
+    Parse the features of a streamed GeoJSON response incrementally.
+
+    Events below min_magnitude are dropped while reading, and the rest are
+    yielded as typed DataFrames of at most batch_size rows.
+    """
+    batch = []
+    for feature in iter_array_items(count_bytes(response.iter_content(CHUNK_SIZE), "usgs"), "features"):
+        mag = (feature.get("properties") or {}).get("mag")
+        if mag is None or mag < min_magnitude:
+            continue
+        batch.append(feature)
+        if len(batch) >= batch_size:
+            yield features_to_frame(batch, min_magnitude)
+            batch = []
+    if batch:
+        yield features_to_frame(batch, min_magnitude)
+
+
+def stream_feed(url: str, params=None, batch_size: int = BATCH_SIZE, min_magnitude: float = MIN_MAGNITUDE):
+    """
+    Stream a USGS GeoJSON feed or FDSN query and yield its events in batches.
+
+    The body is parsed while it downloads, so only one batch is in memory at a
+    time; hand each batch to storage as it arrives (scrapers/backfill.py does).
+
+    Args:
+        url (str): Feed or query URL.
+        params (dict): Optional query parameters (starttime, endtime, ...).
+
+    Yields:
+        pd.DataFrame: Typed event tables of at most batch_size rows.
+    """
+    response = fetch(url, source="usgs", params=params, stream=True)
+    if response is None:
+        logging.error(f"Failed to fetch USGS feed {url}.")
+        return
+
+    total = 0
+    try:
+        for df in iter_feature_batches(response, batch_size, min_magnitude):
+            total += len(df)
+            yield df
+    finally:
+        response.close()
+
+    logging.info(f"{total} earthquake(s) streamed from {url}.")
@@ -0,0 +1,46 @@
+"""
+Backfill missing data for a date range.
+
+Detects the dates without stored data for each source and fetches them with
+the sources' range endpoints (replaces the old hard-coded recover_missing_data.py).
+
+Usage:
+    python scripts/backfill.py --start 2025-10-29 --end 2025-10-30
+    python scripts/backfill.py --start 2025-01-01 --sources scrape_usgs --dry-run
+"""
+
+import os
+import sys
+import argparse
+from datetime import date, timedelta
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scrapers.scraper import load_websites_csv
+from scrapers.registry import resolve_sources
+from scrapers.backfill import run_backfill
+import metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill missing data from the sources' history APIs.")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="First date (YYYY-MM-DD).")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=1),
+                        help="Last date, inclusive (default: yesterday).")
+    parser.add_argument("--sources", nargs="*", help="Scraper names or storage keys (default: all).")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the planned chunks.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    specs = resolve_sources(load_websites_csv())
+    if args.sources:
+        specs = [s for s in specs if s.name in args.sources or s.storage_key in args.sources]
+
+    print(f"📅 Backfilling {args.start} .. {args.end}")
+    run_backfill(specs, args.start, args.end, dry_run=args.dry_run)
+    if not args.dry_run:
+        print(f"📈 Metrics written to {metrics.write_metrics('backfill')}")
+    print("\n🎉 Done.")
@@ -1,22 +1,51 @@
+"""
+Incremental backups of data/dataset.h5 (see storage/backup.py).
+
+Usage:
+    python scripts/backup_hdf5.py                      # new snapshot + retention
+    python scripts/backup_hdf5.py --list
+    python scripts/backup_hdf5.py --restore --at "2025-11-01 16:00"
+    python scripts/backup_hdf5.py --restore 2025-11-01T16-40-45 --output restored.h5
+"""
+
 import os
-import shutil
+import sys
+import argparse
 from datetime import datetime
 
-# Resolve project root path based on this script's location
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from storage.backup import create_backup, list_backups, find_backup, restore_backup, prune_backups
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incremental, deduplicated backups of the HDF5 dataset.")
+    parser.add_argument("--list", action="store_true", help="List the snapshots.")
+    parser.add_argument("--restore", nargs="?", const="", metavar="SNAPSHOT",
+                        help="Restore a snapshot (default: the newest, or the one selected by --at).")
+    parser.add_argument("--at", type=datetime.fromisoformat,
+                        help="Restore the state at this time (YYYY-MM-DD[ HH:MM]).")
+    parser.add_argument("--output", help="Restore into this file instead of over data/dataset.h5.")
+    parser.add_argument("--no-prune", action="store_true", help="Keep snapshots outside the retention policy.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
 
-# Define source and destination paths
-source = os.path.join(BASE_DIR, "data", "dataset.h5")
-timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-backup_dir = os.path.join(BASE_DIR, "backups")
-backup_path = os.path.join(backup_dir, f"dataset_backup_{timestamp}.h5")
+    if args.list:
+        for name in list_backups():
+            print(name)
 
-# Ensure backup directory exists
-os.makedirs(backup_dir, exist_ok=True)
+    elif args.restore is not None:
+        name = args.restore or find_backup(args.at)
+        if name is None:
+            print("❌ No backup found for that time.")
+            sys.exit(1)
+        restore_backup(name, args.output)
 
-# Copy file
-if os.path.exists(source):
-    shutil.copy2(source, backup_path)
-    print(f"✅ Backup created at: {backup_path}")
-else:
-    print(f"❌ Backup failed — source file not found at: {source}")
+    else:
+        create_backup()
+        if not args.no_prune:
+            prune_backups()
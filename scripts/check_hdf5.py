@@ -1,26 +1,75 @@
+"""
+Inspect the stored data of each source.
+
+Usage:
+    python scripts/check_hdf5.py                              # row counts + last week of every key
+    python scripts/check_hdf5.py earthquakes --start 2025-10-01 --end 2025-10-07 --columns date value
+    python scripts/check_hdf5.py earthquakes --where "value>=4.5"
+"""
+
 import os
+import re
+import sys
+import argparse
+from datetime import date, timedelta
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
 import pandas as pd
-from pandas.io.pytables import HDFStore
+from storage import HDF5_FILE, query, stored_nrows
+from storage.query import resolve_source
+from storage.locking import dataset_lock
+
+FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$")
+
+
+def parse_filter(text: str) -> tuple:
+    """
+    'value>=4.5' -> ('value', ('>=', 4.5))
+    """
+    match = FILTER_PATTERN.match(text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid filter: {text!r} (expected e.g. value>=4.5)")
+    column, op, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        value = value.strip("'\"")
+    return column, (op, value)
 
-# Absolute path to dataset
-hdf5_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "dataset.h5"))
 
-print("📁 HDF5 File Content:")
-store = HDFStore(hdf5_path)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Show what is stored for each source.")
+    parser.add_argument("keys", nargs="*", help="Keys or source names (default: all keys in dataset.h5).")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today() - timedelta(days=7),
+                        help="First date (default: a week ago).")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last date, inclusive.")
+    parser.add_argument("--columns", nargs="*", help="Columns to show.")
+    parser.add_argument("--where", nargs="*", type=parse_filter, default=[], help="Filters such as value>=4.5.")
+    parser.add_argument("--rows", type=int, default=5, help="Rows to print per key.")
+    return parser.parse_args()
 
-print(f"<{type(store)}>")
-print(f"File path: {hdf5_path}\n")
 
-# List all keys
-keys = store.keys()
-print("🔑 Available HDF5 keys:")
-print(keys, "\n")
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"📁 HDF5 file: {HDF5_FILE}\n")
 
-# Show preview for each key
-for key in keys:
-    df = store[key]
-    print(f"🔑 {key} — total rows: {len(df)}")
-    print(df.head(5).to_string(index=False))
-    print("-" * 50)
+    keys = [resolve_source(key) for key in args.keys]
+    if not keys:
+        if not os.path.exists(HDF5_FILE):
+            print("❌ No dataset found.")
+            sys.exit(1)
+        with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
+            keys = [k.lstrip("/") for k in store.keys()]
 
-store.close()
+    for key in keys:
+        try:
+            df = query(key, start=args.start, end=args.end, columns=args.columns, filters=dict(args.where))
+        except KeyError as e:
+            print(f"❌ {key}: {e.args[0]}")
+            print("-" * 50)
+            continue
+        print(f"🔑 {key} — total rows: {stored_nrows(key)}, matching {args.start} .. {args.end or 'today'}: {len(df)}")
+        print(df.tail(args.rows).to_string(index=False))
+        print("-" * 50)
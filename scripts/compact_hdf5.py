@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from storage import compact_hdf
+
+# Usage: python scripts/compact_hdf5.py [key]
+key = sys.argv[1] if len(sys.argv) > 1 else None
+compact_hdf(key)
+print("✅ Compaction finished.")
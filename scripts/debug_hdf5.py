@@ -1,13 +1,36 @@
+"""
+Print the layout of every HDF5 key (format, indexed data columns, row count)
+and the rows stored for yesterday and today, read through the query API.
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
 import pandas as pd
+from storage import HDF5_FILE, query
+from storage.locking import dataset_lock
 
-# Path to your HDF5 file
-file_path = "../data/dataset.h5"
+if not os.path.exists(HDF5_FILE):
+    print(f"❌ HDF5 file not found at: {HDF5_FILE}")
+    sys.exit(1)
 
-with pd.HDFStore(file_path, mode='r') as store:
+with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
     print("\n🔍 HDF5 Keys:")
     print(store.keys())
     print()
-
+    layouts = {}
     for key in store.keys():
-        print(f"📄 Preview of '{key}':")
-        print(store[key].head(), "\n")
+        storer = store.get_storer(key)
+        layouts[key.lstrip("/")] = (
+            "table" if getattr(storer, "is_table", False) else "fixed",
+            getattr(storer, "data_columns", None) or [],
+            storer.nrows,
+        )
+
+for key, (fmt, data_columns, nrows) in layouts.items():
+    print(f"📄 '{key}': {fmt} format, {nrows} rows, data columns: {data_columns}")
+    print(query(key, start=date.today() - timedelta(days=1)).head(), "\n")
@@ -0,0 +1,107 @@
+"""
+Check the import time of the entry modules against a budget.
+
+Every module is imported in a fresh interpreter with `python -X importtime`
+(best of --runs runs, since the first one also pays for cold disk caches),
+and must stay under its budget in milliseconds without loading any of the
+heavy modules it is meant to defer. Exits with status 1 on any overrun, so
+it can run next to the scheduler deployment.
+
+Usage:
+    python scripts/import_budget.py
+    python scripts/import_budget.py --runs 5 scheduler storage
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+# Project root, where the entry modules are importable from
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# ---------- CONFIGURATION ----------
+
+# Module -> (budget in ms, modules it must not load at import time).
+# pandas alone takes ~0.5 s; the scheduler and scraper need it to read websites.csv.
+BUDGETS = {
+    "metrics": (50, ("pandas",)),
+    "storage": (50, ("pandas", "tables")),
+    "storage.dedup": (50, ("pandas", "tables")),
+    "scrapers.registry": (100, ("pandas", "tables")),
+    "scrapers.job_state": (100, ("pandas", "tables")),
+    "plotting.charts": (50, ("pandas", "matplotlib")),
+    "scrapers.scraper": (1500, ("tables", "matplotlib")),
+    "scheduler": (1500, ("tables", "matplotlib")),
+    "plotting.render": (1500, ("matplotlib",)),
+}
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def measure(module: str) -> tuple:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: (cumulative import time in ms, set of top-level modules loaded).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_us = None
+    loaded = set()
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check entry-module import times against their budgets.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: all): {', '.join(BUDGETS)}.")
+    parser.add_argument("--runs", type=int, default=3, help="Imports per module; the fastest counts (default: 3).")
+    return parser.parse_args()
+
+
+# ---------- MAIN EXECUTION ----------
+
+def main() -> int:
+    args = parse_args()
+    failures = 0
+    for module in args.modules or BUDGETS:
+        budget_ms, deferred = BUDGETS.get(module, (float("inf"), ()))
+        try:
+            runs = [measure(module) for _ in range(max(args.runs, 1))]
+        except RuntimeError as e:
+            failures += 1
+            print(f"❌ {module:<20} import failed: {e}")
+            continue
+        elapsed_ms = min(ms for ms, _ in runs)
+        eager = sorted(set(deferred) & runs[0][1])
+
+        ok = elapsed_ms <= budget_ms and not eager
+        failures += not ok
+        line = f"{'✅' if ok else '❌'} {module:<20} {elapsed_ms:8.1f} ms (budget {budget_ms:g} ms)"
+        if eager:
+            line += f", loads {', '.join(eager)} at import"
+        print(line)
+
+    if failures:
+        print(f"⚠️ {failures} module(s) failed the import budget.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
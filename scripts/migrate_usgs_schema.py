@@ -0,0 +1,54 @@
+"""
+One-off upgrade of stored earthquakes to the typed schema (id, time, coordinates, ...).
+
+Rows written before the typed USGS schema get a synthetic id and the start of
+their day as time (see scrapers.usgs.upgrade_legacy_records). The HDF5 table
+and data/usgs.csv are rewritten under the exclusive dataset lock, each into a
+temp file that is renamed over the original, so an interrupted run leaves the
+old data in place. Running it again is harmless.
+
+Usage:
+    python scripts/migrate_usgs_schema.py
+"""
+
+import os
+import sys
+import pandas as pd
+
+# Make the project root importable when run as a script
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from storage.hdf5 import HDF5_FILE, _prepare, _replace_keys, _rebuild_coverage
+from storage.locking import dataset_lock
+from storage.key_index import reset_key_index
+from storage.csv_store import load_export_state, save_export_state
+from scrapers.usgs import upgrade_legacy_records
+
+KEY = "earthquakes"
+USGS_CSV = os.path.join(ROOT_DIR, "data", "usgs.csv")
+
+
+with dataset_lock():
+    if os.path.exists(USGS_CSV):
+        df = upgrade_legacy_records(pd.read_csv(USGS_CSV)).drop_duplicates(subset="id", keep="last")
+        tmp_path = USGS_CSV + ".tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, USGS_CSV)
+        print(f"✅ {USGS_CSV} upgraded: {len(df)} rows.")
+
+    upgraded = None
+    if os.path.exists(HDF5_FILE):
+        with pd.HDFStore(HDF5_FILE, mode="r") as store:
+            if KEY in store:
+                upgraded = _prepare(upgrade_legacy_records(store[KEY]), KEY)
+                upgraded = upgraded.sort_values("date").reset_index(drop=True)
+
+    if upgraded is not None:
+        _replace_keys({KEY: upgraded})
+        # Ids changed: rebuild the key index, coverage and exports from the new table
+        reset_key_index(f"hdf5_{KEY}")
+        _rebuild_coverage(KEY, upgraded)
+        state = load_export_state()
+        save_export_state({name: (-1 if name.split(":")[-1] == KEY else rows) for name, rows in state.items()})
+        print(f"✅ HDF5 key '{KEY}' upgraded: {len(upgraded)} rows.")
@@ -0,0 +1,69 @@
+"""
+Storage package: the HDF5 dataset (storage.hdf5, the source of truth), the
+CSV exports (storage.csv_store), the single write path that keeps both in
+sync (storage.writer), the write-ahead buffer that batches scraper saves
+(storage.wal), the query API used by every reader (storage.query), the
+daily/weekly aggregates (storage.rollups), the persistent key indexes used
+for deduplication (storage.key_index) and the per-key date coverage bitmaps
+(storage.coverage).
+
+The names below are resolved on first use (PEP 562), so importing the
+package, or a light submodule such as storage.dedup, does not load pandas
+or PyTables until something is actually read or written.
+"""
+
+import sys
+import types
+import importlib
+
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "HDF5_FILE": "storage.hdf5",
+    "DEDUP_KEYS": "storage.dedup",
+    "register_dedup_keys": "storage.dedup",
+    "save_to_hdf": "storage.hdf5",
+    "compact_hdf": "storage.hdf5",
+    "stored_dates": "storage.hdf5",
+    "stored_nrows": "storage.hdf5",
+    "ensure_coverage": "storage.hdf5",
+    "CSV_EXPORTS": "storage.csv_store",
+    "save_records": "storage.writer",
+    "buffer_records": "storage.wal",
+    "flush_all": "storage.wal",
+    "replay": "storage.wal",
+    "query": "storage.query",
+}
+
+# Submodules reachable as attributes (storage.query is the function, not the module)
+_SUBMODULES = ("hdf5", "coverage", "csv_store", "writer", "wal", "rollups", "parquet", "backup",
+               "key_index", "locking", "write_queue", "dedup")
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f"storage.{name}")
+    else:
+        raise AttributeError(f"module 'storage' has no attribute {name!r}")
+    # Cache it, so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing the storage.query submodule must not shadow the query() function
+        if name == "query" and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,404 @@
+"""
+Incremental Backups
+
+Backups of data/dataset.h5 are stored as content-addressed chunks plus one
+small manifest per snapshot:
+
+    backups/chunks/<ab>/<sha256>.csv.gz    compressed block of CHUNK_ROWS rows of one key
+    backups/snapshots/<timestamp>.json     keys, dtypes and the chunk list of each key
+
+Tables are cut into chunks by row position. Appends only add rows at the end,
+so the full chunks of the previous snapshot are reused as they are: only the
+rows from the last backed-up full chunk onwards are read, hashed and written,
+so a backup costs the rows added since the last one, not the dataset size.
+A rewrite of dataset.h5 (compaction, migration, restore) replaces the file;
+it is detected by its inode and by re-hashing the last reused chunk, and the
+key is then read and stored again once.
+
+Snapshots are thinned out by a retention policy (all of the last day, then
+one per day, week and month) and chunks no snapshot refers to are removed.
+Any snapshot can be restored, either over dataset.h5 or into another file.
+
+Creating and pruning backups hold backups/.lock exclusively, so a prune never
+deletes chunks a backup in progress has reused but not yet recorded.
+"""
+
+import os
+import io
+import gzip
+import json
+import hashlib
+import logging
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from storage import parquet
+from storage.hdf5 import HDF5_FILE, _write_table, _prepare, _rebuild_coverage
+from storage.locking import dataset_lock
+from storage.key_index import reset_key_index
+from storage.csv_store import load_export_state, save_export_state
+from storage.writer import rebuild_exports
+
+
+# ---------- CONFIGURATION ----------
+
+BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backups"))
+CHUNK_DIR = os.path.join(BACKUP_DIR, "chunks")
+SNAPSHOT_DIR = os.path.join(BACKUP_DIR, "snapshots")
+LOCK_FILE = os.path.join(BACKUP_DIR, ".lock")
+
+CHUNK_ROWS = 10_000
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H-%M-%S"
+
+# Retention: keep every snapshot of the last KEEP_ALL_HOURS, then the newest
+# snapshot per day, ISO week and month for the given number of periods
+KEEP_ALL_HOURS = 24
+KEEP_DAILY = 14
+KEEP_WEEKLY = 8
+KEEP_MONTHLY = 12
+
+
+@contextmanager
+def _backup_lock():
+    """
+    Hold the backup store lock (exclusive) while snapshots or chunks change.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    with open(LOCK_FILE, "a+") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+# ---------- CHUNK STORE ----------
+
+def _chunk_path(digest: str) -> str:
+    return os.path.join(CHUNK_DIR, digest[:2], f"{digest}.csv.gz")
+
+
+def _serialize(df: pd.DataFrame) -> tuple:
+    """
+    Returns:
+        tuple: (CSV bytes of a block of rows, their sha256).
+    """
+    payload = df.to_csv(index=False).encode("utf-8")
+    return payload, hashlib.sha256(payload).hexdigest()
+
+
+def _write_chunk(df: pd.DataFrame) -> tuple:
+    """
+    Store one block of rows unless an identical block is already stored.
+
+    Returns:
+        tuple: (sha256 of the block, True if it was written now).
+    """
+    payload, digest = _serialize(df)
+    path = _chunk_path(digest)
+    if os.path.exists(path):
+        return digest, False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        # mtime=0 keeps the compressed bytes reproducible
+        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+            gz.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return digest, True
+
+
+def _read_chunk(digest: str) -> pd.DataFrame:
+    with gzip.open(_chunk_path(digest), "rb") as f:
+        return pd.read_csv(io.BytesIO(f.read()))
+
+
+def _restore_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        try:
+            if dtype.startswith("datetime64"):
+                df[col] = pd.to_datetime(df[col])
+            else:
+                df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError):
+            logging.warning(f"Could not restore dtype {dtype} of column '{col}'.")
+    return df
+
+
+# ---------- SNAPSHOTS ----------
+
+def _snapshot_path(name: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{name}.json")
+
+
+def _load_snapshot(name: str) -> dict:
+    with open(_snapshot_path(name), "r") as f:
+        return json.load(f)
+
+
+def list_backups() -> list:
+    """
+    Return the snapshot names (creation timestamps), oldest first.
+    """
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(SNAPSHOT_DIR) if name.endswith(".json"))
+
+
+def _snapshot_time(name: str) -> datetime:
+    # Snapshots taken within the same second get a '.NN' counter suffix
+    return datetime.strptime(name.split(".")[0], TIMESTAMP_FORMAT)
+
+
+def _save_snapshot(name: str, snapshot: dict) -> str:
+    """
+    Write a snapshot manifest under a name not used yet ('<name>', '<name>.01', ...).
+
+    Returns:
+        str: The name it was stored under.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_path = os.path.join(SNAPSHOT_DIR, f".{name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f, indent=1)
+    try:
+        candidate, counter = name, 0
+        while True:
+            try:
+                # link() never replaces an existing manifest, even with concurrent backups
+                os.link(tmp_path, _snapshot_path(candidate))
+                return candidate
+            except FileExistsError:
+                counter += 1
+                candidate = f"{name}.{counter:02d}"
+    finally:
+        os.remove(tmp_path)
+
+
+def _reused_chunks(store: pd.HDFStore, key: str, previous: dict, nrows: int) -> list:
+    """
+    Return the full chunks of the previous snapshot of a key that are still
+    the first rows of the table (empty if the table was rewritten since).
+    """
+    if not previous or nrows < previous["nrows"]:
+        return []
+    full = previous["nrows"] // CHUNK_ROWS
+    if full == 0:
+        return []
+    # Appends never change earlier rows; a rewrite that kept the row count shows in the last chunk
+    probe = store.select(key, start=(full - 1) * CHUNK_ROWS, stop=full * CHUNK_ROWS)
+    if _serialize(probe)[1] != previous["chunks"][full - 1]:
+        return []
+    return previous["chunks"][:full]
+
+
+def create_backup(now: datetime = None) -> str:
+    """
+    Snapshot every key of dataset.h5, reading only the rows added since the
+    previous snapshot (see the module docstring) and storing only new chunks.
+
+    Returns:
+        str: Name of the new snapshot (None if there is no dataset).
+    """
+    if not os.path.exists(HDF5_FILE):
+        print(f"❌ Backup failed — source file not found at: {HDF5_FILE}")
+        return None
+
+    # Held until the manifest lands: a prune must not delete the chunks reused below
+    with _backup_lock():
+        return _create_backup(now or datetime.now())
+
+
+def _create_backup(now: datetime) -> str:
+    names = list_backups()
+    previous = _load_snapshot(names[-1]) if names else {}
+    snapshot = {"created": now.isoformat(timespec="seconds"), "keys": {}}
+    new_chunks, new_bytes, read_rows = 0, 0, 0
+
+    # Shared lock: writers wait, so the snapshot is consistent across keys
+    with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
+        # Rewrites replace dataset.h5 (temp-file-and-rename), appends keep the inode
+        snapshot["inode"] = os.stat(HDF5_FILE).st_ino
+        same_file = previous.get("inode") == snapshot["inode"]
+        for key in [k.lstrip("/") for k in store.keys()]:
+            storer = store.get_storer(key)
+            is_table = getattr(storer, "is_table", False)
+            whole = None if is_table else store[key]
+            nrows = int(storer.nrows) if is_table else len(whole)
+
+            chunks, dtypes = [], None
+            last = previous.get("keys", {}).get(key) if same_file and is_table else None
+            reused = _reused_chunks(store, key, last, nrows) if last else []
+            if reused:
+                chunks, dtypes = list(reused), last["dtypes"]
+            for start in range(len(chunks) * CHUNK_ROWS, nrows, CHUNK_ROWS):
+                if is_table:
+                    block = store.select(key, start=start, stop=start + CHUNK_ROWS)
+                else:
+                    block = whole.iloc[start:start + CHUNK_ROWS]
+                read_rows += len(block)
+                if dtypes is None:
+                    dtypes = {col: str(dtype) for col, dtype in block.dtypes.items()}
+                digest, written = _write_chunk(block)
+                chunks.append(digest)
+                if written:
+                    new_chunks += 1
+                    new_bytes += os.path.getsize(_chunk_path(digest))
+
+            snapshot["keys"][key] = {"nrows": nrows, "dtypes": dtypes or {}, "chunks": chunks}
+
+    name = _save_snapshot(now.strftime(TIMESTAMP_FORMAT), snapshot)
+
+    total_rows = sum(entry["nrows"] for entry in snapshot["keys"].values())
+    print(f"✅ Backup {name}: {len(snapshot['keys'])} key(s), {total_rows} rows ({read_rows} read), "
+          f"{new_chunks} new chunk(s) ({new_bytes / 1024:.1f} KiB).")
+    return name
+
+
+def find_backup(at: datetime = None) -> str:
+    """
+    Return the newest snapshot taken at or before `at` (default: the newest one).
+    """
+    names = [n for n in list_backups() if at is None or _snapshot_time(n) <= at]
+    return names[-1] if names else None
+
+
+def load_backup(name: str) -> dict:
+    """
+    Read the tables of a snapshot.
+
+    Returns:
+        dict: {key: DataFrame}
+    """
+    frames = {}
+    for key, entry in _load_snapshot(name)["keys"].items():
+        blocks = [_read_chunk(digest) for digest in entry["chunks"]]
+        df = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(columns=list(entry["dtypes"]))
+        frames[key] = _restore_dtypes(df, entry["dtypes"])
+    return frames
+
+
+def restore_backup(name: str, target: str = None) -> str:
+    """
+    Restore a snapshot into `target` (default: over dataset.h5).
+
+    Restoring over the live dataset happens under the exclusive dataset lock
+    with temp-file-and-rename. The sidecar indexes are reset and the exports
+    (CSV, rollups, Parquet mirror) are rebuilt from the restored tables right
+    away, so no reader sees data the restore removed.
+
+    Returns:
+        str: Path of the restored file.
+    """
+    frames = {key: _prepare(df, key) for key, df in load_backup(name).items()}
+    target = os.path.abspath(target or HDF5_FILE)
+    in_place = target == HDF5_FILE
+
+    with dataset_lock() if in_place else nullcontext():
+        tmp_path = target + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with pd.HDFStore(tmp_path, mode="w") as store:
+            for key, df in frames.items():
+                _write_table(store, key, df)
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+
+        if in_place:
+            for key, df in frames.items():
+                reset_key_index(f"hdf5_{key}")
+                _rebuild_coverage(key, df)
+            # Exports of keys the snapshot does not have: -1 never matches a row count,
+            # so they are rebuilt on the next save; their Parquet mirror goes now
+            state = load_export_state()
+            stale = {export.split(":")[-1] for export in state} - set(frames)
+            save_export_state({export: -1 for export in state})
+            for key in stale:
+                if parquet.has_dataset(key):
+                    parquet.rebuild_parquet(pd.DataFrame(), key)
+            rebuild_exports(list(frames))
+
+    print(f"✅ Restored backup {name} ({', '.join(f'{k}: {len(v)} rows' for k, v in frames.items())}) to {target}")
+    return target
+
+
+# ---------- RETENTION ----------
+
+def _retained(names: list, now: datetime) -> set:
+    """
+    Apply the retention policy to snapshot names (newest snapshot per period wins).
+    """
+    keep = set(names[-1:])
+    periods = [
+        (lambda t: t.date(), timedelta(days=KEEP_DAILY)),
+        (lambda t: t.isocalendar()[:2], timedelta(weeks=KEEP_WEEKLY)),
+        (lambda t: (t.year, t.month), timedelta(days=31 * KEEP_MONTHLY)),
+    ]
+    seen = [set() for _ in periods]
+    for name in reversed(names):
+        created = _snapshot_time(name)
+        age = now - created
+        if age <= timedelta(hours=KEEP_ALL_HOURS):
+            keep.add(name)
+        for (period_of, horizon), periods_seen in zip(periods, seen):
+            period = period_of(created)
+            if age <= horizon and period not in periods_seen:
+                periods_seen.add(period)
+                keep.add(name)
+    return keep
+
+
+def prune_backups(now: datetime = None, dry_run: bool = False) -> list:
+    """
+    Delete the snapshots outside the retention policy, then the chunks that
+    no remaining snapshot refers to.
+
+    Returns:
+        list: Names of the deleted snapshots.
+    """
+    with _backup_lock():
+        return _prune_backups(now or datetime.now(), dry_run)
+
+
+def _prune_backups(now: datetime, dry_run: bool) -> list:
+    names = list_backups()
+    keep = _retained(names, now)
+    deleted = [name for name in names if name not in keep]
+    if dry_run:
+        return deleted
+
+    for name in deleted:
+        os.remove(_snapshot_path(name))
+
+    referenced = set()
+    for name in keep:
+        for entry in _load_snapshot(name)["keys"].values():
+            referenced.update(entry["chunks"])
+
+    freed = 0
+    if os.path.isdir(CHUNK_DIR):
+        for prefix in os.listdir(CHUNK_DIR):
+            folder = os.path.join(CHUNK_DIR, prefix)
+            for filename in os.listdir(folder):
+                if filename.endswith(".csv.gz") and filename.split(".")[0] not in referenced:
+                    path = os.path.join(folder, filename)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+
+    print(f"🧹 Pruned {len(deleted)} snapshot(s), freed {freed / 1024:.1f} KiB.")
+    return deleted
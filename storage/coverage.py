@@ -0,0 +1,168 @@
+"""
+Date Coverage Index
+
+Keeps one bitmap per storage key with a bit for every calendar day that has
+at least one stored row (bit i = origin + i days). The bitmaps live in
+data/.index/coverage.json and are updated by save_to_hdf, so checking a
+window of days for gaps never touches the datasets and costs the same no
+matter how much history is stored.
+
+Like the key index, each bitmap remembers the row count of its table and is
+rebuilt from the stored dates if the table was changed behind its back.
+"""
+
+import os
+import json
+import base64
+import logging
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+
+# ---------- CONFIGURATION ----------
+
+COVERAGE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", ".index", "coverage.json"))
+
+_lock = threading.Lock()
+_coverage = None
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _load() -> dict:
+    global _coverage
+    if _coverage is None:
+        try:
+            with open(COVERAGE_FILE, "r") as f:
+                raw = json.load(f)
+            _coverage = {
+                key: {
+                    "origin": date.fromisoformat(entry["origin"]) if entry["origin"] else None,
+                    "bits": bytearray(base64.b64decode(entry["bits"])),
+                    "nrows": entry.get("nrows"),
+                }
+                for key, entry in raw.items()
+            }
+        except (OSError, ValueError, KeyError):
+            _coverage = {}
+    return _coverage
+
+
+def _save():
+    raw = {
+        key: {
+            "origin": entry["origin"].isoformat() if entry["origin"] else None,
+            "bits": base64.b64encode(bytes(entry["bits"])).decode("ascii"),
+            "nrows": entry["nrows"],
+        }
+        for key, entry in _coverage.items()
+    }
+    os.makedirs(os.path.dirname(COVERAGE_FILE), exist_ok=True)
+    tmp_path = COVERAGE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(raw, f)
+    os.replace(tmp_path, COVERAGE_FILE)
+
+
+def _set_days(entry: dict, days):
+    days = sorted(set(days))
+    if not days:
+        return
+    origin = entry["origin"]
+    if origin is None or days[0] < origin:
+        # Extend the bitmap to the left in whole bytes so existing bits keep their position
+        new_origin = days[0]
+        if origin is not None:
+            shift_bytes = ((origin - new_origin).days + 7) // 8
+            new_origin = origin - timedelta(days=shift_bytes * 8)
+            entry["bits"] = bytearray(shift_bytes) + entry["bits"]
+        entry["origin"] = origin = new_origin
+
+    for day in days:
+        offset = (day - origin).days
+        byte, bit = divmod(offset, 8)
+        if byte >= len(entry["bits"]):
+            entry["bits"].extend(bytearray(byte - len(entry["bits"]) + 1))
+        entry["bits"][byte] |= 1 << bit
+
+
+def _has_day(entry: dict, day: date) -> bool:
+    if entry["origin"] is None or day < entry["origin"]:
+        return False
+    byte, bit = divmod((day - entry["origin"]).days, 8)
+    return byte < len(entry["bits"]) and bool(entry["bits"][byte] & (1 << bit))
+
+
+def _to_days(dates) -> list:
+    return list(pd.to_datetime(pd.Series(dates), errors="coerce").dropna().dt.date.unique())
+
+
+# ---------- PUBLIC API ----------
+
+def mark_dates(key: str, dates, nrows: int, previous_nrows: int):
+    """
+    Record the dates of newly written rows and the new row count of the table.
+
+    The bitmap is only updated incrementally if it matched the table before the
+    write (previous_nrows); otherwise it is left stale and rebuilt on next use.
+    """
+    with _lock:
+        coverage = _load()
+        entry = coverage.get(key)
+        if entry is None and previous_nrows == 0:
+            entry = coverage[key] = {"origin": None, "bits": bytearray(), "nrows": 0}
+        if entry is None or entry["nrows"] != int(previous_nrows):
+            return
+        _set_days(entry, _to_days(dates))
+        entry["nrows"] = int(nrows)
+        _save()
+
+
+def rebuild(key: str, dates, nrows: int):
+    """
+    Replace the bitmap of a key with the given stored dates.
+    """
+    with _lock:
+        coverage = _load()
+        entry = {"origin": None, "bits": bytearray(), "nrows": int(nrows)}
+        _set_days(entry, _to_days(dates))
+        coverage[key] = entry
+        _save()
+        logging.info(f"Coverage index for '{key}' rebuilt ({nrows} rows).")
+
+
+def is_current(key: str, nrows: int) -> bool:
+    """
+    True if the bitmap of a key was last updated for a table with nrows rows.
+    """
+    with _lock:
+        entry = _load().get(key)
+        return entry is not None and entry["nrows"] == int(nrows)
+
+
+def first_date(key: str):
+    """
+    Return the first covered date of a key (None if nothing is stored).
+    """
+    with _lock:
+        entry = _load().get(key)
+        if not entry or entry["origin"] is None:
+            return None
+        for byte, value in enumerate(entry["bits"]):
+            if value:
+                bit = (value & -value).bit_length() - 1
+                return entry["origin"] + timedelta(days=byte * 8 + bit)
+        return None
+
+
+def missing_dates(key: str, start: date, end: date) -> list:
+    """
+    Return the dates in [start, end] (inclusive) without stored rows.
+    Costs one bit test per day of the window.
+    """
+    with _lock:
+        entry = _load().get(key) or {"origin": None, "bits": bytearray()}
+        days = (end - start).days + 1
+        return [start + timedelta(days=i) for i in range(days) if not _has_day(entry, start + timedelta(days=i))]
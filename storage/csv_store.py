@@ -0,0 +1,81 @@
+"""
+CSV Export
+
+The CSV files in data/ are exports of the HDF5 dataset, which is the source
+of truth. New rows are appended after they were written to HDF5, so the
+export never has to be read or deduplicated. Each export remembers how many
+HDF5 rows it covers (data/.index/exports.json); an export that fell
+behind (e.g. the process died between the two writes, or the table was
+compacted) is rewritten once from HDF5.
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+
+
+# ---------- CONFIGURATION ----------
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+EXPORTS_FILE = os.path.join(DATA_DIR, ".index", "exports.json")
+
+# HDF5 key -> CSV export
+CSV_EXPORTS = {
+    "bitcoin": os.path.join(DATA_DIR, "bitcoin.csv"),
+    "weather": os.path.join(DATA_DIR, "open_meteo.csv"),
+    "earthquakes": os.path.join(DATA_DIR, "usgs.csv"),
+}
+
+
+# ---------- EXPORT STATE ----------
+
+def load_export_state() -> dict:
+    """
+    Return {export name: HDF5 row count covered by that export}.
+    """
+    try:
+        with open(EXPORTS_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_export_state(state: dict):
+    os.makedirs(os.path.dirname(EXPORTS_FILE), exist_ok=True)
+    tmp_path = EXPORTS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, EXPORTS_FILE)
+
+
+# ---------- WRITING ----------
+
+def append_to_csv(df: pd.DataFrame, csv_path: str):
+    """
+    Append rows to a CSV export, keeping the column order of its header.
+    If the rows bring new columns, the file is rewritten once with a wider header.
+    """
+    exists = os.path.exists(csv_path)
+    if exists:
+        header = list(pd.read_csv(csv_path, nrows=0).columns)
+        added = [c for c in df.columns if c not in header]
+        if added:
+            print(f"🔧 Adding columns {added} to {os.path.basename(csv_path)}.")
+            header = header + added
+            pd.read_csv(csv_path).reindex(columns=header).to_csv(csv_path, index=False)
+        df = df.reindex(columns=header)
+
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    df.to_csv(csv_path, mode="a", header=not exists, index=False)
+
+
+def export_csv(df: pd.DataFrame, csv_path: str):
+    """
+    Rewrite a CSV export in full (temp file + rename).
+    """
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    tmp_path = csv_path + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, csv_path)
+    logging.info(f"CSV export {csv_path} rewritten ({len(df)} rows).")
@@ -0,0 +1,27 @@
+"""
+Dedup Keys
+
+Columns that identify a unique record, per storage key. Kept in a module of
+their own, free of pandas and PyTables, so the scraper registry can register
+them at import time without loading the HDF5 layer.
+"""
+
+
+# ---------- CONFIGURATION ----------
+
+# Columns that identify a unique record, per HDF5 key (the scraper registry may override these)
+DEFAULT_DEDUP_KEYS = ["date"]
+DEDUP_KEYS = {
+    "bitcoin": ["time"],
+    "weather": ["date"],
+    "earthquakes": ["id"],
+}
+
+
+# ---------- PUBLIC API ----------
+
+def register_dedup_keys(key: str, columns):
+    """
+    Set the columns used to deduplicate rows stored under an HDF5 key.
+    """
+    DEDUP_KEYS[key] = list(columns)
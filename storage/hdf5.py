@@ -0,0 +1,349 @@
+import pandas as pd
+import os
+import time
+import tables
+import logging
+
+import metrics
+
+from storage import coverage
+from storage.dedup import DEDUP_KEYS, DEFAULT_DEDUP_KEYS
+from storage.key_index import get_key_index, hash_keys, reset_key_index
+from storage.locking import dataset_lock
+
+# Disable BLOSC2 compression to avoid compatibility issues
+tables.parameters.BLOSC2_ENABLED = False
+
+# Absolute path to the HDF5 file
+HDF5_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "dataset.h5"))
+
+# Minimum width reserved for string columns, so later appends with longer values still fit
+DEFAULT_MIN_ITEMSIZE = 32
+MIN_ITEMSIZE = {
+    "place": 128,
+    "source": 48,
+}
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _dedup_keys(key: str, df: pd.DataFrame) -> list:
+    keys = [c for c in DEDUP_KEYS.get(key, DEFAULT_DEDUP_KEYS) if c in df.columns]
+    return keys or list(df.columns)
+
+
+def _prepare(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Normalise a batch before writing: datetime 'date' column, plain strings
+    instead of categoricals (HDF5 tables cannot append differing categories),
+    int64 epoch-ms 'time' keys, no duplicates inside the batch. Rows with
+    missing dedup keys are kept.
+    """
+    df = df.copy()
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    else:
+        print("⚠️ WARNING: 'date' column not found in the DataFrame!")
+
+    dedup_keys = _dedup_keys(key, df)
+    if "time" in dedup_keys and "date" in df.columns and df["time"].isna().any():
+        # Rows from before timestamp keys (day resolution) stand for the start of their day
+        day_start = df["date"].astype("datetime64[ms]").astype("int64")
+        df["time"] = df["time"].fillna(day_start.where(df["date"].notna()))
+    if "time" in df.columns and df["time"].notna().all():
+        df["time"] = df["time"].astype("int64")
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+
+    has_key = df[dedup_keys].notna().all(axis=1)
+    if has_key.all():
+        return df.drop_duplicates(subset=dedup_keys, keep="last")
+    return pd.concat([df[has_key].drop_duplicates(subset=dedup_keys, keep="last"), df[~has_key]])
+
+
+def _min_itemsize(df: pd.DataFrame) -> dict:
+    sizes = {}
+    for col in df.columns:
+        if df[col].dtype == object:
+            longest = int(df[col].astype(str).str.len().max()) if len(df) else 0
+            sizes[col] = max(MIN_ITEMSIZE.get(col, DEFAULT_MIN_ITEMSIZE), longest)
+    return sizes
+
+
+def _index_columns(key: str, df: pd.DataFrame) -> list:
+    cols = ["date"] if "date" in df.columns else []
+    return cols + [c for c in _dedup_keys(key, df) if c not in cols]
+
+
+def _stored_columns(store: pd.HDFStore, key: str) -> list:
+    storer = store.get_storer(key)
+    return list(storer.non_index_axes[0][1]) if storer.non_index_axes else []
+
+
+def _aligned(store: pd.HDFStore, key: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return df in the stored column order, with numeric and datetime columns
+    cast to the stored dtypes (e.g. float32 batches into a float64 table), so
+    a batch in a newer schema can still be appended to an older table.
+    """
+    df = df[_stored_columns(store, key)]
+    stored = store.select(key, stop=0).dtypes
+    casts = {
+        col: dtype for col, dtype in stored.items()
+        if dtype != df[col].dtype and dtype != object and df[col].dtype != object
+    }
+    return df.astype(casts) if casts else df
+
+
+def _is_appendable(store: pd.HDFStore, key: str, df: pd.DataFrame) -> bool:
+    """
+    True if the stored table can take a plain append of df: table format,
+    same columns, the dedup/date columns stored as indexed data columns and
+    string columns wide enough for the batch.
+    """
+    storer = store.get_storer(key)
+    if not getattr(storer, "is_table", False):
+        return False
+    data_columns = set(storer.data_columns or [])
+    return (
+        set(df.columns) == set(_stored_columns(store, key))
+        and set(_index_columns(key, df)) <= data_columns
+        and _strings_fit(storer, df)
+    )
+
+
+def _strings_fit(storer, df: pd.DataFrame) -> bool:
+    """
+    True if every string column of df fits the width reserved for it in the stored table.
+    """
+    coldtypes = storer.table.coldtypes
+    for col in df.columns:
+        dtype = coldtypes.get(col)
+        if dtype is None or dtype.kind != "S" or df[col].dtype != object or df.empty:
+            continue
+        longest = df[col].dropna().astype(str).str.encode("utf-8").str.len().max()
+        if pd.notna(longest) and longest > dtype.itemsize:
+            return False
+    return True
+
+
+def _load_key_index(store: pd.HDFStore, key: str, dedup_keys: list):
+    """
+    Return the persistent key index of a stored table (rebuilt if the row count changed).
+    """
+    nrows = int(store.get_storer(key).nrows) if key in store else 0
+
+    def rebuild():
+        return store.select(key, columns=dedup_keys) if key in store else None
+
+    return get_key_index(f"hdf5_{key}", dedup_keys).load(nrows, rebuild)
+
+
+def _write_table(store: pd.HDFStore, key: str, df: pd.DataFrame):
+    """
+    (Re)write a whole key as an appendable table with indexed data columns.
+    """
+    store.put(key, df, format="table", data_columns=True, min_itemsize=_min_itemsize(df), index=False)
+    store.create_table_index(key, columns=_index_columns(key, df), optlevel=9, kind="full")
+
+
+def _compacted(store: pd.HDFStore, key: str, new_data: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Return the stored rows of a key merged with new_data: deduplicated and sorted by date.
+    """
+    existing = store[key] if key in store else pd.DataFrame()
+    combined = pd.concat([existing, new_data], ignore_index=True) if new_data is not None else existing
+    combined = _prepare(combined, key)
+    if "date" in combined.columns:
+        combined = combined.sort_values("date", na_position="last")
+    return combined.reset_index(drop=True)
+
+
+def _replace_keys(frames: dict):
+    """
+    Rewrite whole keys without touching dataset.h5 in place: the other keys are
+    copied node by node (with their indexes) into a temp file, the given keys
+    are written fresh, and the temp file is renamed over the dataset. A crash
+    leaves either the old or the new file, never a half-rewritten one.
+    Must be called with the dataset lock held.
+    """
+    tmp_path = HDF5_FILE + ".tmp"
+    if os.path.exists(HDF5_FILE):
+        with tables.open_file(HDF5_FILE, "r") as src, tables.open_file(tmp_path, "w") as dst:
+            for node in src.root._f_iter_nodes():
+                if node._v_name not in frames:
+                    node._f_copy(dst.root, recursive=True, propindexes=True)
+    with pd.HDFStore(tmp_path, mode="a") as store:
+        for key, df in frames.items():
+            _write_table(store, key, df)
+    with open(tmp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, HDF5_FILE)
+
+
+def _record_write(key: str, received: int, written: pd.DataFrame, started: float):
+    metrics.observe("hdf5_write_seconds", time.perf_counter() - started, key=key)
+    metrics.inc("rows_written_total", len(written), key=key)
+    metrics.inc("rows_deduped_total", received - len(written), key=key)
+
+
+def _rebuild_coverage(key: str, df: pd.DataFrame):
+    if "date" in df.columns:
+        coverage.rebuild(key, df["date"], len(df))
+
+
+# ---------- PUBLIC API ----------
+
+def save_to_hdf(new_data: pd.DataFrame, key: str):
+    """
+    Append new rows to the HDF5 file under the given key.
+
+    Rows whose dedup keys (registered per key, 'date' by default) are already
+    stored are skipped. They are checked against a persistent hashed key index
+    (see storage.key_index), so the cost of a save depends on the batch size,
+    not on the dataset size.
+    Tables in an older layout (missing columns or indexes, string columns too
+    narrow for the batch) are migrated once with an explicit full compaction;
+    otherwise the batch is cast to the stored dtypes and appended. An append
+    that still fails raises instead of rewriting the file.
+    The whole save runs under the exclusive dataset lock; full rewrites are
+    committed with temp-file-and-rename.
+
+    Returns:
+        pd.DataFrame: The rows that were actually written (prepared, in stored column order).
+    """
+    started = time.perf_counter()
+    try:
+        received = len(new_data)
+        new_data = _prepare(new_data, key)
+
+        with dataset_lock():
+            with pd.HDFStore(HDF5_FILE, mode="a") as store:
+                if key in store and not _is_appendable(store, key, new_data):
+                    print(f"🔧 Migrating key '{key}' to an appendable, indexed table.")
+                    dedup_keys = _dedup_keys(key, new_data)
+                    existing = _prepare(store[key], key)
+                    if set(dedup_keys) <= set(existing.columns):
+                        stored = pd.Index(hash_keys(existing, dedup_keys))
+                        new_data = new_data[~pd.Index(hash_keys(new_data, dedup_keys)).isin(stored)]
+                    rewrite = _compacted(store, key, new_data)
+                    migrated = True
+                else:
+                    migrated = False
+                    previous_nrows = int(store.get_storer(key).nrows) if key in store else 0
+
+                    # O(1) duplicate check per row against the persistent key index
+                    index = _load_key_index(store, key, _dedup_keys(key, new_data))
+                    new_data = index.filter_new(new_data)
+
+                    if new_data.empty:
+                        logging.debug(f"All {received} row(s) already stored under key '{key}'.")
+                        _record_write(key, received, new_data, started)
+                        return new_data
+
+                    if key not in store:
+                        _write_table(store, key, new_data.reset_index(drop=True))
+                    else:
+                        new_data = _aligned(store, key, new_data)
+                        store.append(key, new_data, format="table", data_columns=True, index=False)
+
+            if migrated:
+                _replace_keys({key: rewrite})
+                _rebuild_coverage(key, rewrite)
+                logging.info(f"Key '{key}' migrated; it now has {len(rewrite)} rows.")
+                written = new_data[[c for c in rewrite.columns if c in new_data.columns]]
+                _record_write(key, received, written, started)
+                return written
+
+            nrows = stored_nrows(key)
+            index.add(new_data, nrows)
+            if "date" in new_data.columns:
+                coverage.mark_dates(key, new_data["date"], nrows, previous_nrows)
+
+        logging.debug(f"Appended {len(new_data)} of {received} row(s) under key '{key}'.")
+        _record_write(key, received, new_data, started)
+        return new_data
+
+    except Exception as e:
+        print(f"❌ ERROR saving to HDF5 under key '{key}': {e}")
+        logging.error(f"Error saving to HDF5: {e}")
+        raise
+
+
+def stored_dates(key: str, start=None, end=None) -> set:
+    """
+    Return the set of calendar dates that have at least one row under a key.
+    Only the 'date' column is read, restricted to [start, end] when given.
+    """
+    if not os.path.exists(HDF5_FILE):
+        return set()
+
+    with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
+        if key not in store:
+            return set()
+        storer = store.get_storer(key)
+        if getattr(storer, "is_table", False) and "date" in (storer.data_columns or []):
+            conditions = []
+            if start is not None:
+                lo = pd.Timestamp(start)
+                conditions.append("date >= lo")
+            if end is not None:
+                hi = pd.Timestamp(end) + pd.Timedelta(days=1)
+                conditions.append("date < hi")
+            dates = store.select(key, where=" & ".join(conditions) or None, columns=["date"])["date"]
+        else:
+            dates = store[key]["date"]
+
+    return set(pd.to_datetime(dates, errors="coerce").dropna().dt.date)
+
+
+def stored_nrows(key: str) -> int:
+    """
+    Return the number of rows stored under a key (0 if missing). Reads metadata only.
+    """
+    if not os.path.exists(HDF5_FILE):
+        return 0
+    with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
+        return int(store.get_storer(key).nrows) if key in store else 0
+
+
+def ensure_coverage(key: str):
+    """
+    Make sure the date coverage bitmap of a key matches the stored table.
+    Only the table's row count is read unless the bitmap has to be rebuilt.
+    """
+    nrows = stored_nrows(key)
+    if not coverage.is_current(key, nrows):
+        coverage.rebuild(key, list(stored_dates(key)), nrows)
+
+
+def compact_hdf(key: str = None):
+    """
+    Rewrite one key (or all keys) in full: merge, deduplicate, sort by date and rebuild indexes.
+    Appends keep arrival order, so run this when sorted storage is needed. The
+    rewritten file replaces dataset.h5 atomically, which also reclaims free space.
+    """
+    if not os.path.exists(HDF5_FILE):
+        print("📁 HDF5 file does not exist. Nothing to compact.")
+        return
+
+    with dataset_lock():
+        frames = {}
+        with pd.HDFStore(HDF5_FILE, mode="r") as store:
+            keys = [key] if key else [k.lstrip("/") for k in store.keys()]
+            for k in keys:
+                if k not in store:
+                    print(f"⚠️ Key '{k}' not found in HDF5.")
+                    continue
+                frames[k] = _compacted(store, k)
+
+        if frames:
+            # One rewrite of the file for all keys
+            _replace_keys(frames)
+        for k, combined in frames.items():
+            # Dropped duplicates can leave the row count unchanged: never trust the old sidecars
+            reset_key_index(f"hdf5_{k}")
+            _rebuild_coverage(k, combined)
+            print(f"✅ Compacted key '{k}': {len(combined)} rows.")
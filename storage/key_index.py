@@ -0,0 +1,180 @@
+"""
+Persistent Hashed Key Index
+
+Keeps the 64-bit hashes of the dedup keys of every stored record in a small
+sidecar file (data/.index/<name>.u64). Duplicate checks then become hash-set
+lookups (O(1) per record) instead of scans over the stored data.
+
+In memory, the hashes read at load time sit in a hashed pd.Index (built
+once) and the hashes added since in a Python set. A save only appends its
+hashes to the file and the set, so its cost depends on the batch size, not
+on the index size; the set is folded into the Index once it outgrows it.
+
+Each index remembers a fingerprint of the data it describes (row count for
+HDF5 tables, file size for CSV files). If the fingerprint no longer matches,
+e.g. after a compaction or an external edit, the index is rebuilt once from
+the data itself.
+"""
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+
+# ---------- CONFIGURATION ----------
+
+INDEX_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", ".index"))
+
+# Hashes added since load are kept in a set until it is larger than this and the Index
+FOLD_MIN = 100_000
+
+_indexes = {}
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _normalise_column(series: pd.Series) -> pd.Series:
+    """
+    Bring a key column into a canonical form, so '2025-10-20' (CSV) and
+    Timestamp('2025-10-20') (HDF5), or 1760918400000 and 1760918400000.0,
+    hash to the same value.
+    """
+    if series.name == "date" or pd.api.types.is_datetime64_any_dtype(series):
+        dates = pd.to_datetime(series, errors="coerce")
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        return dates.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        # Integer keys read back as floats (e.g. a CSV column with gaps)
+        return series.astype("Int64").astype(str)
+    return series.astype(str)
+
+
+def hash_keys(df: pd.DataFrame, columns) -> np.ndarray:
+    """
+    Hash the key columns of every row to a uint64 (vectorized).
+    """
+    keys = pd.DataFrame({col: _normalise_column(df[col]) for col in columns})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+# ---------- KEY INDEX ----------
+
+class KeyIndex:
+    """
+    Set of record-key hashes for one dataset, persisted next to the data.
+    """
+
+    def __init__(self, name: str, columns):
+        self.name = name
+        self.columns = list(columns)
+        self.hash_path = os.path.join(INDEX_DIR, f"{name}.u64")
+        self.meta_path = os.path.join(INDEX_DIR, f"{name}.json")
+        self._hashes = None
+        self._added = set()
+        self.fingerprint = None
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, fingerprint):
+        self.fingerprint = fingerprint
+        with open(self.meta_path, "w") as f:
+            json.dump({"columns": self.columns, "fingerprint": fingerprint, "size": len(self)}, f)
+
+    def __len__(self) -> int:
+        return (len(self._hashes) if self._hashes is not None else 0) + len(self._added)
+
+    def load(self, fingerprint, rebuild):
+        """
+        Load the index from disk, or rebuild it if it is missing or stale.
+
+        Args:
+            fingerprint: Cheap description of the current data (row count, file size, ...).
+            rebuild (callable): Returns a DataFrame with the key columns of all stored rows.
+        """
+        if self._hashes is not None and self.fingerprint == fingerprint:
+            return self
+
+        meta = self._read_meta()
+        if (
+            os.path.exists(self.hash_path)
+            and meta.get("columns") == self.columns
+            and meta.get("fingerprint") == fingerprint
+        ):
+            self._hashes = pd.Index(np.fromfile(self.hash_path, dtype=np.uint64))
+            self._added = set()
+            self.fingerprint = fingerprint
+            return self
+
+        logging.info(f"Rebuilding key index '{self.name}' on {self.columns}.")
+        existing = rebuild()
+        if existing is not None and not existing.empty:
+            hashes = np.unique(hash_keys(existing, self.columns))
+        else:
+            hashes = np.empty(0, dtype=np.uint64)
+
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        hashes.tofile(self.hash_path)
+        self._hashes = pd.Index(hashes)
+        self._added = set()
+        self._write_meta(fingerprint)
+        return self
+
+    def filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the rows of df whose keys are not in the index (nor repeated within df).
+        """
+        hashes = hash_keys(df, self.columns)
+        # get_indexer uses the hash table cached on the (unique) index: O(1) per record
+        seen = self._hashes.get_indexer(hashes) != -1
+        if self._added:
+            seen |= np.fromiter((h in self._added for h in hashes.tolist()), dtype=bool, count=len(hashes))
+        last = ~pd.Series(hashes).duplicated(keep="last").to_numpy()
+        return df[~seen & last]
+
+    def add(self, df: pd.DataFrame, fingerprint):
+        """
+        Record the keys of newly written rows (as returned by filter_new) and the
+        new fingerprint of the data.
+        """
+        hashes = hash_keys(df, self.columns)
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        with open(self.hash_path, "ab") as f:
+            hashes.tofile(f)
+        # O(batch): the Index (and its hash table) is left alone
+        self._added.update(hashes.tolist())
+        if len(self._added) > max(len(self._hashes), FOLD_MIN):
+            # Doubling keeps the rebuilds of the Index amortized O(1) per record
+            self._hashes = self._hashes.append(pd.Index(np.fromiter(self._added, dtype=np.uint64)))
+            self._added = set()
+        self._write_meta(fingerprint)
+
+
+def get_key_index(name: str, columns) -> KeyIndex:
+    """
+    Return the process-wide KeyIndex for a dataset (kept in memory between saves).
+    """
+    index = _indexes.get(name)
+    if index is None or index.columns != list(columns):
+        index = KeyIndex(name, columns)
+        _indexes[name] = index
+    return index
+
+
+def reset_key_index(name: str):
+    """
+    Forget a dataset's index (in memory and on disk) after its data was
+    rewritten, so the next load rebuilds it from the data.
+    """
+    _indexes.pop(name, None)
+    for suffix in (".u64", ".json"):
+        path = os.path.join(INDEX_DIR, f"{name}{suffix}")
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,86 @@
+"""
+Dataset Lock
+
+Advisory lock around data/dataset.h5 (data/dataset.h5.lock), shared by every
+process that touches the dataset: scheduler, scraper runs, backfill and the
+maintenance scripts. Writers take it exclusively, readers shared, so nobody
+reads a half-written table and two writers never append at the same time.
+
+The lock is re-entrant per thread: nested calls inside a held lock (e.g. a
+save that reads the row count) reuse the outer lock. On platforms without
+fcntl only the in-process part of the lock is enforced.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# ---------- CONFIGURATION ----------
+
+LOCK_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "dataset.h5.lock"))
+
+LOCK_TIMEOUT = 300      # seconds to wait for the lock before giving up
+POLL_INTERVAL = 0.05
+
+_held = threading.local()
+_thread_lock = threading.RLock()   # without fcntl: at least serialise the threads of this process
+
+
+# ---------- PUBLIC API ----------
+
+@contextmanager
+def dataset_lock(exclusive: bool = True, timeout: float = LOCK_TIMEOUT):
+    """
+    Hold the dataset lock (exclusive for writers, shared for readers).
+
+    Raises:
+        TimeoutError: If the lock could not be acquired within timeout seconds.
+    """
+    if getattr(_held, "depth", 0):
+        _held.depth += 1
+        try:
+            yield
+        finally:
+            _held.depth -= 1
+        return
+
+    if fcntl is None:
+        with _thread_lock:
+            _held.depth = 1
+            try:
+                yield
+            finally:
+                _held.depth = 0
+        return
+
+    os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    deadline = time.monotonic() + timeout
+    with open(LOCK_FILE, "a+") as lock_file:
+        waited = False
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), mode | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Could not lock {LOCK_FILE} within {timeout}s.")
+                if not waited:
+                    logging.info("Waiting for the dataset lock held by another writer...")
+                    waited = True
+                time.sleep(POLL_INTERVAL)
+
+        _held.depth = 1
+        try:
+            yield
+        finally:
+            _held.depth = 0
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
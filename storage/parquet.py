@@ -0,0 +1,193 @@
+"""
+Parquet Storage Backend (optional)
+
+Mirrors every HDF5 key as a Parquet dataset partitioned by source and month:
+
+    data/parquet/source=<key>/month=YYYY-MM/part-<id>.parquet
+
+Readers get predicate pushdown and column projection: a date range only
+opens the month partitions it overlaps, and only the requested columns are
+decoded. Each save adds one small part file per month it touches; a month
+is merged into a single file once it has more than MAX_PARTS_PER_MONTH parts.
+
+pyarrow is imported lazily. Without it the backend is disabled and reads
+fall back to HDF5.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+import pandas as pd
+
+from storage.locking import dataset_lock
+
+
+# ---------- CONFIGURATION ----------
+
+PARQUET_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "parquet"))
+
+# Set to False to stop writing the Parquet mirror
+ENABLED = True
+
+MAX_PARTS_PER_MONTH = 64
+
+_pyarrow = None
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _arrow():
+    """
+    Import pyarrow on first use. Returns (pyarrow, pyarrow.parquet, pyarrow.dataset) or None.
+    """
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            import pyarrow.dataset
+            _pyarrow = (pyarrow, pyarrow.parquet, pyarrow.dataset)
+        except ImportError:
+            logging.info("pyarrow is not installed; the Parquet backend is disabled.")
+            _pyarrow = False
+    return _pyarrow or None
+
+
+def _source_dir(key: str) -> str:
+    return os.path.join(PARQUET_DIR, f"source={key}")
+
+
+def _month_dir(key: str, month: str) -> str:
+    return os.path.join(_source_dir(key), f"month={month}")
+
+
+def _months(df: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y-%m").fillna("unknown")
+
+
+def _write_part(df: pd.DataFrame, directory: str):
+    pa, pq, _ = _arrow()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+    tmp_path = path + ".tmp"
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    # All-missing columns would be typed null and clash with string parts of the same dataset
+    table = table.cast(pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema
+    ]))
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _merge_month(key: str, month: str):
+    """
+    Rewrite the parts of one month partition as a single file.
+    Called by the writer under the exclusive dataset lock, so readers (which
+    take the shared lock) never see the merged part next to the old parts.
+    """
+    _, pq, _ = _arrow()
+    directory = _month_dir(key, month)
+    parts = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+    if len(parts) <= MAX_PARTS_PER_MONTH:
+        return
+    df = pd.concat([pq.read_table(os.path.join(directory, name)).to_pandas() for name in parts], ignore_index=True)
+    _write_part(df, directory)
+    for name in parts:
+        os.remove(os.path.join(directory, name))
+
+
+# ---------- PUBLIC API ----------
+
+def is_enabled() -> bool:
+    return ENABLED and _arrow() is not None
+
+
+def has_dataset(key: str) -> bool:
+    return os.path.isdir(_source_dir(key))
+
+
+def append_parquet(df: pd.DataFrame, key: str):
+    """
+    Add rows (already deduplicated by HDF5) to the month partitions of a key.
+    """
+    if df.empty:
+        return
+    months = _months(df)
+    for month, rows in df.groupby(months):
+        _write_part(rows, _month_dir(key, month))
+        _merge_month(key, month)
+
+
+def rebuild_parquet(df: pd.DataFrame, key: str):
+    """
+    Replace the whole Parquet dataset of a key with df.
+    """
+    directory = _source_dir(key)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    append_parquet(df, key)
+    logging.info(f"Parquet dataset '{key}' rebuilt ({len(df)} rows).")
+
+
+def _expression(ds, pa, conditions):
+    """
+    Build a dataset filter from (column, operator, value) conditions (see storage.query).
+    """
+    expression = None
+    for column, op, value in conditions:
+        field = ds.field(column)
+        if isinstance(value, pd.Timestamp):
+            value = pa.scalar(value.to_pydatetime())
+        if op == "in":
+            condition = field.isin(value)
+        else:
+            condition = {
+                "==": field.__eq__, "!=": field.__ne__, "<": field.__lt__,
+                "<=": field.__le__, ">": field.__gt__, ">=": field.__ge__,
+            }[op](value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_parquet(key: str, start=None, end=None, columns=None, conditions=()) -> pd.DataFrame:
+    """
+    Read a key with partition pruning, column projection and predicate pushdown.
+
+    Args:
+        key (str): Source / HDF5 key (e.g. 'bitcoin').
+        start, end: Optional inclusive date range on the 'date' column.
+        columns (list): Columns to read (all if None).
+        conditions: Further (column, operator, value) filters, see storage.query.
+
+    Returns:
+        pd.DataFrame: Matching rows (empty if the dataset does not exist).
+
+    Raises:
+        KeyError: A column in columns or conditions is not in the dataset.
+    """
+    arrow = _arrow()
+    if arrow is None:
+        return pd.DataFrame(columns=columns)
+    pa, _, ds = arrow
+
+    from storage.query import check_columns  # storage.query imports this module
+    conditions = list(conditions)
+    user_conditions = list(conditions)
+    if start is not None:
+        lo = pd.Timestamp(start)
+        conditions += [("month", ">=", lo.strftime("%Y-%m")), ("date", ">=", lo)]
+    if end is not None:
+        hi = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        conditions += [("month", "<=", pd.Timestamp(end).strftime("%Y-%m")), ("date", "<", hi)]
+
+    # Shared lock: a month merge (under the writer's exclusive lock) is never seen half done
+    with dataset_lock(exclusive=False):
+        if not has_dataset(key):
+            return pd.DataFrame(columns=columns)
+        dataset = ds.dataset(_source_dir(key), format="parquet", partitioning="hive")
+        stored = [c for c in dataset.schema.names if c != "month"]
+        check_columns(key, stored, columns, user_conditions)
+        table = dataset.to_table(columns=list(columns) if columns else stored,
+                                 filter=_expression(ds, pa, conditions))
+    return table.to_pandas()
@@ -0,0 +1,215 @@
+"""
+Query API
+
+One read path for every consumer (plots, inspection scripts, dashboards):
+
+    query("earthquakes", start="2025-10-01", end="2025-10-07",
+          columns=["date", "value"], filters={"value": (">=", 4.5)})
+
+The date range and the filters are pushed down to the storage backend, so
+only the matching rows and the requested columns are read:
+
+- Parquet (if pyarrow is installed): month partitions outside the range are
+  skipped, filters become dataset expressions.
+- HDF5 tables: an HDFStore.select where= clause on the indexed data columns.
+- Older fixed-format HDF5 keys and the CSV exports: read and filtered in memory.
+
+Filters map a column to a value (equality), a list/set/tuple of values
+(membership) or an (operator, value) pair with one of OPERATORS. Unknown
+column names in columns or filters raise a KeyError instead of being ignored.
+"""
+
+import os
+import pandas as pd
+
+from storage import parquet
+from storage.hdf5 import HDF5_FILE, _stored_columns
+from storage.locking import dataset_lock
+from storage.csv_store import CSV_EXPORTS
+
+
+# ---------- CONFIGURATION ----------
+
+OPERATORS = ("==", "!=", "<", "<=", ">", ">=")
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def resolve_source(source: str) -> str:
+    """
+    Return the storage key of a source, given its key ('earthquakes') or the
+    name of its CSV export ('usgs', 'usgs.csv').
+    """
+    if source in CSV_EXPORTS:
+        return source
+    name = os.path.splitext(os.path.basename(source))[0]
+    for key, csv_path in CSV_EXPORTS.items():
+        if os.path.splitext(os.path.basename(csv_path))[0] == name:
+            return key
+    return source
+
+
+def _date_range(start, end) -> tuple:
+    """
+    Inclusive [start, end] dates -> half-open [lo, hi) timestamps.
+    """
+    lo = pd.Timestamp(start) if start is not None else None
+    hi = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) if end is not None else None
+    return lo, hi
+
+
+def _conditions(lo, hi, filters: dict) -> list:
+    """
+    Normalise the date range and filters to (column, operator, value) triples.
+    Lists are kept as values with operator 'in'.
+    """
+    conditions = []
+    if lo is not None:
+        conditions.append(("date", ">=", lo))
+    if hi is not None:
+        conditions.append(("date", "<", hi))
+    for column, condition in (filters or {}).items():
+        if isinstance(condition, tuple) and len(condition) == 2 and condition[0] in OPERATORS:
+            conditions.append((column, condition[0], condition[1]))
+        elif isinstance(condition, (list, set, tuple)):
+            conditions.append((column, "in", list(condition)))
+        else:
+            conditions.append((column, "==", condition))
+    return conditions
+
+
+def check_columns(key: str, available, columns, conditions: list):
+    """
+    Raise a KeyError if a requested column or a filtered column is not stored.
+    """
+    available = list(available)
+    unknown = [c for c in list(columns or []) + [c[0] for c in conditions] if c not in available]
+    if unknown:
+        raise KeyError(f"Unknown column(s) {sorted(set(unknown))} for '{key}' (stored: {available})")
+
+
+def _literal(value) -> str:
+    if isinstance(value, pd.Timestamp):
+        return repr(value.isoformat())
+    return repr(value.item() if hasattr(value, "item") else value)
+
+
+def _where(conditions: list) -> list:
+    """
+    Translate conditions to HDFStore.select where= terms.
+    """
+    terms = []
+    for column, op, value in conditions:
+        if op == "in":
+            terms.append(f"{column} = [{', '.join(_literal(v) for v in value)}]")
+        else:
+            terms.append(f"{column} {op} {_literal(value)}")
+    return terms
+
+
+def _apply(df: pd.DataFrame, conditions: list) -> pd.DataFrame:
+    """
+    Apply conditions in memory (for data that cannot be queried in place).
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in conditions:
+        values = df[column]
+        if column == "date" or isinstance(value, pd.Timestamp):
+            values = pd.to_datetime(values, errors="coerce")
+        if op == "in":
+            mask &= values.isin(value)
+        else:
+            mask &= {
+                "==": values.eq, "!=": values.ne, "<": values.lt,
+                "<=": values.le, ">": values.gt, ">=": values.ge,
+            }[op](value)
+    return df[mask]
+
+
+def _query_hdf5(store: pd.HDFStore, key: str, columns, conditions: list) -> pd.DataFrame:
+    storer = store.get_storer(key)
+    data_columns = set(getattr(storer, "data_columns", None) or [])
+    if getattr(storer, "is_table", False):
+        check_columns(key, _stored_columns(store, key), columns, conditions)
+        pushed = [c for c in conditions if c[0] in data_columns]
+        rest = [c for c in conditions if c[0] not in data_columns]
+        # Columns needed only for in-memory conditions are read and dropped again
+        extra = [c[0] for c in rest if columns and c[0] not in columns]
+        read_columns = columns + extra if columns else None
+        df = store.select(key, where=_where(pushed) or None, columns=read_columns)
+        df = _apply(df, rest) if rest else df
+        return df[columns] if columns else df
+
+    # Older fixed-format key: read in full and filter in memory
+    df = store[key]
+    check_columns(key, df.columns, columns, conditions)
+    df = _apply(df, conditions)
+    return df[columns] if columns else df
+
+
+# ---------- PUBLIC API ----------
+
+def query(source: str, start=None, end=None, columns=None, filters: dict = None) -> pd.DataFrame:
+    """
+    Read the rows of one source within a date range, reading only what is needed.
+
+    Args:
+        source (str): Storage key (e.g. 'earthquakes') or CSV export name (e.g. 'usgs').
+        start, end: Optional inclusive date range on the 'date' column.
+        columns (list): Columns to return (all if None).
+        filters (dict): Optional {column: value | [values] | (operator, value)}.
+
+    Returns:
+        pd.DataFrame: Matching rows (empty if nothing is stored).
+
+    Raises:
+        KeyError: A column in columns or filters is not stored for the source.
+    """
+    key = resolve_source(source)
+    lo, hi = _date_range(start, end)
+    conditions = _conditions(lo, hi, filters)
+
+    # Parquet first (partition pruning + column projection + predicate pushdown)
+    if parquet.is_enabled() and parquet.has_dataset(key):
+        try:
+            df = parquet.read_parquet(key, start, end, columns, _conditions(None, None, filters))
+            print(f"✅ Data loaded from Parquet: {key}")
+            return df
+        except KeyError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error reading Parquet: {e}")
+
+    # Then HDF5 (the source of truth)
+    if os.path.exists(HDF5_FILE):
+        try:
+            with dataset_lock(exclusive=False), pd.HDFStore(HDF5_FILE, mode="r") as store:
+                if key in store:
+                    df = _query_hdf5(store, key, columns, conditions)
+                    print(f"✅ Data loaded from HDF5 key: {key}")
+                    return df
+                print(f"⚠️ Key '{key}' not found in HDF5.")
+        except KeyError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error reading from HDF5: {e}")
+
+    # Fall back to the CSV export
+    csv_path = CSV_EXPORTS.get(key)
+    if csv_path and os.path.exists(csv_path):
+        try:
+            header = list(pd.read_csv(csv_path, nrows=0).columns)
+            check_columns(key, header, columns, conditions)
+            needed = set(columns or header) | {c[0] for c in conditions}
+            df = pd.read_csv(csv_path, usecols=[c for c in header if c in needed])
+            print(f"✅ Data loaded from CSV: {os.path.basename(csv_path)}")
+        except KeyError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Error reading CSV: {e}")
+            return pd.DataFrame()
+        df = _apply(df, conditions)
+        return df[columns] if columns else df
+
+    print("⚠️ No data found.")
+    return pd.DataFrame(columns=columns)
@@ -0,0 +1,245 @@
+"""
+Aggregate Rollups
+
+Daily and weekly aggregates of every source, kept in data/rollups.h5 next to
+the raw dataset (keys '<source>/daily' and '<source>/weekly', one row per
+day or per week starting on Monday):
+
+- every value column: <col>_min, <col>_max, <col>_mean, <col>_sum, <col>_count
+- count: number of raw rows
+- earthquakes: number of quakes per magnitude bucket (MAG_BUCKETS)
+- bitcoin: open/high/low/close of the price (with the times of open and close)
+
+The storage writer updates the rollups with the rows of each write only:
+the aggregates of the touched periods are merged with the partial aggregates
+of the new rows (sums and counts add up, the earliest open and the latest
+close win). Rollups are tracked like an export: if they no longer match the
+raw table (e.g. after a restore), they are rebuilt from it once.
+"""
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from storage.hdf5 import HDF5_FILE, stored_nrows
+from storage.locking import dataset_lock
+from storage.csv_store import load_export_state, save_export_state
+
+
+# ---------- CONFIGURATION ----------
+
+ROLLUP_FILE = os.path.join(os.path.dirname(HDF5_FILE), "rollups.h5")
+
+PERIODS = ("daily", "weekly")
+
+# Per source: value columns to aggregate, optional magnitude buckets and OHLC column
+ROLLUPS = {
+    "bitcoin": {"values": ["value"], "ohlc": "value"},
+    "weather": {"values": ["temperature", "wind_speed"]},
+    "earthquakes": {"values": ["value"], "buckets": "value"},
+}
+
+# Magnitude bucket edges (left-closed): <3, 3-4, 4-5, 5-6, 6-7, >=7
+MAG_BUCKETS = [-np.inf, 3, 4, 5, 6, 7, np.inf]
+MAG_LABELS = ["mag_lt3", "mag_3_4", "mag_4_5", "mag_5_6", "mag_6_7", "mag_7plus"]
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _export_name(key: str) -> str:
+    return f"rollups:{key}"
+
+
+def _rollup_key(key: str, period: str) -> str:
+    return f"{key}/{period}"
+
+
+def _period_start(dates: pd.Series, period: str) -> pd.Series:
+    days = pd.to_datetime(dates, errors="coerce").dt.normalize()
+    if period == "weekly":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    return days
+
+
+def _partial(df: pd.DataFrame, key: str, period: str) -> pd.DataFrame:
+    """
+    Aggregate raw rows per period into mergeable partials (no means yet).
+    """
+    config = ROLLUPS[key]
+    df = df.assign(date=_period_start(df["date"], period)).dropna(subset=["date"])
+    groups = df.groupby("date")
+    out = pd.DataFrame({"count": groups.size()})
+
+    for col in config.get("values", []):
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").groupby(df["date"])
+        out[f"{col}_min"] = values.min()
+        out[f"{col}_max"] = values.max()
+        out[f"{col}_sum"] = values.sum()
+        out[f"{col}_count"] = values.count()
+
+    bucket_col = config.get("buckets")
+    if bucket_col in df.columns:
+        buckets = pd.cut(pd.to_numeric(df[bucket_col], errors="coerce"), MAG_BUCKETS, right=False, labels=MAG_LABELS)
+        counts = pd.crosstab(df["date"], buckets).reindex(columns=MAG_LABELS, fill_value=0)
+        out = out.join(counts.astype("int64"))
+        out[MAG_LABELS] = out[MAG_LABELS].fillna(0).astype("int64")
+
+    ohlc_col = config.get("ohlc")
+    if ohlc_col in df.columns:
+        if "time" in df.columns:
+            times = pd.to_numeric(df["time"], errors="coerce")
+        else:
+            times = pd.Series(pd.to_datetime(df["date"]).astype("datetime64[ms]").astype("int64"), index=df.index)
+        prices = pd.DataFrame({"date": df["date"], "time": times, "price": pd.to_numeric(df[ohlc_col], errors="coerce")})
+        prices = prices.dropna().sort_values("time").groupby("date")
+        out["open"] = prices["price"].first()
+        out["open_time"] = prices["time"].first()
+        out["close"] = prices["price"].last()
+        out["close_time"] = prices["time"].last()
+        out["high"] = prices["price"].max()
+        out["low"] = prices["price"].min()
+
+    return out
+
+
+def _merge(frames: list) -> pd.DataFrame:
+    """
+    Merge partial or stored aggregates of the same periods and derive the means.
+    """
+    df = pd.concat([f for f in frames if not f.empty])
+    groups = df.groupby(level=0)
+    out = pd.DataFrame(index=groups.size().index)
+    for col in df.columns:
+        if col.endswith("_min") or col == "low":
+            out[col] = groups[col].min()
+        elif col.endswith("_max") or col == "high":
+            out[col] = groups[col].max()
+        elif col.endswith(("_sum", "_count")) or col == "count" or col in MAG_LABELS:
+            out[col] = groups[col].sum()
+
+    if "open" in df.columns:
+        ohlc = df[["open", "open_time", "close", "close_time"]].dropna(subset=["open_time"])
+        by_open = ohlc.sort_values("open_time").groupby(level=0)
+        by_close = ohlc.sort_values("close_time").groupby(level=0)
+        out["open"] = by_open["open"].first()
+        out["open_time"] = by_open["open_time"].first()
+        out["close"] = by_close["close"].last()
+        out["close_time"] = by_close["close_time"].last()
+
+    for col in [c[:-4] for c in out.columns if c.endswith("_sum")]:
+        out[f"{col}_mean"] = out[f"{col}_sum"] / out[f"{col}_count"].replace(0, np.nan)
+    # Fixed dtypes, so merged rows can be appended to the stored table
+    for col in out.columns:
+        is_count = col == "count" or col.endswith("_count") or col in MAG_LABELS
+        out[col] = out[col].astype("int64" if is_count else "float64")
+    out.index.name = "date"
+    return out.sort_index()
+
+
+def _write(store: pd.HDFStore, key: str, period: str, df: pd.DataFrame):
+    store.put(_rollup_key(key, period), df.reset_index(), format="table", data_columns=["date"], index=False)
+
+
+# ---------- PUBLIC API ----------
+
+def update_rollups(written: pd.DataFrame, key: str):
+    """
+    Merge the rows of one write into the rollups of a key.
+    Must be called with the dataset lock held (the storage writer does).
+    """
+    if key not in ROLLUPS or written.empty or "date" not in written.columns:
+        return
+    with pd.HDFStore(ROLLUP_FILE, mode="a") as store:
+        for period in PERIODS:
+            partial = _partial(written, key, period)
+            if partial.empty:
+                continue
+            name = _rollup_key(key, period)
+            if name not in store:
+                _write(store, key, period, _merge([partial]))
+                continue
+
+            # Only the periods touched by this write are read, merged and replaced
+            where = [f"date >= {partial.index.min().isoformat()!r}", f"date <= {partial.index.max().isoformat()!r}"]
+            merged = _merge([store.select(name, where=where).set_index("date"), partial])
+            columns = list(store.select(name, stop=0).columns)
+            store.remove(name, where=where)
+            if set(merged.columns) | {"date"} == set(columns):
+                store.append(name, merged.reset_index()[columns], data_columns=["date"], index=False)
+            else:
+                # New aggregate columns: rewrite the (small) table once
+                _write(store, key, period, _merge([store.select(name).set_index("date"), merged]))
+
+
+def rebuild_rollups(table: pd.DataFrame, key: str):
+    """
+    Recompute the rollups of a key from its whole raw table.
+    """
+    if key not in ROLLUPS:
+        return
+    with pd.HDFStore(ROLLUP_FILE, mode="a") as store:
+        for period in PERIODS:
+            if table.empty or "date" not in table.columns:
+                if _rollup_key(key, period) in store:
+                    store.remove(_rollup_key(key, period))
+                continue
+            _write(store, key, period, _merge([_partial(table, key, period)]))
+    logging.info(f"Rollups for '{key}' rebuilt ({len(table)} rows).")
+
+
+def _is_current(key: str) -> bool:
+    nrows = stored_nrows(key)
+    return load_export_state().get(_export_name(key)) == nrows and (nrows == 0 or os.path.exists(ROLLUP_FILE))
+
+
+def ensure_rollups(key: str):
+    """
+    Rebuild the rollups of a key if they do not match the raw table.
+
+    The check only takes the shared lock, so readers of current rollups do
+    not wait for (or block) writers. The lock cannot be upgraded while held,
+    so a rebuild takes the exclusive lock afterwards and checks again.
+    """
+    with dataset_lock(exclusive=False):
+        if _is_current(key):
+            return
+    with dataset_lock():
+        if _is_current(key):
+            return
+        nrows = stored_nrows(key)
+        table = pd.read_hdf(HDF5_FILE, key) if nrows else pd.DataFrame()
+        rebuild_rollups(table, key)
+        state = load_export_state()
+        state[_export_name(key)] = nrows
+        save_export_state(state)
+
+
+def read_rollup(key: str, period: str = "daily", start=None, end=None, columns=None) -> pd.DataFrame:
+    """
+    Read the precomputed aggregates of a source.
+
+    Args:
+        key (str): Storage key (e.g. 'earthquakes').
+        period (str): 'daily' or 'weekly'.
+        start, end: Optional inclusive date range (on the period start).
+        columns (list): Columns to return besides 'date' (all if None).
+
+    Returns:
+        pd.DataFrame: One row per period, sorted by date.
+    """
+    ensure_rollups(key)
+    if not os.path.exists(ROLLUP_FILE):
+        return pd.DataFrame()
+    conditions = []
+    if start is not None:
+        conditions.append(f"date >= {pd.Timestamp(start).isoformat()!r}")
+    if end is not None:
+        conditions.append(f"date <= {pd.Timestamp(end).isoformat()!r}")
+    with dataset_lock(exclusive=False), pd.HDFStore(ROLLUP_FILE, mode="r") as store:
+        name = _rollup_key(key, period)
+        if name not in store:
+            return pd.DataFrame()
+        return store.select(name, where=conditions or None, columns=["date"] + list(columns) if columns else None)
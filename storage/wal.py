@@ -0,0 +1,268 @@
+"""
+Write-Ahead Buffer
+
+Collects scraped rows in memory and writes them to storage in bulk, so a
+source polled every minute does not cost one HDF5 write per poll. Every
+buffered batch is first appended (and fsynced) to a JSONL log in data/.wal/,
+one line per batch with its column dtypes. A key is flushed through the
+storage writer once it holds FLUSH_ROWS rows or its oldest row is
+FLUSH_SECONDS old, and at process exit (on the exiting thread: no writer
+thread can be started during interpreter shutdown).
+
+Logs left behind by a process that crashed are replayed on the next start,
+under the exclusive dataset lock, so two processes starting together do not
+replay the same log. Replaying is idempotent because storage deduplicates
+every record.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import pandas as pd
+
+from storage import parquet
+from storage.writer import save_records
+from storage.locking import dataset_lock
+
+
+# ---------- CONFIGURATION ----------
+
+WAL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", ".wal"))
+
+FLUSH_ROWS = 1000       # flush a key once this many rows are buffered
+FLUSH_SECONDS = 60      # ... or once its oldest buffered row is this old
+CHECK_INTERVAL = 5      # seconds between age checks of the background flusher
+
+
+# ---------- HELPER FUNCTIONS ----------
+
+def _encode(df: pd.DataFrame, key: str) -> str:
+    dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    records = json.loads(df.to_json(orient="values", date_format="iso", date_unit="ms"))
+    return json.dumps({"key": key, "columns": list(df.columns), "dtypes": dtypes, "rows": records})
+
+
+def _decode(line: str):
+    entry = json.loads(line)
+    df = pd.DataFrame(entry["rows"], columns=entry["columns"])
+    for col, dtype in entry["dtypes"].items():
+        try:
+            df[col] = df[col].astype(dtype)
+        except (TypeError, ValueError):
+            pass  # e.g. missing values in an integer column: keep the inferred dtype
+    return entry["key"], df
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+# ---------- WRITE-AHEAD BUFFER ----------
+
+class WriteAheadBuffer:
+    """
+    Per-process buffer of pending writes, backed by one log file per key.
+
+    Args:
+        save (callable): save(df, key, sync=False); sync=True writes on the calling thread.
+    """
+
+    def __init__(self, save):
+        self._save = save
+        self._lock = threading.RLock()
+        self._pending = {}      # key -> list of DataFrames
+        self._rows = {}         # key -> buffered row count
+        self._since = {}        # key -> monotonic time of the oldest buffered row
+        self._flushing = {}     # key -> log files handed to a flush that has not succeeded yet
+        self._replayed = False
+        self._flusher = None
+        self._sequence = 0
+
+    def _log_path(self, key: str) -> str:
+        return os.path.join(WAL_DIR, f"{key}.{os.getpid()}.jsonl")
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(CHECK_INTERVAL)
+            try:
+                self.flush_due()
+            except Exception as e:
+                logging.error(f"Background flush failed: {e}")
+
+    def append(self, df: pd.DataFrame, key: str) -> int:
+        """
+        Log a batch durably and buffer it. Returns the rows of the key still
+        buffered afterwards (0 if this batch triggered a flush).
+        """
+        if not self._replayed:
+            self.replay()
+        with self._lock:
+            os.makedirs(WAL_DIR, exist_ok=True)
+            with open(self._log_path(key), "a") as f:
+                f.write(_encode(df, key) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending.setdefault(key, []).append(df)
+            self._rows[key] = self._rows.get(key, 0) + len(df)
+            self._since.setdefault(key, time.monotonic())
+            rows = self._rows[key]
+
+        if rows >= FLUSH_ROWS:
+            self.flush(key)
+        else:
+            self._ensure_flusher()
+        with self._lock:
+            return self._rows.get(key, 0)
+
+    def flush(self, key: str, sync: bool = False):
+        """
+        Write the buffered rows of a key to storage and drop its log.
+        On failure the rows stay buffered (and logged) for the next attempt.
+        """
+        with self._lock:
+            frames = self._pending.pop(key, [])
+            self._rows.pop(key, None)
+            self._since.pop(key, None)
+            log_path = self._log_path(key)
+            if os.path.exists(log_path):
+                # New batches go to a fresh log while this one is being written
+                self._sequence += 1
+                flushing_path = f"{log_path}.{self._sequence}.flushing"
+                os.replace(log_path, flushing_path)
+                self._flushing.setdefault(key, []).append(flushing_path)
+            if not frames:
+                return
+
+            try:
+                self._save(pd.concat(frames, ignore_index=True), key, sync=sync)
+            except Exception as e:
+                logging.error(f"Flushing {sum(len(df) for df in frames)} buffered row(s) of '{key}' failed: {e}")
+                self._pending.setdefault(key, [])[:0] = frames
+                self._rows[key] = sum(len(df) for df in self._pending[key])
+                self._since.setdefault(key, time.monotonic())
+                return
+
+            for path in self._flushing.pop(key, []):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def flush_due(self):
+        """
+        Flush every key whose oldest buffered row is older than FLUSH_SECONDS.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key, since in self._since.items() if now - since >= FLUSH_SECONDS]
+        for key in due:
+            self.flush(key)
+
+    def flush_all(self, sync: bool = False):
+        """
+        Flush every key that has buffered rows (on the calling thread if sync).
+        """
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self.flush(key, sync=sync)
+
+    def replay(self):
+        """
+        Write the logs of crashed processes (and leftovers of this one) to storage.
+        """
+        # The saves run on this thread: the writer thread would wait for the lock held here
+        with self._lock, dataset_lock():
+            self._replayed = True
+            if not os.path.isdir(WAL_DIR):
+                return
+
+            paths = []
+            for name in sorted(os.listdir(WAL_DIR)):
+                parts = name.split(".")
+                if len(parts) < 3 or not parts[1].isdigit():
+                    continue
+                pid = int(parts[1])
+                if pid != os.getpid() and _pid_alive(pid):
+                    continue
+                paths.append(os.path.join(WAL_DIR, name))
+
+            for path in paths:
+                frames = {}
+                try:
+                    with open(path, "r") as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                            try:
+                                key, df = _decode(line)
+                            except ValueError:
+                                # Torn last line of a crashed write: the batch was never acknowledged
+                                logging.warning(f"Skipping unreadable line in {path}.")
+                                continue
+                            frames.setdefault(key, []).append(df)
+                except FileNotFoundError:
+                    # Already replayed by another process
+                    continue
+                try:
+                    for key, dfs in frames.items():
+                        self._save(pd.concat(dfs, ignore_index=True), key, sync=True)
+                        print(f"♻️ Replayed {sum(len(df) for df in dfs)} buffered row(s) of '{key}' from {os.path.basename(path)}.")
+                except Exception as e:
+                    logging.error(f"Replaying {path} failed: {e}. It will be retried on the next start.")
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+WAL = WriteAheadBuffer(save_records)
+atexit.register(WAL.flush_all, sync=True)
+
+
+# ---------- PUBLIC API ----------
+
+def buffer_records(df: pd.DataFrame, key: str) -> int:
+    """
+    Queue rows for storage through the write-ahead buffer.
+
+    Returns:
+        int: Rows of the key still buffered after this call (0 if it was flushed).
+    """
+    if df.empty:
+        return 0
+    # Import the lazily loaded export backends now: the flush at exit cannot import
+    # modules that register exit handlers themselves (pyarrow does)
+    parquet.is_enabled()
+    return WAL.append(df, key)
+
+
+def flush_all():
+    """
+    Write every buffered row to storage now (e.g. before reading the dataset).
+    """
+    WAL.flush_all()
+
+
+def replay():
+    """
+    Write the buffer logs left behind by crashed processes to storage.
+    """
+    WAL.replay()
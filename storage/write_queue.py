@@ -0,0 +1,106 @@
+"""
+Single-Writer Queue
+
+All saves of a process go through one writer thread. Producers (scraper
+threads, backfill workers, the scheduler) submit batches and wait for the
+result; whatever is pending when the writer becomes free is merged per key
+and written in one go, so concurrent producers cost one HDF5 append per key
+instead of one each. Across processes, writes are serialised by the dataset
+lock (storage.locking).
+"""
+
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+import pandas as pd
+
+from storage.key_index import hash_keys
+
+
+# ---------- CONFIGURATION ----------
+
+# Upper bound for the rows merged into one write
+MAX_BATCH_ROWS = 100_000
+
+
+# ---------- WRITE QUEUE ----------
+
+class WriteQueue:
+    """
+    Queue of (key, DataFrame) writes consumed by a single writer thread.
+
+    Args:
+        write (callable): write(df, key) -> written rows; runs on the writer thread only.
+        dedup_keys (callable): dedup_keys(key, df) -> columns identifying a record.
+    """
+
+    def __init__(self, write, dedup_keys):
+        self._write = write
+        self._dedup_keys = dedup_keys
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+                self._thread.start()
+
+    def is_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, df: pd.DataFrame, key: str) -> Future:
+        """
+        Queue a batch for writing. The future resolves to the rows of this
+        batch that were new and have been written.
+        """
+        future = Future()
+        self._queue.put((key, df, future))
+        self._ensure_thread()
+        return future
+
+    def _drain(self, first) -> list:
+        items = [first]
+        rows = len(first[1])
+        while rows < MAX_BATCH_ROWS:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[1])
+        return items
+
+    def _run(self):
+        while True:
+            items = self._drain(self._queue.get())
+
+            by_key = {}
+            for key, df, future in items:
+                by_key.setdefault(key, []).append((df, future))
+
+            for key, pending in by_key.items():
+                try:
+                    frames = [df for df, _ in pending]
+                    combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                    written = self._write(combined, key)
+                except Exception as e:
+                    logging.error(f"Write of {len(pending)} batch(es) to '{key}' failed: {e}")
+                    for _, future in pending:
+                        future.set_exception(e)
+                    continue
+
+                if len(pending) == 1:
+                    pending[0][1].set_result(written)
+                    continue
+                # Hand each producer the written rows that came from its batch
+                columns = self._dedup_keys(key, written)
+                written_hashes = pd.Index(hash_keys(written, columns)) if not written.empty else pd.Index([])
+                for df, future in pending:
+                    if written.empty or not set(columns) <= set(df.columns):
+                        future.set_result(written.iloc[0:0])
+                        continue
+                    mine = written_hashes.isin(hash_keys(df, columns))
+                    future.set_result(written[mine])
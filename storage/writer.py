@@ -0,0 +1,116 @@
+"""
+Unified Storage Writer
+
+One write path for every source: a batch is written once to the HDF5
+dataset (the source of truth, deduplicated against its persistent key
+index) and only the rows that were actually stored are appended to the
+source's exports: the CSV file, the daily/weekly rollups (storage.rollups)
+and, if pyarrow is available, the Parquet dataset (storage.parquet). Neither
+store is read in full on a normal save.
+
+Saves are funnelled through a single-writer queue (storage.write_queue) that
+merges batches submitted concurrently, and each batch is written under the
+exclusive dataset lock, so HDF5 and its exports change together.
+"""
+
+import os
+import pandas as pd
+
+import metrics
+from storage import parquet, rollups
+from storage.hdf5 import HDF5_FILE, save_to_hdf, stored_nrows, _dedup_keys
+from storage.locking import dataset_lock
+from storage.write_queue import WriteQueue
+from storage.csv_store import CSV_EXPORTS, load_export_state, save_export_state, append_to_csv, export_csv
+
+
+def _sync_export(state: dict, name: str, previous_nrows: int, nrows: int, written: pd.DataFrame,
+                 append, rebuild, key: str):
+    """
+    Append the written rows to one export, or rebuild the export from HDF5 if
+    it did not match the table before this write.
+    """
+    # Export names are '<key>' (CSV), 'parquet:<key>' and 'rollups:<key>'
+    kind = name.split(":")[0] if ":" in name else "csv"
+    with metrics.timer("export_seconds", key=key, export=kind):
+        if state.get(name) == previous_nrows and nrows == previous_nrows + len(written):
+            if not written.empty:
+                append(written)
+        elif nrows:
+            # The export is behind (or the table was rewritten): export it again from HDF5
+            rebuild(pd.read_hdf(HDF5_FILE, key))
+    state[name] = nrows
+
+
+def _save_batch(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Write one batch to HDF5 and its exports (runs on the writer thread).
+    """
+    with dataset_lock(), metrics.timer("storage_write_seconds", key=key):
+        csv_path = CSV_EXPORTS.get(key)
+        state = load_export_state()
+        if csv_path and key not in state and os.path.exists(csv_path):
+            print(f"🔧 Merging {os.path.basename(csv_path)} into HDF5 key '{key}' (one-off).")
+            save_to_hdf(pd.read_csv(csv_path), key)
+
+        previous_nrows = stored_nrows(key)
+        written = save_to_hdf(df, key)
+        _sync_exports(state, key, previous_nrows, stored_nrows(key), written)
+        save_export_state(state)
+    return written
+
+
+def _sync_exports(state: dict, key: str, previous_nrows: int, nrows: int, written: pd.DataFrame):
+    csv_path = CSV_EXPORTS.get(key)
+    if csv_path:
+        _sync_export(state, key, previous_nrows, nrows, written,
+                     append=lambda rows: append_to_csv(rows, csv_path),
+                     rebuild=lambda table: export_csv(table, csv_path), key=key)
+    if parquet.is_enabled():
+        _sync_export(state, f"parquet:{key}", previous_nrows, nrows, written,
+                     append=lambda rows: parquet.append_parquet(rows, key),
+                     rebuild=lambda table: parquet.rebuild_parquet(table, key), key=key)
+    if key in rollups.ROLLUPS:
+        _sync_export(state, rollups._export_name(key), previous_nrows, nrows, written,
+                     append=lambda rows: rollups.update_rollups(rows, key),
+                     rebuild=lambda table: rollups.rebuild_rollups(table, key), key=key)
+
+
+def rebuild_exports(keys):
+    """
+    Rebuild every export of the given keys from HDF5 (e.g. after a restore
+    replaced the tables), under the exclusive dataset lock.
+    """
+    with dataset_lock():
+        state = load_export_state()
+        for key in keys:
+            # -1 never matches a row count, so each export is rebuilt
+            _sync_exports(state, key, -1, stored_nrows(key), pd.DataFrame())
+        save_export_state(state)
+
+
+WRITE_QUEUE = WriteQueue(_save_batch, _dedup_keys)
+
+
+def save_records(df: pd.DataFrame, key: str, sync: bool = False) -> pd.DataFrame:
+    """
+    Store a batch under an HDF5 key and keep its exports in sync.
+
+    Safe to call from several threads at once: the batch is queued for the
+    single writer thread and this call returns once it has been written.
+    On the first save of a key, rows that only exist in an older CSV file are
+    merged into HDF5 once, so switching the source of truth loses nothing.
+
+    Args:
+        df (pd.DataFrame): Rows to save.
+        key (str): HDF5 key (e.g. 'earthquakes').
+        sync (bool): Write on the calling thread instead of the writer thread,
+            e.g. at interpreter exit (no new thread can be started) or while
+            holding the dataset lock (the writer thread would wait for it).
+
+    Returns:
+        pd.DataFrame: The rows that were new and have been written.
+    """
+    if sync or WRITE_QUEUE.is_writer_thread():
+        return _save_batch(df, key)
+    return WRITE_QUEUE.submit(df, key).result()
@@ -0,0 +1,24 @@
+"""
+Shared pytest setup: makes the project root importable and keeps every test
+away from the real data/ directory.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Point the dataset lock, key index and write-ahead buffer at a temporary directory.
+    """
+    from storage import key_index, locking, wal
+
+    monkeypatch.setattr(locking, "LOCK_FILE", str(tmp_path / "dataset.h5.lock"))
+    monkeypatch.setattr(key_index, "INDEX_DIR", str(tmp_path / ".index"))
+    monkeypatch.setattr(wal, "WAL_DIR", str(tmp_path / ".wal"))
+    return tmp_path
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from plotting.downsample import downsample, lttb_indices, minmax_indices
+
+
+def _series(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "time": pd.date_range("2025-01-01", periods=n, freq="min"),
+        "value": rng.normal(size=n).cumsum(),
+        "other": rng.normal(size=n),
+    })
+
+
+@pytest.mark.parametrize("n, n_out", [(10_000, 400), (1001, 100), (103, 10), (5, 4)])
+def test_minmax_keeps_endpoints_and_extremes(n, n_out):
+    y = _series(n)["value"].to_numpy()
+    keep = minmax_indices(y, n_out)
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+    assert len(keep) <= n_out
+    assert y.argmax() in keep and y.argmin() in keep
+
+
+@pytest.mark.parametrize("n, n_out", [(10_000, 400), (1001, 100), (103, 10), (5, 3)])
+def test_lttb_keeps_endpoints_and_size(n, n_out):
+    df = _series(n)
+    x = df["time"].astype("int64").to_numpy(dtype="float64")
+    keep = lttb_indices(x, df["value"].to_numpy(), n_out)
+    assert len(keep) == n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_short_series_unchanged():
+    y = np.arange(50, dtype=float)
+    assert np.array_equal(minmax_indices(y, 100), np.arange(50))
+    assert np.array_equal(lttb_indices(y, y, 100), np.arange(50))
+
+
+def test_nan_gap_stays_visible():
+    y = _series(2000)["value"].to_numpy()
+    y[100:300] = np.nan
+    keep = minmax_indices(y, 200)
+    assert np.nanargmax(y) in keep and np.nanargmin(y) in keep
+    # Buckets with values never pick a NaN; an all-NaN bucket keeps one, which breaks the line
+    assert np.isnan(y[keep]).any()
+    assert all(100 <= i < 300 for i in keep[np.isnan(y[keep])])
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_frame(method):
+    df = _series(20_000)
+    out = downsample(df, "time", ["value", "other"], 500, method=method)
+    assert out.index[0] == df.index[0] and out.index[-1] == df.index[-1]
+    assert out["time"].is_monotonic_increasing
+    # Rows kept for either column: at most the budget per column
+    assert len(out) <= 2 * 500
+    assert out.columns.tolist() == df.columns.tolist()
+
+
+def test_downsample_within_budget_returns_input():
+    df = _series(300)
+    assert downsample(df, "time", ["value"], 500) is df
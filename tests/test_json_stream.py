@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from scrapers.json_stream import iter_array_items
+
+
+DOCUMENT = {
+    "type": "FeatureCollection",
+    "metadata": {"count": 3, "title": "features [not the array]"},
+    "features": [
+        {"id": "a", "properties": {"mag": 2.5, "place": "10 km N of Zürich"}},
+        {"id": "b", "properties": {"mag": 3.75, "place": "Ōsaka, \"Japan\""}},
+        {"id": "c", "properties": {"mag": None, "tags": [1, 2, {"x": "]"}]}},
+    ],
+    "bbox": [1, 2, 3],
+}
+
+
+def _chunks(text: str, size: int):
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, 4096])
+def test_items_split_across_chunks(size):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=1)
+    assert list(iter_array_items(_chunks(text, size), "features")) == DOCUMENT["features"]
+
+
+def test_str_chunks():
+    text = json.dumps(DOCUMENT)
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+    assert list(iter_array_items(chunks, "features")) == DOCUMENT["features"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_scalar_items_at_chunk_end(size):
+    text = '{"values": [12345, -6.5e3, true, null, "x,y"]}'
+    assert list(iter_array_items(_chunks(text, size), "values")) == [12345, -6500.0, True, None, "x,y"]
+
+
+def test_empty_array():
+    assert list(iter_array_items([b'{"features": [ ]}'], "features")) == []
+
+
+def test_truncated_stream_raises():
+    text = json.dumps(DOCUMENT)
+    items = iter_array_items(_chunks(text[:len(text) // 2], 10), "features")
+    with pytest.raises(ValueError):
+        list(items)
+
+
+def test_missing_key_raises():
+    with pytest.raises(ValueError):
+        list(iter_array_items([b'{"other": [1, 2]}'], "features"))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from storage import key_index
+from storage.key_index import KeyIndex
+
+
+def _rows(ids) -> pd.DataFrame:
+    return pd.DataFrame({"id": [f"ev{i}" for i in ids], "value": np.arange(len(ids), dtype=float)})
+
+
+def _load(name="test", stored=None, fingerprint=0):
+    return KeyIndex(name, ["id"]).load(fingerprint, lambda: stored)
+
+
+def test_filter_new_across_batches(data_dir):
+    index = _load()
+    first = index.filter_new(_rows([1, 2, 3]))
+    assert first["id"].tolist() == ["ev1", "ev2", "ev3"]
+    index.add(first, 3)
+
+    second = index.filter_new(_rows([2, 3, 4, 5]))
+    assert second["id"].tolist() == ["ev4", "ev5"]
+    index.add(second, 5)
+
+    assert index.filter_new(_rows([1, 5])).empty
+    assert len(index) == 5
+
+
+def test_duplicates_within_a_batch_keep_the_last_row(data_dir):
+    index = _load()
+    batch = pd.DataFrame({"id": ["a", "b", "a"], "value": [1.0, 2.0, 3.0]})
+    new = index.filter_new(batch)
+    assert new["id"].tolist() == ["b", "a"]
+    assert new["value"].tolist() == [2.0, 3.0]
+
+
+def test_keys_are_normalised():
+    dates = pd.DataFrame({"date": ["2025-10-20"]})
+    stamps = pd.DataFrame({"date": [pd.Timestamp("2025-10-20")]})
+    assert key_index.hash_keys(dates, ["date"])[0] == key_index.hash_keys(stamps, ["date"])[0]
+    ints = pd.DataFrame({"time": [1760918400000]})
+    floats = pd.DataFrame({"time": [1760918400000.0]})
+    assert key_index.hash_keys(ints, ["time"])[0] == key_index.hash_keys(floats, ["time"])[0]
+
+
+def test_index_persists_and_rebuilds_on_fingerprint_change(data_dir):
+    index = _load(stored=_rows([1, 2]), fingerprint=2)
+    index.add(index.filter_new(_rows([3])), 3)
+
+    reloaded = _load(fingerprint=3)
+    assert reloaded.filter_new(_rows([1, 2, 3, 4]))["id"].tolist() == ["ev4"]
+
+    # The data changed behind the index (e.g. compaction): rebuilt from the data itself
+    rebuilt = _load(stored=_rows([1]), fingerprint=1)
+    assert rebuilt.filter_new(_rows([1, 2, 3]))["id"].tolist() == ["ev2", "ev3"]
+
+
+def test_added_hashes_are_folded_into_the_index(data_dir, monkeypatch):
+    monkeypatch.setattr(key_index, "FOLD_MIN", 10)
+    index = _load()
+    for start in range(0, 100, 7):
+        batch = index.filter_new(_rows(range(start, start + 7)))
+        index.add(batch, start + 7)
+    assert len(index._added) <= max(len(index._hashes), 10)
+    assert len(index) == 105
+    assert index.filter_new(_rows(range(110))).shape[0] == 5
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from scrapers import registry
+from storage.dedup import DEDUP_KEYS
+from scrapers.registry import next_run_after, parse_frequency, register_scraper, resolve_sources
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Daily", timedelta(days=1)),
+    ("hourly", timedelta(hours=1)),
+    (" Multiple times per day ", timedelta(hours=6)),
+    ("Weekly", timedelta(weeks=1)),
+    ("5 minutes", timedelta(minutes=5)),
+    ("every 1 hour", timedelta(hours=1)),
+    ("30s", timedelta(seconds=30)),
+    ("1 minute", timedelta(minutes=1)),
+    ("2 days", timedelta(days=2)),
+    ("every 3 weeks", timedelta(weeks=3)),
+])
+def test_parse_frequency(text, expected):
+    assert parse_frequency(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "sometimes", "0 minutes", "5 fortnights", float("nan")])
+def test_unknown_frequency_falls_back_to_daily(text):
+    assert parse_frequency(text) == timedelta(days=1)
+
+
+def test_next_run_after():
+    spec = registry.ScraperSpec(name="x", scrape=None, save=None, storage_key="x", frequency="Daily")
+    assert next_run_after(spec, datetime(2025, 1, 1, 9)) == datetime(2025, 1, 1, 11)
+    assert next_run_after(spec, datetime(2025, 1, 1, 12)) == datetime(2025, 1, 2, 11)
+    minutely = registry.ScraperSpec(name="y", scrape=None, save=None, storage_key="y", cadence="5 minutes")
+    assert next_run_after(minutely, datetime(2025, 1, 1, 9)) == datetime(2025, 1, 1, 9, 5)
+
+
+def test_blank_csv_cells_keep_registered_defaults(monkeypatch):
+    monkeypatch.setattr(registry, "REGISTRY", {})
+    # Removed again after the test
+    monkeypatch.setitem(DEDUP_KEYS, "test", [])
+    register_scraper("scrape_test", None, None, storage_key="test", frequency="hourly", cadence="10 minutes")
+    websites = pd.DataFrame({
+        "Website Name": ["Test"],
+        "URL": ["https://example.com"],
+        "Scraper Name": ["scrape_test"],
+        "Updated Frequency": [float("nan")],
+        "Cadence": [float("nan")],
+    })
+    [spec] = resolve_sources(websites)
+    assert spec.frequency == "hourly"
+    assert spec.interval == timedelta(minutes=10)
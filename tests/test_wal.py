@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from storage import wal
+from storage.wal import WriteAheadBuffer
+
+
+def _batch(start: int, n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "time": pd.date_range("2025-01-01", periods=n, freq="min") + pd.Timedelta(minutes=start),
+        "value": [float(start + i) for i in range(n)],
+        "count": list(range(start, start + n)),
+        "source": "test",
+    })
+
+
+class Recorder:
+    def __init__(self):
+        self.saved = []
+
+    def __call__(self, df, key, sync=False):
+        self.saved.append((key, df))
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _crash(buffer_dir: str, key: str):
+    """
+    Leave the log of this process behind as if it had crashed before flushing.
+    """
+    pid = _dead_pid()
+    own = os.path.join(buffer_dir, f"{key}.{os.getpid()}.jsonl")
+    os.replace(own, os.path.join(buffer_dir, f"{key}.{pid}.jsonl"))
+    return pid
+
+
+def test_replay_after_crash(data_dir):
+    crashed = WriteAheadBuffer(Recorder())
+    crashed.append(_batch(0, 3), "bitcoin")
+    crashed.append(_batch(3, 2), "bitcoin")
+    crashed.append(_batch(0, 4), "weather")
+    for key in ("bitcoin", "weather"):
+        _crash(wal.WAL_DIR, key)
+
+    recorder = Recorder()
+    WriteAheadBuffer(recorder).replay()
+
+    saved = dict(recorder.saved)
+    pd.testing.assert_frame_equal(saved["bitcoin"], _batch(0, 5))
+    pd.testing.assert_frame_equal(saved["weather"], _batch(0, 4))
+    assert os.listdir(wal.WAL_DIR) == []
+
+
+def test_replay_skips_torn_last_line(data_dir):
+    WriteAheadBuffer(Recorder()).append(_batch(0, 3), "bitcoin")
+    pid = _crash(wal.WAL_DIR, "bitcoin")
+    with open(os.path.join(wal.WAL_DIR, f"bitcoin.{pid}.jsonl"), "a") as f:
+        f.write('{"key": "bitcoin", "columns": ["ti')
+
+    recorder = Recorder()
+    WriteAheadBuffer(recorder).replay()
+    [(key, df)] = recorder.saved
+    assert key == "bitcoin"
+    pd.testing.assert_frame_equal(df, _batch(0, 3))
+
+
+def test_failed_replay_keeps_log(data_dir):
+    WriteAheadBuffer(Recorder()).append(_batch(0, 3), "bitcoin")
+    pid = _crash(wal.WAL_DIR, "bitcoin")
+
+    def failing(df, key, sync=False):
+        raise OSError("disk full")
+
+    WriteAheadBuffer(failing).replay()
+    assert os.listdir(wal.WAL_DIR) == [f"bitcoin.{pid}.jsonl"]
+
+
+def test_logs_of_live_processes_are_left_alone(data_dir):
+    WriteAheadBuffer(Recorder()).append(_batch(0, 3), "bitcoin")
+    own = f"bitcoin.{os.getpid()}.jsonl"
+    # PID 1 is always alive
+    os.replace(os.path.join(wal.WAL_DIR, own), os.path.join(wal.WAL_DIR, "bitcoin.1.jsonl"))
+
+    recorder = Recorder()
+    WriteAheadBuffer(recorder).replay()
+    assert recorder.saved == []
+    assert os.listdir(wal.WAL_DIR) == ["bitcoin.1.jsonl"]
+
+
+def test_flush_writes_buffered_rows_and_drops_log(data_dir):
+    recorder = Recorder()
+    buffer = WriteAheadBuffer(recorder)
+    assert buffer.append(_batch(0, 3), "bitcoin") == 3
+    buffer.flush_all(sync=True)
+    [(key, df)] = recorder.saved
+    pd.testing.assert_frame_equal(df, _batch(0, 3))
+    assert os.listdir(wal.WAL_DIR) == []